@@ -0,0 +1,69 @@
+"""
+Production server entry point: python -m backend.app
+
+Runs the application under the pre-forking supervisor in backend.app.server.
+"""
+
+import argparse
+import os
+from backend.app.server import Supervisor, auto_worker_count
+
+
+def parse_workers(value: str) -> int | str:
+    """Accept a positive worker count or "auto"."""
+    if value == "auto":
+        return value
+    workers = int(value)
+    if workers < 1:
+        raise argparse.ArgumentTypeError("workers must be at least 1")
+    return workers
+
+
+def main():
+    """
+    Parse command line arguments and start the server.
+
+    Command line options:
+        --host, --port: Address to bind
+        -w, --workers: Number of worker processes, or "auto"
+        --preload: Import the app once in the supervisor before forking workers; reloads
+            then keep running the code imported at startup
+        --app: Import string of the ASGI app
+        --log-level: uvicorn log level
+        --graceful-timeout: Seconds workers get to finish requests on reload/shutdown
+    """
+    parser = argparse.ArgumentParser(prog="python -m backend.app", description="Run the FastAPI auth app")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to bind")
+    parser.add_argument("--port", type=int, default=8000, help="Port to bind")
+    parser.add_argument("-w", "--workers", type=parse_workers, default=1, help='Worker processes, or "auto" to size from cores and hash cost')
+    parser.add_argument("--preload", action="store_true",
+                        help="Import the app before forking so workers share its memory pages "
+                             "(SIGHUP then restarts workers without loading changed code)")
+    parser.add_argument("--app", default="backend.app.main:app", help="Import string of the ASGI app")
+    parser.add_argument("--log-level", default="info", help="uvicorn log level")
+    parser.add_argument("--graceful-timeout", type=int, default=30, help="Seconds to finish in-flight requests on reload or shutdown")
+
+    args = parser.parse_args()
+
+    workers = auto_worker_count() if args.workers == "auto" else args.workers
+
+    if not hasattr(os, "fork"):
+        # No pre-forking on this platform; fall back to a single uvicorn process
+        import uvicorn
+        uvicorn.run(args.app, host=args.host, port=args.port, log_level=args.log_level)
+        return
+
+    exit_code = Supervisor(
+        args.app,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        preload=args.preload,
+        log_level=args.log_level,
+        graceful_timeout=args.graceful_timeout,
+    ).run()
+    if exit_code:
+        raise SystemExit(exit_code)
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,7 @@ This module handles environment variables, application settings, and configurati
 management using Pydantic settings.
 """
 
+from pydantic import IPvAnyNetwork
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from typing import Optional
 from functools import lru_cache
@@ -26,13 +27,24 @@ class Settings(BaseSettings):
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    # Seconds a just-rotated refresh token keeps returning the same new pair (0 disables)
+    REFRESH_GRACE_SECONDS: int = 10
+    # Seconds a concurrent refresh waits for the rotation already running for its token
+    REFRESH_WAIT_SECONDS: float = 5.0
 
 
     # Email Code
     VERIFICATION_CODE_EXPIRE_MINUTES: int = 8
+    # "table" stores each code in verification_codes, "hmac" derives it from the user's nonce
+    VERIFICATION_CODE_MODE: str = "table"
+    # Key for HMAC-derived codes (falls back to JWT_SECRET when unset)
+    VERIFICATION_CODE_SECRET: Optional[str] = None
 
     # Database Settings
     DATABASE_URL: str = "sqlite:///./backend/app/app.db"
+    DB_CREATE_TABLES_ON_STARTUP: bool = True
+    # User shards; when set, DATABASE_URL only holds the email directory (JSON list in the environment)
+    DB_SHARD_URLS: list[str] = []
 
     # Email Settings
     SMTP_TLS: bool = True
@@ -50,9 +62,72 @@ class Settings(BaseSettings):
     MAIL_PORT: Optional[int] = None
     MAIL_SERVER: Optional[str] = None
 
+    # OpenAPI: path to a schema prebuilt by scripts/build_openapi.py (generated on demand when unset)
+    OPENAPI_SCHEMA_FILE: Optional[str] = None
+
+    # Logging: JSON lines written by a background thread
+    LOG_LEVEL: str = "INFO"
+    LOG_QUEUE_SIZE: int = 10000
+    # Share of invalid and expired token events that are logged
+    LOG_INVALID_TOKEN_SAMPLE_RATE: float = 0.01
+
+    # Tracing: spans per request, DB statement, hash, JWT and mail call
+    TRACING_ENABLED: bool = False
+    TRACING_SAMPLE_RATE: float = 1.0  # for requests without an incoming traceparent
+    TRACING_EXPORTER: str = "memory"  # "memory" or "file"
+    TRACING_FILE: str = "backend/traces/spans.jsonl"
+    TRACING_QUEUE_SIZE: int = 10000  # traces waiting for the file writer; more are dropped
+
+    # Debugging: adds per-request SQL statement count and time response headers
+    DEBUG: bool = False
+
+    # Request profiling: enabled per request by a signed X-Profile header or by sampling
+    PROFILING_ENABLED: bool = False
+    PROFILING_SECRET: Optional[str] = None
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_INTERVAL_SECONDS: float = 0.005
+    PROFILING_DIR: str = "backend/profiles"
+    PROFILING_MAX_PROFILES: int = 100
+
+    # Admin endpoints require this token in the X-Admin-Token header (disabled when unset)
+    ADMIN_TOKEN: Optional[str] = None
+
+    # POST /auth/introspect requires this token in the X-Introspection-Token header (disabled when unset)
+    INTROSPECTION_TOKEN: Optional[str] = None
+    INTROSPECTION_MAX_TOKENS: int = 100
+    # Upper bound for the Cache-Control max-age of introspection results
+    INTROSPECTION_MAX_CACHE_SECONDS: int = 300
+
+    # Index built by scripts/build_breached_index.py; passwords listed in it are rejected (check off when unset)
+    BREACHED_PASSWORDS_FILE: Optional[str] = None
+
     # Security Settings
     BACKEND_CORS_ORIGINS: list[str] = ["*"]
 
+    # Rate Limiting ("<count>/<second|minute|hour|day>", applied per IP, per email and per user)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis"
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    RATE_LIMIT_LOGIN: str = "10/minute"
+    RATE_LIMIT_REGISTER: str = "5/minute"
+    RATE_LIMIT_RESEND_CODE: str = "3/minute"
+    RATE_LIMIT_VERIFY_EMAIL: str = "10/minute"
+    # Reverse proxy addresses or CIDR ranges whose Forwarded / X-Forwarded-For headers name the client IP
+    RATE_LIMIT_TRUSTED_PROXIES: list[IPvAnyNetwork] = []
+
+    # In-memory Bloom filter letting login and resend-code reject unregistered emails without a query
+    EMAIL_FILTER_ENABLED: bool = True
+    EMAIL_FILTER_CAPACITY: int = 1000000
+    EMAIL_FILTER_ERROR_RATE: float = 0.01
+    # Seconds between scans for users added by other workers; their emails are rejected here until then
+    EMAIL_FILTER_REFRESH_SECONDS: float = 2.0
+    # How long user IDs skipped by a scan (e.g. open transactions) keep being rescanned
+    EMAIL_FILTER_PENDING_SECONDS: float = 600.0
+
+    # Idempotency-Key support on /auth/register and /auth/resend-code (per process)
+    IDEMPOTENCY_TTL_SECONDS: int = 86400
+    IDEMPOTENCY_MAX_KEYS: int = 10000
+
     # Proper model config for pydantic-settings v2
     model_config: SettingsConfigDict = {
         "env_file": ".env",
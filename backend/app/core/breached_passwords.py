@@ -0,0 +1,226 @@
+"""
+Breached password index module for rejecting passwords from known breaches.
+This module checks passwords against a local index file built from breach
+corpora (e.g. the Pwned Passwords SHA-1 dump) by
+scripts/build_breached_index.py, without calling an external API.
+
+The index is a short header followed by the leading bytes of each SHA-1
+digest as fixed-width records in sorted order. It is memory-mapped and
+searched with binary search, so a lookup reads about log2(n) records
+through the page cache and memory use does not grow with the corpus.
+Eight-byte prefixes keep a billion passwords under 8 GB on disk with a
+negligible chance of a false match.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import tempfile
+from bisect import bisect_left
+from hashlib import sha1
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, Optional
+from backend.app.config import get_settings
+
+# Magic, format version, bytes kept of each digest
+_HEADER = struct.Struct("<4sBB2x")
+_MAGIC = b"BPWI"
+_VERSION = 1
+
+DEFAULT_PREFIX_BYTES = 8
+
+# Digests sorted in memory before being spilled to a temporary run file
+DEFAULT_RUN_SIZE = 1_000_000
+
+
+class BreachedPasswordIndex:
+    """
+    Read-only view of an index file, memory-mapped for lookups.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"{path} is not a breached password index")
+        magic, version, self.prefix_bytes = _HEADER.unpack_from(self._mmap)
+        if magic != _MAGIC or version != _VERSION or not 1 <= self.prefix_bytes <= 20:
+            raise ValueError(f"{path} is not a breached password index")
+        if (len(self._mmap) - _HEADER.size) % self.prefix_bytes:
+            raise ValueError(f"{path} is truncated")
+
+    def __len__(self) -> int:
+        return (len(self._mmap) - _HEADER.size) // self.prefix_bytes
+
+    def __getitem__(self, position: int) -> bytes:
+        # Record access for bisect; the index itself is the sorted sequence
+        start = _HEADER.size + position * self.prefix_bytes
+        return self._mmap[start:start + self.prefix_bytes]
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """
+        Check whether a SHA-1 digest is in the index.
+
+        Args:
+            digest (bytes): SHA-1 digest of a password
+
+        Returns:
+            bool: True if the digest's prefix is listed
+        """
+        prefix = digest[:self.prefix_bytes]
+        position = bisect_left(self, prefix)
+        return position < len(self) and self[position] == prefix
+
+    def __contains__(self, password: str) -> bool:
+        return self.contains_digest(sha1(password.encode()).digest())
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._mmap.close()
+
+
+def _digests(lines: Iterable[bytes], plaintext: bool, min_count: int) -> Iterator[Optional[bytes]]:
+    # Yields None for each hash line that is not "<SHA-1 hex>[:<count>]"
+    for line in lines:
+        if plaintext:
+            password = line.rstrip(b"\r\n")
+            if password:
+                yield sha1(password).digest()
+            continue
+        # "<SHA-1 hex>[:<count>]", as in the Pwned Passwords downloads
+        line = line.strip()
+        if not line:
+            continue
+        hex_digest, _, count = line.partition(b":")
+        try:
+            digest = bytes.fromhex(hex_digest.decode("ascii")) if len(hex_digest) == 40 else None
+            count = int(count) if count else None
+        except ValueError:
+            digest = None
+        if digest is None:
+            yield None
+            continue
+        if count is not None and count < min_count:
+            continue
+        yield digest
+
+
+def _read_run(file: BinaryIO, record_size: int) -> Iterator[bytes]:
+    while record := file.read(record_size):
+        yield record
+
+
+def build_breached_index(
+    lines: Iterable[bytes],
+    output: str,
+    prefix_bytes: int = DEFAULT_PREFIX_BYTES,
+    plaintext: bool = False,
+    min_count: int = 1,
+    run_size: int = DEFAULT_RUN_SIZE,
+) -> tuple[int, int]:
+    """
+    Write an index file from breach corpus lines.
+
+    Inputs larger than run_size are sorted in runs spilled to temporary
+    files and merged, so memory use stays bounded whatever the corpus size
+    or order. The output is written to a temporary file and moved into place.
+    Malformed hash lines are skipped and reported rather than aborting the build.
+
+    Args:
+        lines (Iterable[bytes]): Lines of "<SHA-1 hex>[:<count>]", or passwords if plaintext
+        output (str): Path of the index file
+        prefix_bytes (int): Bytes kept of each digest
+        plaintext (bool): Whether lines are passwords to hash rather than SHA-1 hex
+        min_count (int): Skip hashes seen fewer times than this (hash input with counts only)
+        run_size (int): Digests sorted in memory per run
+
+    Returns:
+        tuple[int, int]: Number of distinct prefixes written, and of malformed lines skipped
+    """
+    output_path = Path(output)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryDirectory(dir=output_path.parent) as run_dir:
+        run_paths: list[str] = []
+        run: list[bytes] = []
+        malformed = 0
+
+        def spill() -> None:
+            path = os.path.join(run_dir, f"run-{len(run_paths)}")
+            with open(path, "wb") as run_file:
+                run_file.writelines(sorted(run))
+            run_paths.append(path)
+            run.clear()
+
+        for digest in _digests(lines, plaintext, min_count):
+            if digest is None:
+                malformed += 1
+                continue
+            run.append(digest[:prefix_bytes])
+            if len(run) >= run_size:
+                spill()
+
+        run_files = [open(path, "rb") for path in run_paths]
+        try:
+            merged = heapq.merge(sorted(run), *(_read_run(file, prefix_bytes) for file in run_files))
+            partial_path = f"{output}.partial"
+            written, previous = 0, None
+            with open(partial_path, "wb") as index_file:
+                index_file.write(_HEADER.pack(_MAGIC, _VERSION, prefix_bytes))
+                for prefix in merged:
+                    if prefix != previous:
+                        index_file.write(prefix)
+                        written += 1
+                        previous = prefix
+        finally:
+            for file in run_files:
+                file.close()
+
+    os.replace(partial_path, output)
+    return written, malformed
+
+
+_index: Optional[BreachedPasswordIndex] = None
+
+
+def load_breached_password_index() -> Optional[BreachedPasswordIndex]:
+    """
+    Map the index configured by BREACHED_PASSWORDS_FILE for this process.
+
+    Called from the lifespan startup hook, so a missing or corrupt file stops
+    the app from starting instead of failing registrations at request time.
+
+    Returns:
+        Optional[BreachedPasswordIndex]: The index, or None if BREACHED_PASSWORDS_FILE is unset
+
+    Raises:
+        RuntimeError: If the file cannot be opened or is not a valid index
+    """
+    global _index
+    close_breached_password_index()
+    path = get_settings().BREACHED_PASSWORDS_FILE
+    if path:
+        try:
+            _index = BreachedPasswordIndex(path)
+        except (OSError, ValueError) as error:
+            raise RuntimeError(f"BREACHED_PASSWORDS_FILE cannot be used: {error}") from error
+    return _index
+
+
+def close_breached_password_index() -> None:
+    """Unmap the loaded index, if any."""
+    global _index
+    if _index is not None:
+        _index.close()
+        _index = None
+
+
+def get_breached_password_index() -> Optional[BreachedPasswordIndex]:
+    """
+    Get the index mapped at startup. Never touches the file system.
+
+    Returns:
+        Optional[BreachedPasswordIndex]: The index, or None if the check is off
+    """
+    return _index
@@ -0,0 +1,290 @@
+"""
+Registered email filter module for skipping lookups of unknown emails.
+This module keeps a Bloom filter of every registered canonical email in
+process memory, so login and resend-code can reject emails that were never
+registered without any query, which is where credential stuffing and
+enumeration traffic mostly goes.
+
+The filter is built at startup by streaming the users table, updated on
+register, and refreshed every EMAIL_FILTER_REFRESH_SECONDS from the users
+committed since, e.g. by other workers and scripts. Until a refresh picks
+them up, users added elsewhere are rejected by this process.
+
+Refreshes read the primary key range above the highest user ID scanned so far.
+IDs below it that have not been seen (transactions still open, or IDs committed
+on another shard) stay pending and are rescanned on every refresh for
+EMAIL_FILTER_PENDING_SECONDS, so a user committing late is found once it
+commits. Until the filter is built, and when it is disabled, every email is
+reported as possibly present.
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Callable, Optional
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from backend.app.config import get_settings
+from backend.app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+_SCAN_BATCH_SIZE = 1000
+
+# Pending ID ranges beyond this are merged into one, to keep the refresh query small
+_MAX_PENDING_RANGES = 100
+
+
+class BloomFilter:
+    """
+    Fixed-size set membership filter with no false negatives.
+
+    Sized for capacity items at the given false positive rate; adding more
+    items raises the false positive rate but never causes false negatives.
+    """
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self._lock = threading.Lock()
+
+    def _positions(self, item: str) -> list[int]:
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, item: str) -> None:
+        """
+        Add an item.
+
+        Args:
+            item (str): Item to add
+        """
+        positions = self._positions(item)
+        # Setting a bit is a read-modify-write of its byte, so concurrent adds are serialized
+        with self._lock:
+            for position in positions:
+                self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+def _unseen_ranges(first: int, last: int, seen: list[int]) -> list[tuple[int, int]]:
+    # Sub-ranges of [first, last] holding none of the sorted IDs in seen
+    ranges = []
+    start = first
+    for user_id in seen[bisect_left(seen, first):bisect_right(seen, last)]:
+        if user_id > start:
+            ranges.append((start, user_id - 1))
+        start = user_id + 1
+    if start <= last:
+        ranges.append((start, last))
+    return ranges
+
+
+def _is_after(created_at: Optional[datetime], cutoff: datetime) -> bool:
+    if created_at is None:
+        return False
+    if created_at.tzinfo is None:
+        # SQLite returns naive datetimes; they are stored in UTC
+        created_at = created_at.replace(tzinfo=timezone.utc)
+    return created_at > cutoff
+
+
+class RegisteredEmailFilter:
+    """
+    Bloom filter of registered canonical emails kept up to date with the users table.
+    """
+
+    def __init__(self, capacity: int, error_rate: float, pending_seconds: float = 600.0):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.pending_seconds = pending_seconds
+        self._bloom: Optional[BloomFilter] = None
+        # Highest user ID returned by a scan; IDs added locally do not count
+        self._high_water = 0
+        # (first ID, last ID, monotonic time noticed) of unseen IDs below the high water mark
+        self._pending: list[tuple[int, int, float]] = []
+        # Serializes builds and refreshes
+        self._scan_lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Whether the filter has been built and answers lookups."""
+        return self._bloom is not None
+
+    @property
+    def pending_ranges(self) -> list[tuple[int, int]]:
+        """Ranges of user IDs below the high water mark that are rescanned until seen."""
+        return [(first, last) for first, last, _ in self._pending]
+
+    def build(self, db: Session) -> int:
+        """
+        Build the filter from a streaming scan of the users table.
+
+        Gaps in the IDs are left pending only right below users created in
+        the last pending_seconds, since older gaps belong to rolled back
+        inserts rather than open transactions.
+
+        Args:
+            db (Session): Database session to scan with
+
+        Returns:
+            int: Number of users scanned
+        """
+        noticed = time.monotonic()
+        recent_after = datetime.now(timezone.utc) - timedelta(seconds=self.pending_seconds)
+        bloom = BloomFilter(self.capacity, self.error_rate)
+        user_ids = array("q")
+        recent: set[int] = set()
+        rows = db.execute(
+            select(User.id, User.email_canonical, User.created_at).execution_options(yield_per=_SCAN_BATCH_SIZE)
+        )
+        for user_id, email, created_at in rows:
+            if email is not None:
+                bloom.add(email)
+            user_ids.append(user_id)
+            if _is_after(created_at, recent_after):
+                recent.add(user_id)
+
+        pending = []
+        if recent:
+            # Rows arrive in no particular order (one stream per shard); only the
+            # IDs around recent users are sorted to find the gaps below them
+            lowest_recent = min(recent)
+            below = max((user_id for user_id in user_ids if user_id < lowest_recent), default=0)
+            tail = sorted(user_id for user_id in user_ids if user_id >= lowest_recent)
+            for previous, user_id in zip([below] + tail, tail):
+                if user_id > previous + 1 and user_id in recent:
+                    pending.append((previous + 1, user_id - 1, noticed))
+
+        with self._scan_lock:
+            self._bloom = bloom
+            self._high_water = max(user_ids, default=0)
+            self._pending = pending
+        return len(user_ids)
+
+    def add(self, email: str) -> None:
+        """
+        Record a newly registered email.
+
+        Args:
+            email (str): Canonical email
+        """
+        bloom = self._bloom
+        if bloom is not None:
+            bloom.add(email)
+
+    def refresh(self, db: Session) -> int:
+        """
+        Add emails of users committed since the last scan, e.g. by other workers.
+
+        Scans the IDs above the high water mark and the pending ranges below
+        it. IDs skipped over by the newly seen users become pending, and
+        pending ranges are dropped once seen or after pending_seconds.
+
+        Args:
+            db (Session): Database session to scan with
+
+        Returns:
+            int: Number of rows scanned
+        """
+        with self._scan_lock:
+            bloom = self._bloom
+            if bloom is None:
+                return 0
+
+            high_water = self._high_water
+            rows = db.execute(
+                select(User.id, User.email_canonical).where(or_(
+                    User.id > high_water,
+                    *(User.id.between(first, last) for first, last, _ in self._pending),
+                ))
+            ).all()
+            for _, email in rows:
+                if email is not None:
+                    bloom.add(email)
+
+            now = time.monotonic()
+            seen = sorted(user_id for user_id, _ in rows)
+            pending = [
+                (first, last, noticed)
+                for pending_first, pending_last, noticed in self._pending
+                if now - noticed < self.pending_seconds
+                for first, last in _unseen_ranges(pending_first, pending_last, seen)
+            ]
+            top = max(seen[-1] if seen else 0, high_water)
+            pending += [(first, last, now) for first, last in _unseen_ranges(high_water + 1, top, seen)]
+            if len(pending) > _MAX_PENDING_RANGES:
+                pending = [(min(first for first, _, _ in pending), max(last for _, last, _ in pending), now)]
+
+            self._high_water, self._pending = top, pending
+            return len(rows)
+
+    def might_exist(self, email: str) -> bool:
+        """
+        Check whether an email may belong to a registered user.
+
+        Args:
+            email (str): Canonical email
+
+        Returns:
+            bool: False if the email was not registered as of the last refresh
+        """
+        bloom = self._bloom
+        return bloom is None or email in bloom
+
+    def reset(self) -> None:
+        """Drop the filter; every email is possibly present until it is rebuilt."""
+        with self._scan_lock:
+            self._bloom = None
+            self._high_water = 0
+            self._pending = []
+
+
+async def refresh_periodically(email_filter: RegisteredEmailFilter, session_factory: Callable[[], Session],
+                               interval: float) -> None:
+    """
+    Refresh the filter every interval seconds until cancelled.
+
+    Args:
+        email_filter (RegisteredEmailFilter): Filter to refresh
+        session_factory (Callable[[], Session]): Opens a database session for each refresh
+        interval (float): Seconds between refreshes
+    """
+    def refresh() -> None:
+        with session_factory() as db:
+            email_filter.refresh(db)
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh)
+        except Exception:
+            # Keep serving from the current filter; the next refresh covers the same IDs
+            logger.exception("Registered email filter refresh failed")
+
+
+@lru_cache()
+def get_email_filter() -> RegisteredEmailFilter:
+    """
+    Get the process-wide registered email filter with caching.
+
+    Returns:
+        RegisteredEmailFilter: Filter sized by the EMAIL_FILTER_* settings
+    """
+    settings = get_settings()
+    return RegisteredEmailFilter(
+        settings.EMAIL_FILTER_CAPACITY, settings.EMAIL_FILTER_ERROR_RATE, settings.EMAIL_FILTER_PENDING_SECONDS
+    )
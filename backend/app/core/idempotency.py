@@ -0,0 +1,254 @@
+"""
+Idempotency module letting clients safely retry non-idempotent POST requests.
+This module provides a bounded in-memory store of responses keyed by the
+client's Idempotency-Key header and an ASGI middleware that replays the stored
+response for a retried request instead of running the route again.
+
+A key is bound to a fingerprint of the request (method, path and body). Reusing
+it for a different request is rejected, and a retry that arrives while the
+first request is still running gets a 409. Only successful (2xx) responses are
+stored; after an error the key is released so the client can try again.
+Entries live in process memory, so with several workers a retry is only
+deduplicated if it reaches the same worker.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+from backend.app.config import get_settings
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAYED_HEADER = "Idempotent-Replayed"
+
+# OpenAPI parameter for routes served through the middleware
+IDEMPOTENCY_KEY_PARAMETER = {
+    "name": IDEMPOTENCY_KEY_HEADER,
+    "in": "header",
+    "required": False,
+    "schema": {"type": "string", "maxLength": 255},
+    "description": "Client-generated key; retries with the same key and body get the original response",
+}
+
+_KEY_PATTERN = re.compile(r"^[\x21-\x7e]{1,255}$")
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """
+    A response recorded for an idempotency key.
+
+    Attributes:
+        status (int): HTTP status code
+        headers (list[tuple[bytes, bytes]]): Raw response headers
+        body (bytes): Response body
+    """
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+@dataclass(frozen=True)
+class IdempotencyResult:
+    """
+    Outcome of claiming an idempotency key.
+
+    Attributes:
+        state (str): "new" if the caller should run the request, "replay" if a
+            response is stored, "in_progress" if the first request is still
+            running, "mismatch" if the key was used for a different request
+        response (Optional[StoredResponse]): The stored response when state is "replay"
+    """
+    state: str
+    response: Optional[StoredResponse] = None
+
+
+class InMemoryIdempotencyStore:
+    """
+    Idempotency keys and their responses kept in process memory.
+
+    Holds at most max_keys entries, dropping the oldest first, and forgets
+    each entry ttl seconds after it was claimed.
+    """
+
+    def __init__(self, ttl: float = 86400, max_keys: int = 10000):
+        self.ttl = ttl
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # key: [fingerprint, expires_at, StoredResponse or None while running]
+        self._entries: OrderedDict[str, list] = OrderedDict()
+
+    def claim(self, key: str, fingerprint: str, now: Optional[float] = None) -> IdempotencyResult:
+        """
+        Claim a key for a request, or report what is already stored for it.
+
+        Args:
+            key (str): Idempotency key, scoped by the caller (e.g. with the route)
+            fingerprint (str): Hash identifying the request
+            now (Optional[float]): Current UNIX time, defaults to the system clock
+
+        Returns:
+            IdempotencyResult: What the caller should do with the request
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= now:
+                del self._entries[key]
+                entry = None
+
+            if entry is None:
+                self._entries[key] = [fingerprint, now + self.ttl, None]
+                while len(self._entries) > self.max_keys:
+                    self._entries.popitem(last=False)
+                return IdempotencyResult("new")
+
+            if entry[0] != fingerprint:
+                return IdempotencyResult("mismatch")
+            if entry[2] is None:
+                return IdempotencyResult("in_progress")
+            return IdempotencyResult("replay", entry[2])
+
+    def complete(self, key: str, response: StoredResponse) -> None:
+        """
+        Store the response of a claimed key.
+
+        Args:
+            key (str): Idempotency key passed to claim
+            response (StoredResponse): Response to replay for retries
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[2] = response
+
+    def release(self, key: str) -> None:
+        """
+        Forget a claimed key whose request did not succeed.
+
+        Args:
+            key (str): Idempotency key passed to claim
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] is None:
+                del self._entries[key]
+
+    def reset(self) -> None:
+        """Clear all entries."""
+        with self._lock:
+            self._entries.clear()
+
+
+@lru_cache()
+def get_idempotency_store() -> InMemoryIdempotencyStore:
+    """
+    Get the process-wide idempotency store with caching.
+
+    Returns:
+        InMemoryIdempotencyStore: Store sized by IDEMPOTENCY_TTL_SECONDS and IDEMPOTENCY_MAX_KEYS
+    """
+    settings = get_settings()
+    return InMemoryIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_MAX_KEYS)
+
+
+def _json_response(status: int, detail: str, extra_headers: Iterable[tuple[bytes, bytes]] = ()) -> StoredResponse:
+    body = b'{"detail":"' + detail.encode() + b'"}'
+    return StoredResponse(status, [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+        *extra_headers,
+    ], body)
+
+
+async def _send_stored(send, response: StoredResponse, extra_headers: Iterable[tuple[bytes, bytes]] = ()) -> None:
+    await send({"type": "http.response.start", "status": response.status,
+                "headers": [*response.headers, *extra_headers]})
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class IdempotencyMiddleware:
+    """
+    Pure ASGI middleware honouring Idempotency-Key on selected POST routes.
+
+    Requests without the header pass straight through. Replayed responses
+    carry an Idempotent-Replayed: true header.
+    """
+
+    def __init__(self, app: Any, paths: Iterable[str]):
+        self.app = app
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths:
+            return await self.app(scope, receive, send)
+
+        key = None
+        for name, value in scope["headers"]:
+            if name == b"idempotency-key":
+                key = value.decode("latin-1")
+                break
+        if key is None:
+            return await self.app(scope, receive, send)
+        if not _KEY_PATTERN.match(key):
+            return await _send_stored(send, _json_response(400, "Invalid Idempotency-Key header"))
+
+        # Read the whole body to fingerprint it, then hand it to the app unchanged
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(scope["path"].encode() + b"\n" + body).hexdigest()
+
+        store = get_idempotency_store()
+        store_key = f"{scope['path']}:{key}"
+        claimed = store.claim(store_key, fingerprint)
+        if claimed.state == "replay":
+            return await _send_stored(send, claimed.response, [(IDEMPOTENT_REPLAYED_HEADER.lower().encode(), b"true")])
+        if claimed.state == "in_progress":
+            return await _send_stored(send, _json_response(
+                409, "A request with this Idempotency-Key is still being processed", [(b"retry-after", b"1")]))
+        if claimed.state == "mismatch":
+            return await _send_stored(send, _json_response(
+                422, "Idempotency-Key was already used for a different request"))
+
+        body_sent = False
+
+        async def receive_wrapper():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        status = 500
+        headers: list[tuple[bytes, bytes]] = []
+        response_body: list[bytes] = []
+
+        async def send_wrapper(message):
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                response_body.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+            if 200 <= status < 300:
+                store.complete(store_key, StoredResponse(status, headers, b"".join(response_body)))
+                completed = True
+        finally:
+            if not completed:
+                store.release(store_key)
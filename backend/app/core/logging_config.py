@@ -0,0 +1,234 @@
+"""
+Logging configuration module for structured, non-blocking application logs.
+This module routes the application's log records through a bounded queue to a
+background thread that writes them as JSON lines, so logging never blocks the
+event loop on stdout. Records are tagged with the request ID, route and user ID
+of the request that emitted them, and high-volume events can be sampled.
+"""
+
+import copy
+import json
+import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional, TextIO
+from backend.app.config import get_settings
+from backend.app.core.metrics import LOG_RECORDS_DROPPED
+from backend.app.core.tracing import current_span
+
+APP_LOGGER = "backend"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+# Incoming request IDs are reused only if they are short and plain
+_REQUEST_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+# Fields of the request being handled. The dict is shared by every context
+# copied from the request, so a user ID set by a dependency running in the
+# threadpool is visible to the rest of the request.
+_log_context: ContextVar[Optional[dict]] = ContextVar("log_context", default=None)
+
+_listener: Optional[QueueListener] = None
+
+
+def set_log_user(user_id: Optional[int]) -> None:
+    """
+    Attach the authenticated user's ID to the current request's log records.
+
+    Args:
+        user_id (Optional[int]): ID of the user making the request
+    """
+    context = _log_context.get()
+    if context is not None:
+        context["user_id"] = user_id
+
+
+def get_request_id() -> Optional[str]:
+    """
+    Get the ID of the request being handled.
+
+    Returns:
+        Optional[str]: Request ID, or None outside a request
+    """
+    context = _log_context.get()
+    return context["request_id"] if context is not None else None
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Copies the current request's ID, path, route, user ID and trace span onto each record.
+
+    The route template is None for requests answered before routing.
+
+    Runs in the emitting thread, before the record is queued.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        if context is not None:
+            record.request_id = context["request_id"]
+            record.path = context["scope"]["path"]
+            record.route = getattr(context["scope"].get("route"), "path", None)
+            record.user_id = context.get("user_id")
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+            record.span_id = span.span_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Drops a share of records that carry a sample_rate attribute.
+
+    Log high-volume events with extra={"sample_rate": 0.01} to keep about one
+    in a hundred; the rate is written to the kept records.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        sample_rate = getattr(record, "sample_rate", None)
+        return sample_rate is None or random.random() < sample_rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Queue handler that drops records when the queue is full instead of blocking or raising.
+    """
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, while args and exc_info are
+        # still valid, but leave the formatting to the writer thread
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+# LogRecord attributes that are not copied into the JSON output as extra fields
+_RESERVED_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as single-line JSON objects.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            # Records written directly rather than through the queue handler
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+def configure_logging(stream: Optional[TextIO] = None) -> None:
+    """
+    Send application logs through a bounded queue to a JSON writer thread.
+
+    Called from the app's startup hook, after any fork, since the writer
+    thread does not survive forking. Calling it again is a no-op.
+
+    Args:
+        stream (Optional[TextIO]): Where JSON lines are written, defaults to stdout
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    settings = get_settings()
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter())
+
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter())
+    handler.addFilter(RequestContextFilter())
+
+    logger = logging.getLogger(APP_LOGGER)
+    logger.setLevel(settings.LOG_LEVEL)
+    logger.addHandler(handler)
+    logger.propagate = False
+
+    _listener = QueueListener(log_queue, writer, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Flush queued records and stop the writer thread.
+    """
+    global _listener
+    if _listener is None:
+        return
+
+    _listener.stop()
+    logger = logging.getLogger(APP_LOGGER)
+    for handler in [h for h in logger.handlers if isinstance(h, DroppingQueueHandler)]:
+        logger.removeHandler(handler)
+    logger.propagate = True
+    _listener = None
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware assigning each request an ID for its log records.
+
+    A well-formed incoming X-Request-ID is reused so IDs can be followed
+    across services; the ID is echoed in the response headers.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")
+                break
+        if request_id is None or not _REQUEST_ID_PATTERN.match(request_id):
+            request_id = uuid.uuid4().hex
+
+        token = _log_context.set({"request_id": request_id, "scope": scope, "user_id": None})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (REQUEST_ID_HEADER.lower().encode(), request_id.encode()),
+                ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _log_context.reset(token)
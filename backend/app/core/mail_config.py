@@ -1,12 +1,18 @@
 """
 Email configuration and utility module for handling email operations.
 This module provides functionality for configuring and sending emails using FastAPI-Mail.
+The FastAPI-Mail connection is built on first use, so importing this module neither
+requires the mail environment variables nor pays for importing FastAPI-Mail.
 """
 
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
+from typing import TYPE_CHECKING
 from pydantic import EmailStr, SecretStr
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from backend.app.core.tracing import traced
+
+if TYPE_CHECKING:
+    from fastapi_mail import ConnectionConfig
 
 
 # Load email-related environment variables
@@ -23,6 +29,8 @@ class MailSettings(BaseSettings):
     MAIL_SSL_TLS: bool = False
     USE_CREDENTIALS: bool = True
     VALIDATE_CERTS: bool = True
+    # Build messages but skip the SMTP delivery, e.g. for load tests
+    MAIL_SUPPRESS_SEND: bool = False
 
     model_config = {
         "env_file": ".env",
@@ -41,23 +49,37 @@ def get_mail_settings() -> MailSettings:
     return MailSettings() # type: ignore
 
 
-# Use the config to build FastMail connection
-mail_settings = get_mail_settings()
+@lru_cache()
+def get_mail_connection_config() -> "ConnectionConfig":
+    """
+    Build the FastMail connection config on first use and cache it.
+
+    Returns:
+        ConnectionConfig: Connection settings for FastMail
+
+    Raises:
+        pydantic.ValidationError: If required mail settings are missing
+    """
+    from fastapi_mail import ConnectionConfig
 
-conf = ConnectionConfig(
-    MAIL_USERNAME=mail_settings.MAIL_USERNAME,
-    MAIL_PASSWORD=mail_settings.MAIL_PASSWORD,
-    MAIL_FROM=mail_settings.MAIL_FROM,
-    MAIL_PORT=mail_settings.MAIL_PORT,
-    MAIL_SERVER=mail_settings.MAIL_SERVER,
-    MAIL_STARTTLS=mail_settings.MAIL_STARTTLS,
-    MAIL_SSL_TLS=mail_settings.MAIL_SSL_TLS,
-    USE_CREDENTIALS=mail_settings.USE_CREDENTIALS,
-    VALIDATE_CERTS=mail_settings.VALIDATE_CERTS
-)
+    mail_settings = get_mail_settings()
+
+    return ConnectionConfig(
+        MAIL_USERNAME=mail_settings.MAIL_USERNAME,
+        MAIL_PASSWORD=mail_settings.MAIL_PASSWORD,
+        MAIL_FROM=mail_settings.MAIL_FROM,
+        MAIL_PORT=mail_settings.MAIL_PORT,
+        MAIL_SERVER=mail_settings.MAIL_SERVER,
+        MAIL_STARTTLS=mail_settings.MAIL_STARTTLS,
+        MAIL_SSL_TLS=mail_settings.MAIL_SSL_TLS,
+        USE_CREDENTIALS=mail_settings.USE_CREDENTIALS,
+        VALIDATE_CERTS=mail_settings.VALIDATE_CERTS,
+        SUPPRESS_SEND=mail_settings.MAIL_SUPPRESS_SEND
+    )
 
 
 # Send verification email
+@traced("send_verification_email")
 async def send_verification_email(email: EmailStr, code: str):
     """
     Send a verification code email to the specified address.
@@ -69,6 +91,8 @@ async def send_verification_email(email: EmailStr, code: str):
     Note:
         This is an async function and should be awaited when called.
     """
+    from fastapi_mail import FastMail, MessageSchema, MessageType
+
     message = MessageSchema(
         subject="Your Verification Code",
         recipients=[email],
@@ -76,5 +100,5 @@ async def send_verification_email(email: EmailStr, code: str):
         subtype=MessageType.plain
     )
 
-    fm = FastMail(conf)
+    fm = FastMail(get_mail_connection_config())
     await fm.send_message(message)
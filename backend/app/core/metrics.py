@@ -0,0 +1,337 @@
+"""
+Metrics module exposing application counters and histograms in Prometheus text format.
+This module provides lock-free counters and histograms, the metrics tracked for
+the auth hot paths, a timing decorator for security functions and an ASGI
+middleware recording per-route request counts, latency and the SQL statements
+counted by the query recorder.
+
+Every thread writes to its own cell of each metric, so the hot path never
+takes a lock. Cells are summed when /metrics is scraped. Metrics are per
+process: under the multi-worker server each worker reports its own values.
+"""
+
+import functools
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+from backend.app.core.query_recorder import record_queries
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OPERATION_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 4, 5, 8, 13, 21, 34)
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f"{{{pairs}}}" if pairs else ""
+
+
+class _Metric:
+    """
+    Base class holding one cell of values per writing thread.
+
+    A cell maps a tuple of label values to that thread's share of the metric.
+    Only the first write from a new thread takes a lock, to register its cell.
+    """
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._local = threading.local()
+        self._cells: list[dict] = []
+        self._cells_lock = threading.Lock()
+
+    def _cell(self) -> dict:
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = {}
+            with self._cells_lock:
+                self._cells.append(cell)
+            return cell
+
+    def _snapshots(self) -> list[dict]:
+        with self._cells_lock:
+            cells = list(self._cells)
+        # dict.copy() is atomic under the GIL, so a concurrent writer cannot break iteration
+        return [cell.copy() for cell in cells]
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._cells_lock:
+            for cell in self._cells:
+                cell.clear()
+
+    def render(self) -> list[str]:
+        """Render the metric as Prometheus exposition lines."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing counter.
+    """
+
+    type_name = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        """
+        Increment the counter.
+
+        Args:
+            *labels (str): Label values, in the order of labelnames
+            amount (float): Amount to add
+        """
+        cell = self._cell()
+        cell[labels] = cell.get(labels, 0.0) + amount
+
+    def _totals(self) -> dict[tuple, float]:
+        totals: dict[tuple, float] = {}
+        for cell in self._snapshots():
+            for labels, value in cell.items():
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def value(self, *labels: str) -> float:
+        """
+        Get the current value summed across threads.
+
+        Args:
+            *labels (str): Label values
+
+        Returns:
+            float: Counter value
+        """
+        return self._totals().get(labels, 0.0)
+
+    def render(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            for labels, value in sorted(self._totals().items())
+        ]
+
+
+class Histogram(_Metric):
+    """
+    Histogram of observed values over fixed upper-bound buckets.
+
+    Each cell stores per-bucket (non-cumulative) counts followed by the +Inf
+    bucket and the running sum; buckets are made cumulative when rendered.
+    """
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        """
+        Record an observation.
+
+        Args:
+            value (float): Observed value
+            *labels (str): Label values, in the order of labelnames
+        """
+        cell = self._cell()
+        slots = cell.get(labels)
+        if slots is None:
+            slots = cell[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        slots[bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def time(self, *labels: str) -> Callable:
+        """
+        Decorator recording how long each call of the wrapped function takes.
+
+        Args:
+            *labels (str): Label values for the observations
+
+        Returns:
+            Callable: Decorator
+        """
+        def decorator(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, *labels)
+            return wrapper
+        return decorator
+
+    def _totals(self) -> dict[tuple, list]:
+        totals: dict[tuple, list] = {}
+        for cell in self._snapshots():
+            for labels, slots in cell.items():
+                slots = list(slots)
+                if labels in totals:
+                    totals[labels] = [a + b for a, b in zip(totals[labels], slots)]
+                else:
+                    totals[labels] = slots
+        return totals
+
+    def count(self, *labels: str) -> int:
+        """
+        Get the number of observations summed across threads.
+
+        Args:
+            *labels (str): Label values
+
+        Returns:
+            int: Number of observations
+        """
+        slots = self._totals().get(labels)
+        return int(sum(slots[:-1])) if slots else 0
+
+    def render(self) -> list[str]:
+        lines = []
+        bounds = [*self.buckets, float("inf")]
+        for labels, slots in sorted(self._totals().items()):
+            cumulative = 0
+            for bound, count in zip(bounds, slots):
+                cumulative += count
+                bucket_labels = _format_labels((*self.labelnames, "le"), (*labels, _format_value(bound)))
+                lines.append(f"{self.name}_bucket{bucket_labels} {_format_value(cumulative)}")
+            label_text = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{label_text} {_format_value(slots[-1])}")
+            lines.append(f"{self.name}_count{label_text} {_format_value(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together on /metrics.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> Any:
+        """
+        Add a metric to the registry.
+
+        Args:
+            metric (_Metric): The metric to add
+
+        Returns:
+            _Metric: The same metric, for assignment at module level
+
+        Raises:
+            ValueError: If a metric with the same name is already registered
+        """
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def reset(self) -> None:
+        """Drop the recorded values of every metric."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """
+        Render every metric in Prometheus text exposition format.
+
+        Returns:
+            str: The exposition text
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.register(Counter(
+    "http_requests_total", "HTTP requests handled", ("method", "route", "status")))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route")))
+DB_QUERIES_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per HTTP request", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS))
+DB_QUERY_SECONDS_PER_REQUEST = REGISTRY.register(Histogram(
+    "db_query_duration_seconds_per_request", "Time spent executing SQL statements per HTTP request", ("method", "route"),
+    buckets=OPERATION_BUCKETS))
+AUTH_OPERATION_SECONDS = REGISTRY.register(Histogram(
+    "auth_operation_duration_seconds", "Time spent in password hashing and JWT operations", ("operation",),
+    buckets=OPERATION_BUCKETS))
+LOGIN_ATTEMPTS = REGISTRY.register(Counter(
+    "auth_login_attempts_total", "Login attempts by outcome", ("result",)))
+LOG_RECORDS_DROPPED = REGISTRY.register(Counter(
+    "log_records_dropped_total", "Log records dropped because the log queue was full"))
+SPANS_DROPPED = REGISTRY.register(Counter(
+    "tracing_spans_dropped_total", "Spans dropped because the span export queue was full"))
+
+
+def timed(operation: str) -> Callable:
+    """
+    Decorator timing a security operation into auth_operation_duration_seconds.
+
+    Args:
+        operation (str): Value of the operation label
+
+    Returns:
+        Callable: Decorator
+    """
+    return AUTH_OPERATION_SECONDS.time(operation)
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording request counts, latency and SQL statement counts per route.
+
+    Requests are labelled with the matched route template rather than the raw
+    path, so path parameters and unknown URLs cannot grow the label set.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with record_queries() as queries:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                elapsed = time.perf_counter() - start
+
+                method = scope["method"]
+                route = getattr(scope.get("route"), "path", "unmatched")
+                HTTP_REQUESTS.inc(method, route, str(status_code))
+                HTTP_REQUEST_SECONDS.observe(elapsed, method, route)
+                DB_QUERIES_PER_REQUEST.observe(queries.count, method, route)
+                DB_QUERY_SECONDS_PER_REQUEST.observe(queries.seconds, method, route)
@@ -0,0 +1,280 @@
+"""
+Request profiling module for sampling where a slow request spends its time.
+This module provides a stack-sampling profiler, signed tokens that enable it
+for a single request, an on-disk ring buffer of collapsed-stack profiles and
+the ASGI middleware tying them together.
+
+Profiles use the collapsed ("folded") stack format, one `frame;frame;frame count`
+line per distinct stack, which flamegraph.pl and speedscope read directly.
+When profiling is disabled the middleware costs one settings lookup per request.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+from starlette.concurrency import run_in_threadpool
+from backend.app.config import get_settings
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# Only threads currently running code from the application package are sampled
+APP_ROOT = str(Path(__file__).resolve().parents[1])
+
+_PROFILE_ID_PATTERN = re.compile(r"^\d+-\d+$")
+
+
+def sign_profile_token(expires_at: int, secret: Optional[str] = None) -> str:
+    """
+    Create a value for the X-Profile header that enables profiling until it expires.
+
+    Args:
+        expires_at (int): Unix timestamp after which the token is rejected
+        secret (Optional[str]): Signing key, defaults to PROFILING_SECRET
+
+    Returns:
+        str: Token in the form "<expires_at>.<signature>"
+    """
+    key = (secret or get_settings().PROFILING_SECRET or "").encode()
+    signature = hmac.new(key, str(expires_at).encode(), hashlib.sha256).hexdigest()
+    return f"{expires_at}.{signature}"
+
+
+def verify_profile_token(token: str, now: Optional[float] = None) -> bool:
+    """
+    Check an X-Profile header value.
+
+    Args:
+        token (str): Header value
+        now (Optional[float]): Current Unix time, defaults to time.time()
+
+    Returns:
+        bool: True if the token is correctly signed and not expired
+    """
+    secret = get_settings().PROFILING_SECRET
+    if not secret:
+        return False
+
+    expires_at, _, _ = token.partition(".")
+    if not expires_at.isdigit() or int(expires_at) < (time.time() if now is None else now):
+        return False
+    return hmac.compare_digest(token, sign_profile_token(int(expires_at), secret))
+
+
+class StackSampler:
+    """
+    Background thread that periodically records the stacks of application threads.
+
+    A thread is sampled when its stack contains a frame from the application
+    package, which covers both the event loop while it runs the request and
+    threadpool workers running sync routes. Other requests being handled by
+    the same worker at the same time can show up in the profile as well.
+    """
+
+    def __init__(self, interval: float = 0.005, root: str = APP_ROOT):
+        self.interval = interval
+        self.root = root
+        self.stacks: dict[str, int] = {}
+        self.samples = 0
+        self.duration = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._started_at = 0.0
+
+    def start(self) -> None:
+        """Start sampling."""
+        self._started_at = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread to exit."""
+        self.duration = time.perf_counter() - self._started_at
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self) -> None:
+        """Record one sample of every application thread."""
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        sampler_code = StackSampler._run.__code__
+
+        for ident, frame in sys._current_frames().items():
+            frames = []
+            in_app = False
+            while frame is not None:
+                code = frame.f_code
+                if code is sampler_code:
+                    break
+                in_app = in_app or code.co_filename.startswith(self.root)
+                frames.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}")
+                frame = frame.f_back
+            else:
+                if in_app:
+                    frames.append(names.get(ident, str(ident)))
+                    stack = ";".join(reversed(frames))
+                    self.stacks[stack] = self.stacks.get(stack, 0) + 1
+                    self.samples += 1
+
+    def collapsed(self) -> str:
+        """
+        Render the samples in collapsed stack format.
+
+        Returns:
+            str: One "stack count" line per distinct stack
+        """
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+
+class ProfileStore:
+    """
+    Directory holding the most recent profiles, oldest evicted first.
+
+    Each profile is a .folded file with a .json metadata sidecar. IDs start
+    with a nanosecond timestamp, so sorting them orders profiles by age.
+    """
+
+    def __init__(self, directory: str, max_profiles: int):
+        self.directory = Path(directory)
+        self.max_profiles = max_profiles
+
+    def save(self, collapsed: str, metadata: dict) -> str:
+        """
+        Write a profile and evict the oldest ones beyond the limit.
+
+        Args:
+            collapsed (str): Profile in collapsed stack format
+            metadata (dict): Request details stored next to the profile
+
+        Returns:
+            str: ID of the stored profile
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{time.time_ns()}-{os.getpid()}"
+        metadata = {"id": profile_id, **metadata}
+
+        for suffix, content in ((".folded", collapsed), (".json", json.dumps(metadata))):
+            temp_path = self.directory / f".{profile_id}{suffix}.tmp"
+            temp_path.write_text(content)
+            os.replace(temp_path, self.directory / f"{profile_id}{suffix}")
+
+        for stale_id in self._ids()[:-self.max_profiles or None]:
+            for suffix in (".json", ".folded"):
+                (self.directory / f"{stale_id}{suffix}").unlink(missing_ok=True)
+        return profile_id
+
+    def _ids(self) -> list[str]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(
+            (path.stem for path in self.directory.glob("*.json") if _PROFILE_ID_PATTERN.match(path.stem)),
+            key=lambda profile_id: tuple(int(part) for part in profile_id.split("-")),
+        )
+
+    def list(self) -> list[dict]:
+        """
+        Get the metadata of every stored profile, newest first.
+
+        Returns:
+            list[dict]: Profile metadata
+        """
+        profiles = []
+        for profile_id in reversed(self._ids()):
+            try:
+                profiles.append(json.loads((self.directory / f"{profile_id}.json").read_text()))
+            except (OSError, ValueError):
+                continue  # evicted by another worker while listing
+        return profiles
+
+    def path(self, profile_id: str) -> Optional[Path]:
+        """
+        Get the collapsed stack file of a profile.
+
+        Args:
+            profile_id (str): Profile ID
+
+        Returns:
+            Optional[Path]: Path to the file, or None if there is no such profile
+        """
+        if not _PROFILE_ID_PATTERN.match(profile_id):
+            return None
+        path = self.directory / f"{profile_id}.folded"
+        return path if path.is_file() else None
+
+
+def get_profile_store() -> ProfileStore:
+    """
+    Get the profile store configured in settings.
+
+    Returns:
+        ProfileStore: Store for PROFILING_DIR holding up to PROFILING_MAX_PROFILES profiles
+    """
+    settings = get_settings()
+    return ProfileStore(settings.PROFILING_DIR, settings.PROFILING_MAX_PROFILES)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling requests that carry a valid X-Profile token or are sampled.
+
+    Profiled responses carry an X-Profile-Id header naming the stored profile.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    def _should_profile(self, scope, settings) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return verify_profile_token(value.decode("latin-1"))
+        return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        settings = get_settings()
+        if not settings.PROFILING_ENABLED or not self._should_profile(scope, settings):
+            return await self.app(scope, receive, send)
+
+        store = get_profile_store()
+        profile_id = None
+        status_code = 500
+        sampler = StackSampler(settings.PROFILING_INTERVAL_SECONDS)
+
+        async def send_wrapper(message):
+            nonlocal profile_id, status_code
+            if message["type"] == "http.response.start":
+                # The handler has finished; store the profile before the response goes out.
+                # Joining waits for any stack walk in progress, so it runs off the event loop
+                await run_in_threadpool(sampler.stop)
+                status_code = message["status"]
+                profile_id = await run_in_threadpool(store.save, sampler.collapsed(), {
+                    "created_at": time.time(),
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": status_code,
+                    "duration_ms": round(sampler.duration * 1000, 3),
+                    "samples": sampler.samples,
+                })
+                message = {**message, "headers": [
+                    *message.get("headers", []),
+                    (PROFILE_ID_HEADER.lower().encode(), profile_id.encode()),
+                ]}
+            await send(message)
+
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profile_id is None:
+                await run_in_threadpool(sampler.stop)
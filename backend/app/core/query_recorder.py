@@ -0,0 +1,210 @@
+"""
+Query recorder module counting and timing SQL statements.
+This module listens to SQLAlchemy events on every Engine and attributes each
+statement to the recorders active at the time: per-request recorders bound to
+the current context, and process-wide captures used by tests and scripts.
+It also provides the debug response headers and a query budget assertion.
+
+Transaction control statements (BEGIN, SAVEPOINT, RELEASE, ROLLBACK TO) are
+not recorded, so counts do not change when a session runs inside a savepoint,
+as it does in the test suite.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.app.config import get_settings
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+@dataclass
+class QueryStats:
+    """
+    Statements recorded by one recorder.
+
+    Attributes:
+        count (int): Number of statements executed, including failed ones
+        seconds (float): Total time spent executing them
+        statements (list[str]): SQL text of each statement, if kept
+        keep_statements (bool): Whether statement text is stored
+        parent (Optional[QueryStats]): Enclosing recorder in the same context
+    """
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+    keep_statements: bool = False
+    parent: Optional["QueryStats"] = field(default=None, repr=False)
+
+    def record(self, statement: str, seconds: float) -> None:
+        """
+        Add one statement to this recorder and its enclosing ones.
+
+        Args:
+            statement (str): SQL text
+            seconds (float): Execution time
+        """
+        stats: Optional[QueryStats] = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            if stats.keep_statements:
+                stats.statements.append(statement)
+            stats = stats.parent
+
+
+# Recorder for the current request; sync routes run in a copy of the request's
+# context, so statements from the threadpool land in the same object
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+# Process-wide captures, replaced as a whole so the listener can read it without a lock
+_captures: tuple[QueryStats, ...] = ()
+_captures_lock = threading.Lock()
+
+_START_TIMES_KEY = "query_recorder_start_times"
+
+_TRANSACTION_CONTROL = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+
+
+def _record(statement: str, seconds: float) -> None:
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, seconds)
+    for capture in _captures:
+        capture.record(statement, seconds)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if statement.startswith(_TRANSACTION_CONTROL):
+        return
+    conn.info.setdefault(_START_TIMES_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if statement.startswith(_TRANSACTION_CONTROL):
+        return
+    _record(statement, time.perf_counter() - conn.info[_START_TIMES_KEY].pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    # Failed statements (e.g. a rejected INSERT) still cost a round trip
+    conn = exception_context.connection
+    start_times = conn.info.get(_START_TIMES_KEY) if conn is not None else None
+    statement = exception_context.statement
+    if start_times and statement is not None and not statement.startswith(_TRANSACTION_CONTROL):
+        _record(statement, time.perf_counter() - start_times.pop())
+
+
+@contextmanager
+def record_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Record the statements executed in the current context.
+
+    Recorders nest: statements are also counted by any enclosing recorder.
+
+    Args:
+        keep_statements (bool): Store the SQL text of each statement
+
+    Yields:
+        QueryStats: Stats filled in as statements run
+    """
+    stats = QueryStats(keep_statements=keep_statements, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    """
+    Get the innermost recorder of the current context.
+
+    Returns:
+        Optional[QueryStats]: The active recorder, or None outside of one
+    """
+    return _current.get()
+
+
+@contextmanager
+def capture_queries(keep_statements: bool = True) -> Iterator[QueryStats]:
+    """
+    Record every statement executed in this process, from any thread or context.
+
+    Used where the code under test runs outside the caller's context, such as
+    requests made through the TestClient.
+
+    Args:
+        keep_statements (bool): Store the SQL text of each statement
+
+    Yields:
+        QueryStats: Stats filled in as statements run
+    """
+    global _captures
+    stats = QueryStats(keep_statements=keep_statements)
+    with _captures_lock:
+        _captures = (*_captures, stats)
+    try:
+        yield stats
+    finally:
+        with _captures_lock:
+            _captures = tuple(capture for capture in _captures if capture is not stats)
+
+
+@contextmanager
+def assert_max_queries(max_queries: int) -> Iterator[QueryStats]:
+    """
+    Fail if the block executes more than a budgeted number of statements.
+
+    Args:
+        max_queries (int): Maximum number of statements allowed
+
+    Yields:
+        QueryStats: Stats of the statements executed in the block
+
+    Raises:
+        AssertionError: If the budget is exceeded, listing the statements run
+
+    Example:
+        with assert_max_queries(2):
+            client.post("/auth/register", json=...)
+    """
+    with capture_queries() as stats:
+        yield stats
+
+    if stats.count > max_queries:
+        executed = "\n".join(f"  {number}. {statement}" for number, statement in enumerate(stats.statements, 1))
+        raise AssertionError(f"Expected at most {max_queries} queries, {stats.count} were executed:\n{executed}")
+
+
+class QueryDebugHeadersMiddleware:
+    """
+    Pure ASGI middleware adding per-request statement count and time headers when DEBUG is on.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not get_settings().DEBUG:
+            return await self.app(scope, receive, send)
+
+        with record_queries() as stats:
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER.lower().encode(), str(stats.count).encode()))
+                    headers.append((QUERY_TIME_HEADER.lower().encode(), f"{stats.seconds * 1000:.3f}".encode()))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
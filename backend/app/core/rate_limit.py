@@ -0,0 +1,239 @@
+"""
+Rate limiting module for throttling abuse-prone authentication endpoints.
+This module provides sliding-window rate limiting with an in-memory, lock-sharded
+backend for single-process deployments and a shared Redis-compatible backend for
+multi-worker deployments.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+from backend.app.config import get_settings
+
+_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    """
+    A request limit over a time window.
+
+    Attributes:
+        limit (int): Maximum number of requests allowed per window
+        window (int): Window length in seconds
+    """
+    limit: int
+    window: int
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    """
+    Outcome of counting one request against a rate limit.
+
+    Attributes:
+        allowed (bool): Whether the request is within the limit
+        limit (int): Maximum number of requests allowed per window
+        remaining (int): Requests left in the current window
+        reset (int): Seconds until the current window ends
+    """
+    allowed: bool
+    limit: int
+    remaining: int
+    reset: int
+
+
+@lru_cache(maxsize=64)
+def parse_rate_limit(value: str) -> RateLimit:
+    """
+    Parse a limit string such as "10/minute" or "100/hour".
+
+    Args:
+        value (str): Limit in "<count>/<second|minute|hour|day>" form
+
+    Returns:
+        RateLimit: The parsed limit
+
+    Raises:
+        ValueError: If the string is not a valid limit
+    """
+    match = re.fullmatch(r"\s*(\d+)\s*/\s*(second|minute|hour|day)s?\s*", value)
+    if not match:
+        raise ValueError(f"Invalid rate limit: {value!r}")
+    return RateLimit(limit=int(match.group(1)), window=_PERIODS[match.group(2)])
+
+
+def _sliding_window_result(previous: int, current: int, rate: RateLimit, now: float) -> RateLimitResult:
+    """
+    Weight the previous window's count by how much of it still overlaps the sliding window.
+    """
+    elapsed = now % rate.window
+    estimated = previous * (rate.window - elapsed) / rate.window + current
+    return RateLimitResult(
+        allowed=estimated <= rate.limit,
+        limit=rate.limit,
+        remaining=max(0, int(rate.limit - estimated)),
+        reset=max(1, int(rate.window - elapsed)),
+    )
+
+
+class InMemoryRateLimitBackend:
+    """
+    Sliding-window counters kept in process memory.
+
+    Keys are spread over independently locked shards so concurrent requests
+    for different clients rarely contend on the same lock.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self._shards = [(threading.Lock(), {}) for _ in range(shards)]
+        self._max_keys_per_shard = max_keys_per_shard
+
+    def hit(self, key: str, rate: RateLimit, now: Optional[float] = None) -> RateLimitResult:
+        """
+        Count one request for a key and report whether it is allowed.
+
+        Args:
+            key (str): Client key, e.g. "login:ip:203.0.113.7"
+            rate (RateLimit): Limit to apply to the key
+            now (Optional[float]): Current UNIX time, defaults to the system clock
+
+        Returns:
+            RateLimitResult: The limit state after counting the request
+        """
+        now = time.time() if now is None else now
+        window = int(now // rate.window)
+        lock, counters = self._shards[hash(key) % len(self._shards)]
+
+        with lock:
+            # entry: [window index, current count, previous count, window length]
+            entry = counters.get(key)
+            if entry is None or entry[0] < window - 1:
+                entry = [window, 0, 0, rate.window]
+            elif entry[0] == window - 1:
+                entry = [window, 0, entry[1], rate.window]
+            entry[1] += 1
+            counters[key] = entry
+
+            if len(counters) > self._max_keys_per_shard:
+                self._prune(counters, now)
+
+            return _sliding_window_result(entry[2], entry[1], rate, now)
+
+    @staticmethod
+    def _prune(counters: dict, now: float) -> None:
+        """Drop keys whose windows no longer affect the sliding estimate."""
+        for key, entry in list(counters.items()):
+            if entry[0] < int(now // entry[3]) - 1:
+                del counters[key]
+
+    def reset(self) -> None:
+        """Clear all counters."""
+        for lock, counters in self._shards:
+            with lock:
+                counters.clear()
+
+
+class SharedRateLimitBackend:
+    """
+    Sliding-window counters stored in a Redis-compatible server.
+
+    Counters are shared by every worker process. The client only needs
+    `incr`, `expire` and `get`, so a small local stand-in can be used in tests.
+    """
+
+    def __init__(self, client: Any, prefix: str = "ratelimit:"):
+        self._client = client
+        self._prefix = prefix
+
+    def hit(self, key: str, rate: RateLimit, now: Optional[float] = None) -> RateLimitResult:
+        """
+        Count one request for a key and report whether it is allowed.
+
+        Args:
+            key (str): Client key, e.g. "login:ip:203.0.113.7"
+            rate (RateLimit): Limit to apply to the key
+            now (Optional[float]): Current UNIX time, defaults to the system clock
+
+        Returns:
+            RateLimitResult: The limit state after counting the request
+        """
+        now = time.time() if now is None else now
+        window = int(now // rate.window)
+        current_key = f"{self._prefix}{key}:{window}"
+
+        current = int(self._client.incr(current_key))
+        if current == 1:
+            self._client.expire(current_key, rate.window * 2)
+        previous = int(self._client.get(f"{self._prefix}{key}:{window - 1}") or 0)
+
+        return _sliding_window_result(previous, current, rate, now)
+
+    def reset(self) -> None:
+        """Shared counters expire on their own; nothing to clear locally."""
+
+
+class RateLimiter:
+    """
+    Applies the per-route limits configured in Settings to a counter backend.
+    """
+
+    def __init__(self, backend: Any):
+        self.backend = backend
+
+    def hit(self, route: str, keys: list[str], now: Optional[float] = None) -> Optional[RateLimitResult]:
+        """
+        Count a request against every key for a route.
+
+        Args:
+            route (str): Route name matching a RATE_LIMIT_<ROUTE> setting
+            keys (list[str]): Client identities, e.g. ["ip:203.0.113.7", "email:a@b.com"]
+            now (Optional[float]): Current UNIX time, defaults to the system clock
+
+        Returns:
+            Optional[RateLimitResult]: The most restrictive result, or None when
+            rate limiting is disabled or the route has no limit
+        """
+        settings = get_settings()
+        if not settings.RATE_LIMIT_ENABLED:
+            return None
+
+        configured = getattr(settings, f"RATE_LIMIT_{route.upper()}", None)
+        if not configured:
+            return None
+        rate = parse_rate_limit(configured)
+
+        results = [self.backend.hit(f"{route}:{key}", rate, now) for key in keys]
+        return min(results, key=lambda result: (result.allowed, result.remaining))
+
+    def reset(self) -> None:
+        """Clear all locally held counters."""
+        self.backend.reset()
+
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide rate limiter with caching.
+
+    Returns:
+        RateLimiter: Limiter using the backend selected by RATE_LIMIT_BACKEND
+
+    Raises:
+        RuntimeError: If the shared backend is selected but unavailable
+    """
+    settings = get_settings()
+
+    if settings.RATE_LIMIT_BACKEND == "redis":
+        if not settings.RATE_LIMIT_REDIS_URL:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL must be set when RATE_LIMIT_BACKEND is 'redis'")
+        try:
+            import redis
+        except ImportError as exc:
+            raise RuntimeError("The redis package is required for the shared rate limit backend. Install it with: pip install redis") from exc
+        return RateLimiter(SharedRateLimitBackend(redis.Redis.from_url(settings.RATE_LIMIT_REDIS_URL)))
+
+    return RateLimiter(InMemoryRateLimitBackend())
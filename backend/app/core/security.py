@@ -2,16 +2,28 @@
 Security module for handling password hashing and JWT token operations.
 This module provides functionality for secure password management and JWT-based authentication.
 """
+import logging
+import secrets
 from passlib.context import CryptContext
 from jose import jwt
 from jose.exceptions import JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta, timezone
 from backend.app.config import get_settings
+from backend.app.core.metrics import timed
+from backend.app.core.tracing import traced
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
+# Values of the "type" claim, so a token of one kind is never accepted as the other
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 # Use bcrypt for secure password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+@timed("hash_password")
+@traced("hash_password")
 def hash_password(password: str) -> str:
     """
     Hash a password using bcrypt.
@@ -24,6 +36,8 @@ def hash_password(password: str) -> str:
     """
     return pwd_context.hash(password)
 
+@timed("verify_password")
+@traced("verify_password")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     Verify a password against its hash.
@@ -37,6 +51,19 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+@timed("verify_password")
+@traced("verify_password")
+def dummy_verify_password() -> None:
+    """
+    Run a password check against a dummy hash at the current bcrypt cost.
+
+    Used when there is no user to check against, so rejecting an unknown
+    email takes as long as rejecting a wrong password.
+    """
+    pwd_context.dummy_verify()
+
+@timed("create_access_token")
+@traced("create_access_token")
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Create a JWT access token.
@@ -56,12 +83,17 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.now(timezone.utc) + expires_delta
     else:
         expire = datetime.now(timezone.utc) + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "type": ACCESS_TOKEN_TYPE})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
 
+@timed("create_refresh_token")
+@traced("create_refresh_token")
 def create_refresh_token(data: dict) -> str:
     """
     Create a JWT refresh token with longer expiration.
+
+    Each token carries a random jti, so tokens issued to the same user within
+    the same second still differ and rotation always yields a new token.
     
     Args:
         data (dict): The data to encode in the token
@@ -72,26 +104,51 @@ def create_refresh_token(data: dict) -> str:
     settings = get_settings()
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp": expire})
+    to_encode.update({"exp": expire, "jti": secrets.token_urlsafe(16), "type": REFRESH_TOKEN_TYPE})
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.ALGORITHM)
 
-def verify_token(token: str) -> Optional[dict]:
+def token_type(payload: dict) -> str:
+    """
+    Get the kind of a decoded token.
+
+    Tokens issued before the "type" claim existed are told apart by the jti
+    that only refresh tokens carry.
+
+    Args:
+        payload (dict): Decoded token payload
+
+    Returns:
+        str: ACCESS_TOKEN_TYPE or REFRESH_TOKEN_TYPE
+    """
+    return payload.get("type") or (REFRESH_TOKEN_TYPE if "jti" in payload else ACCESS_TOKEN_TYPE)
+
+@timed("verify_token")
+@traced("verify_token")
+def verify_token(token: str, expected_type: Optional[str] = None) -> Optional[dict]:
     """
     Verify and decode a JWT token.
     
     Args:
         token (str): The JWT token to verify
+        expected_type (Optional[str]): Token kind to accept, ACCESS_TOKEN_TYPE or REFRESH_TOKEN_TYPE; any when None
         
     Returns:
-        Optional[dict]: The decoded token payload if valid, None if invalid
+        Optional[dict]: The decoded token payload if valid, None if invalid or of another kind
     """
     try:
         payload = jwt.decode(token, get_settings().JWT_SECRET, algorithms=[get_settings().ALGORITHM])
+        if expected_type is not None and token_type(payload) != expected_type:
+            logger.warning("Wrong token type", extra={
+                "event": "token_wrong_type", "sample_rate": get_settings().LOG_INVALID_TOKEN_SAMPLE_RATE})
+            return None
         return payload
     except ExpiredSignatureError:
-        print("Token expired")
+        # Sampled: a client retrying with a stale token can produce these at request rate
+        logger.info("Token expired", extra={
+            "event": "token_expired", "sample_rate": get_settings().LOG_INVALID_TOKEN_SAMPLE_RATE})
         return None
     except JWTError:
-        print("Invalid token")
+        logger.warning("Invalid token", extra={
+            "event": "token_invalid", "sample_rate": get_settings().LOG_INVALID_TOKEN_SAMPLE_RATE})
         return None
 
@@ -0,0 +1,115 @@
+"""
+Single-flight module coalescing concurrent calls that do the same work.
+This module runs one call per key at a time: callers arriving while it runs
+wait for it and share its result, and a successful result is kept for a short
+grace window so callers arriving just after it finished get it too.
+
+It is used for refresh token rotation, where several tabs refreshing with the
+same cookie would otherwise race to rotate it and all but one would be logged
+out. Results are kept in process memory, so with several workers only calls
+that reach the same worker are coalesced.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Callable, Optional
+from backend.app.config import get_settings
+
+
+class _Flight:
+    """A call in progress and its outcome."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time and briefly reuses its result.
+
+    Results of None are not kept, so a failed attempt (e.g. an unknown token)
+    is not replayed to later callers. Callers wait at most wait_timeout seconds
+    for a running call, so a stalled one cannot tie up a thread per waiter.
+    """
+
+    def __init__(self, grace_seconds: float, max_results: int = 10000, wait_timeout: Optional[float] = None):
+        self.grace_seconds = grace_seconds
+        self.max_results = max_results
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, _Flight] = {}
+        # key: (expires_at, result), oldest first
+        self._results: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def run(self, key: str, func: Callable[[], Any], now: Optional[float] = None) -> Any:
+        """
+        Call func unless a call for the key is running or finished within the grace window.
+
+        Args:
+            key (str): Identity of the work, e.g. a token hash
+            func (Callable[[], Any]): Does the work; called at most once per flight
+            now (Optional[float]): Current monotonic time, defaults to time.monotonic()
+
+        Returns:
+            Any: Result of func, from this call or a coalesced one
+
+        Raises:
+            TimeoutError: If a running call did not finish within wait_timeout
+            BaseException: Whatever func raised, for the caller and everyone waiting on it
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            cached = self._results.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    return cached[1]
+                del self._results[key]
+
+            flight = self._in_flight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(self.wait_timeout):
+                raise TimeoutError(f"Call for {key!r} still running after {self.wait_timeout}s")
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except BaseException as error:
+            flight.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+                if flight.result is not None and self.grace_seconds > 0:
+                    self._results[key] = (now + self.grace_seconds, flight.result)
+                    while len(self._results) > self.max_results:
+                        self._results.popitem(last=False)
+            flight.done.set()
+        return flight.result
+
+    def reset(self) -> None:
+        """Forget all kept results."""
+        with self._lock:
+            self._results.clear()
+
+
+@lru_cache()
+def get_refresh_single_flight() -> SingleFlight:
+    """
+    Get the process-wide coalescer for refresh token rotation with caching.
+
+    Returns:
+        SingleFlight: Coalescer keeping results for REFRESH_GRACE_SECONDS and
+            waiting up to REFRESH_WAIT_SECONDS for a running rotation
+    """
+    settings = get_settings()
+    return SingleFlight(settings.REFRESH_GRACE_SECONDS, wait_timeout=settings.REFRESH_WAIT_SECONDS)
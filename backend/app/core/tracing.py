@@ -0,0 +1,423 @@
+"""
+Tracing module recording request spans without an external collector.
+This module provides spans linked into traces, W3C traceparent propagation,
+pluggable exporters (in-memory and JSON lines file), an ASGI middleware
+opening a root span per request, a decorator for child spans and SQLAlchemy
+listeners adding a span per SQL statement.
+
+Spans of a request are buffered on the trace and exported together when the
+root span ends. Outside a traced request, instrumentation only costs a context
+variable lookup.
+"""
+
+import asyncio
+import functools
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from backend.app.config import get_settings
+from backend.app.core.metrics import SPANS_DROPPED
+
+TRACEPARENT_HEADER = "traceparent"
+
+_TRACEPARENT_PATTERN = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_SAMPLED_FLAG = 0x01
+_MAX_STATEMENT_LENGTH = 1000
+
+
+@dataclass
+class Span:
+    """
+    A timed operation within a trace.
+
+    Attributes:
+        trace_id (str): 32 hex digit ID shared by every span of the trace
+        span_id (str): 16 hex digit ID of this span
+        parent_id (Optional[str]): ID of the parent span, None for a root without a remote parent
+        name (str): Operation name
+        start_ns (int): Start time in Unix nanoseconds
+        end_ns (int): End time in Unix nanoseconds, 0 while running
+        status (str): "ok" or "error"
+        attributes (dict): Operation details
+        trace (list[Span]): Finished spans of the trace, shared by all its spans
+    """
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    name: str
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    status: str = "ok"
+    attributes: dict = field(default_factory=dict)
+    trace: list["Span"] = field(default_factory=list, repr=False)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def child(self, name: str, attributes: Optional[dict] = None) -> "Span":
+        """
+        Start a child span in the same trace.
+
+        Args:
+            name (str): Operation name
+            attributes (Optional[dict]): Operation details
+
+        Returns:
+            Span: The running child span
+        """
+        return Span(self.trace_id, _new_span_id(), self.span_id, name, attributes=attributes or {}, trace=self.trace)
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """
+        End the span and add it to its trace.
+
+        Args:
+            error (Optional[BaseException]): Exception that ended the operation, if any
+        """
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        self.trace.append(self)
+
+    def to_dict(self) -> dict:
+        """
+        Convert the span to a JSON-serializable dict.
+
+        Returns:
+            dict: Span fields without the trace buffer
+        """
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "start_ns": self.start_ns,
+            "duration_ms": round(self.duration_ms, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def _new_trace_id() -> str:
+    return f"{random.getrandbits(128):032x}"
+
+
+def _new_span_id() -> str:
+    return f"{random.getrandbits(64):016x}"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """
+    Get the span the current code runs in.
+
+    Returns:
+        Optional[Span]: Innermost running span, or None outside a traced request
+    """
+    return _current_span.get()
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple[str, str, bool]]:
+    """
+    Parse a W3C traceparent header.
+
+    Args:
+        value (Optional[str]): Header value
+
+    Returns:
+        Optional[tuple[str, str, bool]]: Trace ID, parent span ID and sampled
+        flag, or None if the header is missing or malformed
+    """
+    match = _TRACEPARENT_PATTERN.match(value.strip().lower()) if value else None
+    if match is None:
+        return None
+    trace_id, parent_id, flags = match.groups()
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id, bool(int(flags, 16) & _SAMPLED_FLAG)
+
+
+@contextmanager
+def start_span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Run a block as a child of the current span.
+
+    Args:
+        name (str): Operation name
+        **attributes: Operation details
+
+    Yields:
+        Optional[Span]: The child span, or None outside a traced request
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+
+    span = parent.child(name, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as error:
+        span.finish(error)
+        raise
+    else:
+        span.finish()
+    finally:
+        _current_span.reset(token)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorator running each call of a function, sync or async, in a child span.
+
+    Args:
+        name (str): Operation name
+
+    Returns:
+        Callable: Decorator
+    """
+    def decorator(func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_span.get() is None:
+                    return await func(*args, **kwargs)
+                with start_span(name):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_span.get() is None:
+                return func(*args, **kwargs)
+            with start_span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class SpanExporter(ABC):
+    """
+    Receives the spans of each finished trace.
+    """
+
+    @abstractmethod
+    def export(self, spans: list[Span]) -> None:
+        """
+        Export the spans of one trace.
+
+        Args:
+            spans (list[Span]): Finished spans, root last
+        """
+
+    def shutdown(self) -> None:
+        """Flush pending spans and release resources."""
+
+
+class InMemorySpanExporter(SpanExporter):
+    """
+    Keeps the most recent spans in memory, for tests and local debugging.
+    """
+
+    def __init__(self, max_spans: int = 10000):
+        self.max_spans = max_spans
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans: list[Span]) -> None:
+        with self._lock:
+            self.spans.extend(spans)
+            del self.spans[:-self.max_spans]
+
+    def clear(self) -> None:
+        """Drop all stored spans."""
+        with self._lock:
+            self.spans.clear()
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends spans as JSON lines to a file from a background thread.
+
+    Traces waiting for the writer are held in a bounded queue; when it is full,
+    new traces are dropped and their spans counted instead of blocking requests.
+    """
+
+    def __init__(self, path: str, max_queue: int = 10000):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _ensure_writer(self) -> None:
+        # Started on first export in each process, since threads do not survive forking
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid != os.getpid():
+                self._thread = threading.Thread(target=self._write, name="span-writer", daemon=True)
+                self._thread.start()
+                self._thread_pid = os.getpid()
+
+    def _write(self) -> None:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as file:
+            while True:
+                spans = self._queue.get()
+                if spans is None:
+                    return
+                file.write("".join(json.dumps(span.to_dict(), default=str) + "\n" for span in spans))
+                file.flush()
+
+    def export(self, spans: list[Span]) -> None:
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            SPANS_DROPPED.inc(amount=len(spans))
+
+    def shutdown(self) -> None:
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+            self._thread_pid = None
+
+
+_exporter: Optional[SpanExporter] = None
+
+
+def get_span_exporter() -> SpanExporter:
+    """
+    Get the exporter traces are sent to, built from settings on first use.
+
+    Returns:
+        SpanExporter: The active exporter
+    """
+    global _exporter
+    if _exporter is None:
+        settings = get_settings()
+        if settings.TRACING_EXPORTER == "file":
+            _exporter = FileSpanExporter(settings.TRACING_FILE, settings.TRACING_QUEUE_SIZE)
+        else:
+            _exporter = InMemorySpanExporter()
+    return _exporter
+
+
+def shutdown_tracing() -> None:
+    """
+    Flush the active exporter, if one was created.
+    """
+    if _exporter is not None:
+        _exporter.shutdown()
+
+
+def set_span_exporter(exporter: Optional[SpanExporter]) -> None:
+    """
+    Replace the active exporter, shutting down the previous one.
+
+    Args:
+        exporter (Optional[SpanExporter]): New exporter, or None to rebuild from settings on next use
+    """
+    global _exporter
+    if _exporter is not None and _exporter is not exporter:
+        _exporter.shutdown()
+    _exporter = exporter
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = _current_span.get()
+    if parent is not None:
+        conn.info.setdefault("tracing_spans", []).append(
+            parent.child("db.query", {"db.statement": statement[:_MAX_STATEMENT_LENGTH]}))
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _end_statement_span(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_span.get() is not None and conn.info.get("tracing_spans"):
+        conn.info["tracing_spans"].pop().finish()
+
+
+@event.listens_for(Engine, "handle_error")
+def _fail_statement_span(exception_context) -> None:
+    conn = exception_context.connection
+    if _current_span.get() is not None and conn is not None and conn.info.get("tracing_spans"):
+        conn.info["tracing_spans"].pop().finish(exception_context.original_exception)
+
+
+class TracingMiddleware:
+    """
+    Pure ASGI middleware running each request in a root span.
+
+    A valid incoming traceparent header continues the caller's trace and
+    its sampled flag is honoured; other requests are sampled at
+    TRACING_SAMPLE_RATE. The finished trace goes to the active exporter.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        settings = get_settings()
+        if not settings.TRACING_ENABLED:
+            return await self.app(scope, receive, send)
+
+        traceparent = None
+        for name, value in scope["headers"]:
+            if name == b"traceparent":
+                traceparent = parse_traceparent(value.decode("latin-1"))
+                break
+
+        if traceparent is not None:
+            trace_id, parent_id, sampled = traceparent
+        else:
+            trace_id, parent_id = _new_trace_id(), None
+            sampled = random.random() < settings.TRACING_SAMPLE_RATE
+        if not sampled:
+            return await self.app(scope, receive, send)
+
+        span = Span(trace_id, _new_span_id(), parent_id, f"{scope['method']} {scope['path']}",
+                    attributes={"http.method": scope["method"], "http.target": scope["path"]})
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                span.attributes["http.status_code"] = message["status"]
+            await send(message)
+
+        token = _current_span.set(span)
+        error = None
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            _current_span.reset(token)
+            route = getattr(scope.get("route"), "path", None)
+            if route is not None:
+                span.name = f"{scope['method']} {route}"
+                span.attributes["http.route"] = route
+            span.finish(error)
+            get_span_exporter().export(list(span.trace))
@@ -1,26 +1,253 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+"""
+Database module for engines, sessions and table creation.
+
+By default everything lives in the single database at DATABASE_URL. When
+DB_SHARD_URLS is set, users and their refresh tokens and verification codes
+are spread over those databases by a stable hash of the user ID, while
+DATABASE_URL holds a small directory mapping each canonical email to its
+user ID. The directory also allocates user IDs, so IDs are unique across
+shards and known before the user row is written.
+
+Sharded sessions route each statement by its WHERE clause: a user ID (or a
+list of them) selects the matching shards, an email is resolved through the
+directory first, and anything else is sent to every shard.
+"""
+
+import zlib
+from functools import lru_cache
+from typing import Any, Iterable
+from sqlalchemy import Column, Integer, MetaData, String, Table, create_engine, event, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.horizontal_shard import ShardedSession
+from sqlalchemy.orm import ORMExecuteState, Session, sessionmaker, declarative_base
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList, ColumnClause
 from backend.app.config import get_settings
+from backend.app.validators.user import canonical_email
+
+DIRECTORY_SHARD = "directory"
+
+
+def _create_engine(url: str) -> Engine:
+    # For SQLite, we need to add check_same_thread=False
+    # For other databases, we don't need this
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(url)
+
 
-settings = get_settings()
+@lru_cache()
+def get_engine() -> Engine:
+    """
+    Create the database engine on first use and cache it.
 
-# For SQLite, we need to add check_same_thread=False
-# For other databases, we don't need this
-if settings.DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        settings.DATABASE_URL,
-        connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(settings.DATABASE_URL)
+    Creating the engine imports the DB driver, so it is deferred until the
+    first session or the startup table check needs it.
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Returns:
+        Engine: The application's SQLAlchemy engine (the directory when sharded)
+    """
+    return _create_engine(get_settings().DATABASE_URL)
+
+
+@lru_cache()
+def get_shard_engines() -> dict[str, Engine]:
+    """
+    Create the engines of the user shards on first use and cache them.
+
+    Returns:
+        dict[str, Engine]: Engines keyed by shard ID ("0", "1", ...), empty when sharding is off
+    """
+    return {str(index): _create_engine(url) for index, url in enumerate(get_settings().DB_SHARD_URLS)}
+
+
+SessionLocal = sessionmaker(autocommit=False, autoflush=False)
 
 Base = declarative_base()
 
+# Canonical email to user ID map, stored in DATABASE_URL when sharding is on
+directory_metadata = MetaData()
+
+user_directory = Table(
+    "user_directory",
+    directory_metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("email_canonical", String(255), unique=True, nullable=False),
+)
+
+
+def shard_for_user_id(user_id: int, shard_count: int) -> str:
+    """
+    Get the shard a user's rows are stored on.
+
+    Uses CRC32 rather than hash(), which is randomized per process.
+
+    Args:
+        user_id (int): User ID
+        shard_count (int): Number of shards
+
+    Returns:
+        str: Shard ID
+    """
+    return str(zlib.crc32(str(user_id).encode()) % shard_count)
+
+
+def _where_comparisons(statement: Any, parameters: Any = None) -> list[tuple[Any, Any, Any]]:
+    """
+    Find "column <op> bound value" terms ANDed together in a statement's WHERE clause.
+
+    Terms under an OR are skipped, since they do not restrict every row.
+    Values not bound in the statement (e.g. primary keys of session.get())
+    are taken from the execution parameters.
+    """
+    parameters = parameters if isinstance(parameters, dict) else {}
+    whereclause = getattr(statement, "whereclause", None)
+    if whereclause is None:
+        return []
+
+    terms = whereclause.clauses if isinstance(whereclause, BooleanClauseList) and whereclause.operator is operators.and_ else [whereclause]
+    comparisons = []
+    for term in terms:
+        if not isinstance(term, BinaryExpression):
+            continue
+        left, right = term.left, term.right
+        if isinstance(left, BindParameter):
+            left, right = right, left
+        if isinstance(left, ColumnClause) and isinstance(right, BindParameter):
+            value = parameters.get(right.key, right.effective_value)
+            if value is not None:
+                comparisons.append((left, term.operator, value))
+    return comparisons
+
+
+class UserShardedSession(ShardedSession):
+    """
+    Session storing each user, with their tokens and codes, on the shard picked by the user ID.
+
+    Takes the shard engines keyed by shard ID plus the directory engine under
+    DIRECTORY_SHARD.
+    """
+
+    def __init__(self, shards: dict[str, Any], **kwargs: Any):
+        self.data_shards = [shard_id for shard_id in shards if shard_id != DIRECTORY_SHARD]
+        super().__init__(
+            shard_chooser=self._shard_for_instance,
+            identity_chooser=self._shards_for_identity,
+            execute_chooser=self._shards_for_statement,
+            shards=shards,
+            **kwargs,
+        )
+
+    def _shard_for_user(self, user_id: int) -> str:
+        return shard_for_user_id(user_id, len(self.data_shards))
+
+    def _shard_for_instance(self, mapper: Any, instance: Any, **kw: Any) -> str:
+        if instance is None:
+            return self.data_shards[0]
+        if mapper.local_table.name == "users":
+            return self._shard_for_user(instance.id)
+        return self._shard_for_user(instance.user_id if instance.user_id is not None else instance.user.id)
+
+    def _shards_for_identity(self, mapper: Any, primary_key: Any, *, lazy_loaded_from: Any, **kw: Any) -> Iterable[str]:
+        if lazy_loaded_from is not None:
+            return [lazy_loaded_from.identity_token]
+        if mapper.local_table.name == "users":
+            return [self._shard_for_user(primary_key[0])]
+        return self.data_shards
+
+    def _shards_for_statement(self, orm_context: ORMExecuteState) -> Iterable[str]:
+        if orm_context.is_select and orm_context.lazy_loaded_from is not None:
+            return [orm_context.lazy_loaded_from.identity_token]
+
+        tables = Base.metadata.tables
+        user_id_columns = (tables["users"].c.id, tables["refresh_tokens"].c.user_id, tables["verification_codes"].c.user_id)
+        email_columns = (tables["users"].c.email, tables["users"].c.email_canonical)
+        user_ids: set[int] = set()
+        emails: set[str] = set()
+
+        for column, operator, value in _where_comparisons(orm_context.statement, orm_context.parameters):
+            values = value if operator is operators.in_op else [value] if operator is operators.eq else None
+            if values is None:
+                continue
+            if any(column.shares_lineage(user_id_column) for user_id_column in user_id_columns):
+                user_ids.update(int(user_id) for user_id in values)
+            elif any(column.shares_lineage(email_column) for email_column in email_columns):
+                emails.update(canonical_email(email) for email in values)
+
+        if emails:
+            user_ids.update(self._directory().execute(
+                select(user_directory.c.id).where(user_directory.c.email_canonical.in_(emails))
+            ).scalars())
+            if not user_ids:
+                # Unknown email: one shard answers "no such user" instead of all of them
+                return self.data_shards[:1]
+
+        if user_ids:
+            return sorted({self._shard_for_user(user_id) for user_id in user_ids})
+        return self.data_shards
+
+    def _directory(self):
+        return self.connection(bind_arguments={"shard_id": DIRECTORY_SHARD})
+
+
+@event.listens_for(UserShardedSession, "before_flush")
+def _allocate_user_ids(session: UserShardedSession, flush_context: Any, instances: Any) -> None:
+    # New users get their ID from the directory, which also enforces unique
+    # emails across shards, before the shard for the row can be chosen
+    for obj in session.new:
+        if getattr(obj, "__tablename__", None) == "users" and obj.id is None:
+            result = session._directory().execute(insert(user_directory).values(email_canonical=obj.email_canonical))
+            obj.id = result.inserted_primary_key[0]
+
+
+ShardedSessionLocal = sessionmaker(class_=UserShardedSession, autocommit=False, autoflush=False)
+
+
+def create_sharded_session(directory_engine: Engine, shard_engines: dict[str, Engine]) -> UserShardedSession:
+    """
+    Open a session over a directory database and a set of user shards.
+
+    Args:
+        directory_engine (Engine): Database holding the email directory
+        shard_engines (dict[str, Engine]): Shard databases keyed by shard ID ("0", "1", ...)
+
+    Returns:
+        UserShardedSession: Session routing each statement to the right shards
+    """
+    return ShardedSessionLocal(shards={DIRECTORY_SHARD: directory_engine, **shard_engines})
+
+
+def create_session() -> Session:
+    """
+    Open a session for the configured database layout.
+
+    Returns:
+        Session: A sharded session when DB_SHARD_URLS is set, else a plain one
+    """
+    shard_engines = get_shard_engines()
+    if shard_engines:
+        return create_sharded_session(get_engine(), shard_engines)
+    return SessionLocal(bind=get_engine())
+
+
+def init_db() -> None:
+    """
+    Create any missing tables for the registered models.
+
+    When sharded, the model tables are created on every shard and the
+    directory table in DATABASE_URL.
+    """
+    shard_engines = get_shard_engines()
+    if not shard_engines:
+        Base.metadata.create_all(bind=get_engine())
+        return
+    directory_metadata.create_all(bind=get_engine())
+    for engine in shard_engines.values():
+        Base.metadata.create_all(bind=engine)
+
 # Dependency
 def get_db():
-    db = SessionLocal()
+    db = create_session()
     try:
         yield db
     finally:
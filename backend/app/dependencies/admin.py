@@ -0,0 +1,42 @@
+"""
+Admin dependencies module for FastAPI.
+This module guards operational and gateway endpoints with static tokens.
+"""
+
+import hmac
+from typing import Optional
+from fastapi import Header, HTTPException, status
+from backend.app.config import get_settings
+
+
+def _token_matches(provided: Optional[str], expected: Optional[str]) -> bool:
+    """Compare a header value to a configured token; an unset token matches nothing."""
+    return bool(expected and provided and hmac.compare_digest(provided, expected))
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    """
+    Require the configured admin token in the X-Admin-Token header.
+
+    Args:
+        x_admin_token (Optional[str]): Value of the X-Admin-Token header
+
+    Raises:
+        HTTPException: If no admin token is configured or the header does not match it
+    """
+    if not _token_matches(x_admin_token, get_settings().ADMIN_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access denied")
+
+
+def require_introspection_client(x_introspection_token: Optional[str] = Header(default=None)) -> None:
+    """
+    Require the configured gateway token in the X-Introspection-Token header.
+
+    Args:
+        x_introspection_token (Optional[str]): Value of the X-Introspection-Token header
+
+    Raises:
+        HTTPException: If no introspection token is configured or the header does not match it
+    """
+    if not _token_matches(x_introspection_token, get_settings().INTROSPECTION_TOKEN):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Introspection access denied")
@@ -1,44 +1,168 @@
 """
 Authentication dependencies module for FastAPI.
-This module provides dependency functions for handling JWT token authentication and user verification.
+This module provides the ASGI middleware that verifies bearer tokens before
+routing, the decorator opting routes out of it, and dependency functions for
+resolving the authenticated principal and user.
+
+The middleware verifies the Authorization header once per request and stores
+the result in scope["auth"] (readable as request.auth). A request with an
+invalid or expired token is rejected with 401 before routing, body parsing or
+any database session checkout, unless its route is marked @public. Requests
+without a token pass through; routes that need a user reject them through
+get_current_user.
 """
 
-from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from starlette.routing import Match, Router
 from backend.app.models.user import User
 from backend.app.database import get_db
-from backend.app.core.security import verify_token
+from backend.app.core.security import ACCESS_TOKEN_TYPE, verify_token
+from backend.app.core.logging_config import set_log_user
+
+_PUBLIC_ATTR = "__auth_public__"
+
+_INVALID_CREDENTIALS_BODY = b'{"detail":"Could not validate credentials"}'
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    The authenticated caller of a request.
+
+    Attributes:
+        user_id (int): ID of the user the token was issued to
+        claims (dict): Decoded token payload
+    """
+    user_id: int
+    claims: dict
 
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
-def get_current_user( token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
+def public(endpoint: Callable) -> Callable:
     """
-    Get the current authenticated user from the JWT token.
-    
+    Decorator marking a route as reachable with an invalid or expired bearer token.
+
+    Public routes ignore the Authorization header instead of being rejected by
+    AuthenticationMiddleware, e.g. so a stale token cannot block logging in.
+    Apply it below the router decorator.
+
     Args:
-        token (str): JWT token from the Authorization header
-        db (Session): Database session dependency
-        
+        endpoint (Callable): Route function
+
     Returns:
-        User: The authenticated user object
-        
+        Callable: The same function, marked as public
+    """
+    setattr(endpoint, _PUBLIC_ATTR, True)
+    return endpoint
+
+
+def _bearer_token(scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token.strip() if scheme.lower() == "bearer" and token.strip() else None
+    return None
+
+
+def _principal(token: str) -> Optional[Principal]:
+    payload = verify_token(token, ACCESS_TOKEN_TYPE)
+    user_id = payload.get("sub") if payload else None
+    if not isinstance(user_id, str) or not user_id.isdigit():
+        return None
+    return Principal(user_id=int(user_id), claims=payload)
+
+
+class AuthenticationMiddleware:
+    """
+    Pure ASGI middleware verifying the bearer token of each request before routing.
+    """
+
+    def __init__(self, app: Any, router: Router):
+        self.app = app
+        self.router = router
+        self._public_routes: list = []
+        self._route_count = -1
+
+    def _is_public(self, scope) -> bool:
+        # Routes can be added after the middleware is built, so rescan when the list changes
+        if len(self.router.routes) != self._route_count:
+            self._public_routes = [
+                route for route in self.router.routes
+                if getattr(getattr(route, "endpoint", None), _PUBLIC_ATTR, False)
+            ]
+            self._route_count = len(self.router.routes)
+        return any(route.matches(scope)[0] == Match.FULL for route in self._public_routes)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        token = _bearer_token(scope)
+        principal = _principal(token) if token is not None else None
+        scope["auth"] = principal
+
+        if token is not None and principal is None and not self._is_public(scope):
+            await send({"type": "http.response.start", "status": status.HTTP_401_UNAUTHORIZED, "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(_INVALID_CREDENTIALS_BODY)).encode()),
+                (b"www-authenticate", b"Bearer"),
+            ]})
+            await send({"type": "http.response.body", "body": _INVALID_CREDENTIALS_BODY})
+            return
+
+        if principal is not None:
+            set_log_user(principal.user_id)
+        await self.app(scope, receive, send)
+
+
+def get_principal(request: Request) -> Principal:
+    """
+    Get the principal verified by AuthenticationMiddleware.
+
+    Args:
+        request (Request): The incoming request
+
+    Returns:
+        Principal: The authenticated caller
+
     Raises:
-        HTTPException: If the token is invalid or the user is not found
+        HTTPException: If the request carries no valid bearer token
+    """
+    principal = request.scope.get("auth")
+    if not isinstance(principal, Principal):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return principal
+
+
+def get_current_user(principal: Principal = Depends(get_principal), db: Session = Depends(get_db)) -> User:
     """
-    credentials_exception = HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    Get the current authenticated user from the verified token.
 
-    # Use verify_token instead of direct jwt.decode
-    payload = verify_token(token)
-    if not payload:
-        raise credentials_exception
+    A database session is only opened once the token has been verified.
 
-    user_id: str | None = payload.get("sub")
-    if user_id is None:
-        raise credentials_exception
+    Args:
+        principal (Principal): Caller verified by AuthenticationMiddleware
+        db (Session): Database session dependency
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    Returns:
+        User: The authenticated user object
+
+    Raises:
+        HTTPException: If no token was sent or the user no longer exists
+    """
+    user = db.query(User).filter(User.id == principal.user_id).first()
     if user is None:
-        raise credentials_exception
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
 
+    set_log_user(user.id)
     return user
@@ -0,0 +1,137 @@
+"""
+Rate limiting dependencies module for FastAPI.
+This module applies the configured per-route rate limits to incoming requests
+per client IP, email and user, and exposes the limit state through standard RateLimit response headers.
+
+Behind a reverse proxy every request comes from the proxy's address, so the
+client IP is taken from the Forwarded or X-Forwarded-For header when the
+request arrives from an address listed in RATE_LIMIT_TRUSTED_PROXIES.
+"""
+
+import ipaddress
+from typing import Optional
+from fastapi import HTTPException, Request, Response, status
+from backend.app.config import get_settings
+from backend.app.core.rate_limit import RateLimitResult, get_rate_limiter
+from backend.app.validators.user import canonical_email
+
+
+def _is_trusted(address: str, networks: list) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def _forwarded_for(request: Request) -> list[str]:
+    # Addresses the request passed through, client first, from Forwarded (RFC 7239) or X-Forwarded-For
+    forwarded = request.headers.get("forwarded")
+    if forwarded:
+        hops = []
+        for element in forwarded.split(","):
+            for pair in element.split(";"):
+                name, _, value = pair.strip().partition("=")
+                if name.lower() == "for":
+                    value = value.strip('"')
+                    if value.startswith("["):
+                        value = value[1:value.find("]")]
+                    elif value.count(":") == 1:
+                        value = value.partition(":")[0]
+                    hops.append(value)
+        return hops
+    forwarded_for = request.headers.get("x-forwarded-for")
+    return [hop.strip() for hop in forwarded_for.split(",") if hop.strip()] if forwarded_for else []
+
+
+def client_ip(request: Request) -> str:
+    """
+    Get the address of the client that sent a request.
+
+    When the peer is a trusted proxy, the forwarding headers are read from
+    the nearest hop back, and the first address that is not a trusted proxy
+    is the client. Headers from untrusted peers are ignored, since anyone
+    can send them.
+
+    Args:
+        request (Request): Incoming request
+
+    Returns:
+        str: Client IP address, or "unknown" if the server did not report one
+    """
+    peer = request.client.host if request.client else "unknown"
+    networks = get_settings().RATE_LIMIT_TRUSTED_PROXIES
+    if not networks or not _is_trusted(peer, networks):
+        return peer
+
+    hops = _forwarded_for(request)
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
+
+
+def _rate_limit_headers(result: RateLimitResult) -> dict[str, str]:
+    return {
+        "RateLimit-Limit": str(result.limit),
+        "RateLimit-Remaining": str(result.remaining),
+        "RateLimit-Reset": str(result.reset),
+    }
+
+
+def _enforce(response: Response, route: str, keys: list[str]) -> None:
+    result = get_rate_limiter().hit(route, keys)
+    if result is None:
+        return
+
+    headers = _rate_limit_headers(result)
+    if not result.allowed:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests. Please try again later.",
+            headers={**headers, "Retry-After": str(result.reset)},
+        )
+
+    # Keep the headers of an earlier, more restrictive check on the same response
+    remaining = response.headers.get("RateLimit-Remaining")
+    if remaining is None or result.remaining < int(remaining):
+        response.headers.update(headers)
+
+
+def enforce_rate_limit(request: Request, response: Response, route: str, email: Optional[str] = None) -> None:
+    """
+    Count a request against the route's limit, keyed by client IP and email.
+
+    Args:
+        request (Request): Incoming request, used for the client IP (see client_ip)
+        response (Response): Response to attach RateLimit headers to
+        route (str): Route name matching a RATE_LIMIT_<ROUTE> setting
+        email (Optional[str]): Email address the request targets, if any
+
+    Raises:
+        HTTPException: 429 with Retry-After when any key is over its limit
+    """
+    keys = [f"ip:{client_ip(request)}"]
+    if email:
+        keys.append(f"email:{canonical_email(email)}")
+
+    _enforce(response, route, keys)
+
+
+def enforce_user_rate_limit(response: Response, route: str, user_id: int) -> None:
+    """
+    Count a request against the route's limit for the user it resolved to.
+
+    Called once the route has looked the user up, in addition to
+    enforce_rate_limit, so the per-user counter holds however the user was
+    addressed.
+
+    Args:
+        response (Response): Response to attach RateLimit headers to
+        route (str): Route name matching a RATE_LIMIT_<ROUTE> setting
+        user_id (int): ID of the user the request targets
+
+    Raises:
+        HTTPException: 429 with Retry-After when the user is over the limit
+    """
+    _enforce(response, route, [f"user:{user_id}"])
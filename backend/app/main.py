@@ -2,48 +2,139 @@
 Main FastAPI application module.
 This module initializes the FastAPI application, configures middleware,
 sets up routes, and handles database initialization.
+
+Importing this module only builds the app object. Database tables are
+created in the lifespan startup hook, and other subsystems such as the mail
+connection are built on first use, so worker forks and test collection stay cheap.
 """
 
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
-from backend.app.database import Base, engine
+from backend.app.database import create_session, init_db
 from backend.app.models import user
-from backend.app.routes import auth, user
-from backend.app.utils.openapi import custom_openapi 
+from backend.app.routes import auth, user, server, metrics, admin
+from backend.app.core.metrics import MetricsMiddleware
+from backend.app.core.idempotency import IdempotencyMiddleware
+from backend.app.core.email_filter import get_email_filter, refresh_periodically
+from backend.app.core.breached_passwords import close_breached_password_index, load_breached_password_index
+from backend.app.dependencies.auth import AuthenticationMiddleware, public
+from backend.app.core.query_recorder import QueryDebugHeadersMiddleware
+from backend.app.core.profiling import ProfilingMiddleware
+from backend.app.core.tracing import TracingMiddleware, shutdown_tracing
+from backend.app.core.logging_config import RequestContextMiddleware, configure_logging, shutdown_logging
+from backend.app.server import WorkerStatsMiddleware
+from backend.app.utils.openapi import custom_openapi, install_prebuilt_openapi
+from backend.app.utils.responses import FastJSONResponse, model_response
+from backend.app.schemas.common import MessageResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from dotenv import load_dotenv
-load_dotenv()
-
 from backend.app.config import get_settings
 settings = get_settings()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Application startup and shutdown hook.
+
+    Args:
+        app (FastAPI): The application being started
+    """
+    # Start the log writer thread in this process (threads do not survive forking)
+    configure_logging()
+
+    # Create database tables
+    if get_settings().DB_CREATE_TABLES_ON_STARTUP:
+        init_db()
+
+    # Map the breached password index now, so a bad BREACHED_PASSWORDS_FILE stops startup
+    load_breached_password_index()
+
+    # Load registered emails so unknown ones can be rejected without a query,
+    # then keep picking up users registered by other workers
+    filter_refresh = None
+    if get_settings().EMAIL_FILTER_ENABLED:
+        with create_session() as db:
+            get_email_filter().build(db)
+        filter_refresh = asyncio.create_task(refresh_periodically(
+            get_email_filter(), create_session, get_settings().EMAIL_FILTER_REFRESH_SECONDS
+        ))
+
+    # Read the prebuilt OpenAPI schema before the first /docs hit
+    if prebuilt_openapi is not None:
+        prebuilt_openapi.load()
+    yield
+
+    if filter_refresh is not None:
+        filter_refresh.cancel()
+        with suppress(asyncio.CancelledError):
+            await filter_refresh
+
+    close_breached_password_index()
+
+    # Flush queued log records and spans
+    shutdown_logging()
+    shutdown_tracing()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Verifies bearer tokens before routing; innermost so rejections still get
+# CORS headers, request IDs, metrics and traces
+app.add_middleware(AuthenticationMiddleware, router=app.router)
+
+# Replays stored responses for retried requests carrying an Idempotency-Key,
+# inside metrics, traces and logs so replays still show up there
+app.add_middleware(IdempotencyMiddleware, paths={"/auth/register", "/auth/resend-code"})
 
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=settings.BACKEND_CORS_ORIGINS, 
+    allow_origins=settings.BACKEND_CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Per-worker request stats, aggregated on /server/stats
+app.add_middleware(WorkerStatsMiddleware)
+
+# Per-route request counts, latency and SQL statement counts, exposed on /metrics
+app.add_middleware(MetricsMiddleware)
+
+# SQL statement count and time headers when DEBUG is on
+app.add_middleware(QueryDebugHeadersMiddleware)
+
+# On-demand sampling profiler, see /admin/profiles
+app.add_middleware(ProfilingMiddleware)
+
+# Root span per request; child spans for DB, hashing, JWT and mail
+app.add_middleware(TracingMiddleware)
+
+# Request IDs for log records, outermost so every other layer can log with them
+app.add_middleware(RequestContextMiddleware)
+
 # Include routers
 app.include_router(auth.router)
 app.include_router(user.router)
+app.include_router(server.router)
+app.include_router(metrics.router)
+app.include_router(admin.router)
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
-
-@app.get("/")
+@app.get("/", response_model=MessageResponse)
+@public
 def read_root():
     """
     Root endpoint that returns a welcome message.
-    
+
     Returns:
-        dict: Welcome message for the API
+        MessageResponse: Welcome message for the API
     """
-    return {"message": "Welcome to FastAPI Auth App"}
+    return model_response(MessageResponse(message="Welcome to FastAPI Auth App"))
 
 # Custom OpenAPI override
 app.openapi = lambda: custom_openapi(app)
+
+# Serve the schema written by scripts/build_openapi.py instead of generating it per worker
+prebuilt_openapi = install_prebuilt_openapi(app, settings.OPENAPI_SCHEMA_FILE) if settings.OPENAPI_SCHEMA_FILE else None
@@ -3,10 +3,11 @@ User model module defining the database schema for user accounts.
 This module contains the SQLAlchemy model for user data and its relationships.
 """
 
-from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import String, Boolean, DateTime
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
+from sqlalchemy import String, Boolean, DateTime, Integer
 from datetime import datetime, timezone
 from backend.app.database import Base
+from backend.app.validators.user import canonical_email
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from backend.app.models.refresh_token import RefreshToken
@@ -18,10 +19,12 @@ class User(Base):
     
     Attributes:
         id (int): Primary key and unique identifier
-        email (str): User's email address (unique)
+        email (str): User's email address as entered (unique)
+        email_canonical (str): Lowercased email used for lookups (unique), set whenever email is
         hashed_password (str): Securely hashed password
         full_name (str | None): User's full name (optional)
         is_verified (bool): Whether the user's email is verified
+        verification_nonce (int): Counter mixed into HMAC-derived verification codes
         created_at (datetime): Account creation timestamp
         updated_at (datetime): Last update timestamp
         refresh_tokens (list[RefreshToken]): Associated refresh tokens
@@ -31,9 +34,12 @@ class User(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     email: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    # Nullable until backfill_email_canonical.py has filled rows created before the column
+    email_canonical: Mapped[str | None] = mapped_column(String(255), unique=True, index=True, nullable=True)
     hashed_password: Mapped[str] = mapped_column(String(255), nullable=False)
     full_name: Mapped[str | None] = mapped_column(String(255), nullable=True)
     is_verified: Mapped[bool] = mapped_column(Boolean, default=False)
+    verification_nonce: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc)
 )
@@ -46,3 +52,8 @@ class User(Base):
     verification_codes: Mapped[list["VerificationCode"]] = relationship(
         "VerificationCode", back_populates="user", cascade="all, delete-orphan"
     )
+
+    @validates("email")
+    def _set_email_canonical(self, key: str, email: str) -> str:
+        self.email_canonical = canonical_email(email)
+        return email
@@ -0,0 +1,41 @@
+"""
+Admin routes module for operational tooling.
+This module provides endpoints for listing and downloading request profiles.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import FileResponse
+from backend.app.core.profiling import get_profile_store
+from backend.app.dependencies.admin import require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles")
+def list_profiles():
+    """
+    List the stored request profiles, newest first.
+
+    Returns:
+        list[dict]: Profile ID, request method and path, status, duration and sample count
+    """
+    return get_profile_store().list()
+
+@router.get("/profiles/{profile_id}")
+def download_profile(profile_id: str):
+    """
+    Download a profile in collapsed stack format.
+
+    Args:
+        profile_id (str): ID from the profile list or the X-Profile-Id response header
+
+    Returns:
+        FileResponse: The .folded file, readable by flamegraph.pl and speedscope
+
+    Raises:
+        HTTPException: If the profile does not exist
+    """
+    path = get_profile_store().path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+
+    return FileResponse(path, media_type="text/plain", filename=path.name)
@@ -4,12 +4,15 @@ This module provides endpoints for user registration, email verification, login,
 """
 
 # Standard library
+import time
 from datetime import datetime, timezone
 from hashlib import sha256
 from typing import Optional
 
 # Third-party
-from fastapi import APIRouter, Depends, HTTPException, status, Response, Cookie
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Response, Cookie
+from sqlalchemy import and_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 # Internal: app-specific modules
@@ -19,36 +22,51 @@ from backend.app.models.user import User
 from backend.app.models.verification_code import VerificationCode
 from backend.app.models.refresh_token import RefreshToken
 from backend.app.schemas.user import UserCreate
-from backend.app.schemas.auth import ResendVerificationCodeRequest, VerifyEmailRequest, LoginRequest
-from backend.app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, verify_token
+from backend.app.schemas.auth import (
+    ResendVerificationCodeRequest, VerifyEmailRequest, LoginRequest, TokenResponse, RegisterResponse,
+    IntrospectRequest, TokenIntrospection, IntrospectResponse,
+)
+from backend.app.schemas.common import MessageResponse
+from backend.app.core.metrics import LOGIN_ATTEMPTS
+from backend.app.core.idempotency import IDEMPOTENCY_KEY_PARAMETER
+from backend.app.core.single_flight import get_refresh_single_flight
+from backend.app.core.email_filter import get_email_filter
+from backend.app.core.logging_config import set_log_user
+from backend.app.core.security import hash_password, verify_password, dummy_verify_password, create_access_token, create_refresh_token, verify_token, ACCESS_TOKEN_TYPE, REFRESH_TOKEN_TYPE
 from backend.app.core.mail_config import send_verification_email
-from backend.app.utils.email_verification import create_and_store_verification_code
+from backend.app.dependencies.rate_limit import enforce_rate_limit, enforce_user_rate_limit
+from backend.app.dependencies.admin import require_introspection_client
+from backend.app.dependencies.auth import public
+from backend.app.utils.responses import model_response
+from backend.app.utils.email_verification import create_and_store_verification_code, check_hmac_verification_code
+from backend.app.validators.user import canonical_email
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-@router.post("/register", status_code=201)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+@router.post("/register", status_code=201, response_model=RegisterResponse,
+             openapi_extra={"parameters": [IDEMPOTENCY_KEY_PARAMETER]})
+@public
+async def register(user_data: UserCreate, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Register a new user and send verification email.
+
+    Retries carrying the same Idempotency-Key get the original response
+    (see IdempotencyMiddleware).
     
     Args:
         user_data (UserCreate): User registration data
+        request (Request): Incoming request, used for rate limiting
+        response (Response): FastAPI response object for rate limit headers
         db (Session): Database session
         
     Returns:
-        dict: Registration success message and user ID
+        RegisterResponse: Registration success message and user ID
         
     Raises:
-        HTTPException: If email is already registered
+        HTTPException: If email is already registered or rate limit exceeded
     """
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-
-    if existing_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Email already registered",
-        )
+    enforce_rate_limit(request, response, "register", user_data.email)
 
     new_user = User(
         email=user_data.email,
@@ -56,86 +74,149 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         full_name=user_data.full_name
     )
 
+    # Rely on the unique email index instead of a separate existence SELECT
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered",
+        )
 
-    # Send verification email
+    # Create the verification code in the same transaction as the user
     settings = get_settings()
-    code = create_and_store_verification_code(new_user.id, db, settings.VERIFICATION_CODE_EXPIRE_MINUTES)
-    await send_verification_email(new_user.email, code)
+    code = create_and_store_verification_code(new_user, db, settings.VERIFICATION_CODE_EXPIRE_MINUTES, invalidate_previous=False)
 
-    return {
-        "message": "User registered successfully. Please check your email to verify your account.",
-        "user_id": new_user.id
-    }
+    # Read the attributes before commit expires them
+    user_id, email, email_key = new_user.id, new_user.email, new_user.email_canonical
+    db.commit()
+    get_email_filter().add(email_key)
 
+    # Send verification email
+    await send_verification_email(email, code)
+
+    return model_response(
+        RegisterResponse(
+            message="User registered successfully. Please check your email to verify your account.",
+            user_id=user_id
+        ),
+        response,
+        status_code=status.HTTP_201_CREATED
+    )
 
-@router.post("/resend-code")
-async def resend_verification_code(payload: ResendVerificationCodeRequest, db: Session = Depends(get_db)):
+
+@router.post("/resend-code", response_model=MessageResponse,
+             openapi_extra={"parameters": [IDEMPOTENCY_KEY_PARAMETER]})
+@public
+async def resend_verification_code(payload: ResendVerificationCodeRequest, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Resend verification code to user's email.
+
+    Retries carrying the same Idempotency-Key get the original response
+    without sending another code (see IdempotencyMiddleware).
     
     Args:
         payload (ResendVerificationCodeRequest): Email address to resend code to
+        request (Request): Incoming request, used for rate limiting
+        response (Response): FastAPI response object for rate limit headers
         db (Session): Database session
         
     Returns:
-        dict: Success message
+        MessageResponse: Success message
         
     Raises:
-        HTTPException: If user not found or already verified
+        HTTPException: If user not found, already verified, or rate limit exceeded
     """
-    user = db.query(User).filter(User.email == payload.email).first()
+    enforce_rate_limit(request, response, "resend_code", payload.email)
+
+    # Emails the filter has never seen are rejected without an email lookup
+    email_key = canonical_email(payload.email)
+    user = None
+    if get_email_filter().might_exist(email_key):
+        user = db.query(User).filter(User.email_canonical == email_key).first()
 
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    enforce_user_rate_limit(response, "resend_code", user.id)
+
     if user.is_verified:
         raise HTTPException(status_code=400, detail="User is already verified")
     
     settings = get_settings()
 
-    code = create_and_store_verification_code(user.id, db, settings.VERIFICATION_CODE_EXPIRE_MINUTES)
-    await send_verification_email(user.email, code)
+    code = create_and_store_verification_code(user, db, settings.VERIFICATION_CODE_EXPIRE_MINUTES)
+    email = user.email
+    db.commit()
+
+    await send_verification_email(email, code)
 
-    return {"message": "A new verification code has been sent to your email"}
+    return model_response(MessageResponse(message="A new verification code has been sent to your email"), response)
 
 
-@router.post("/verify-email")
-def verify_email(payload: VerifyEmailRequest, db: Session = Depends(get_db)):
+@router.post("/verify-email", response_model=MessageResponse)
+@public
+def verify_email(payload: VerifyEmailRequest, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Verify user's email using verification code.
     
     Args:
         payload (VerifyEmailRequest): Email and verification code
+        request (Request): Incoming request, used for rate limiting
+        response (Response): FastAPI response object for rate limit headers
         db (Session): Database session
         
     Returns:
-        dict: Success message
+        MessageResponse: Success message
         
     Raises:
-        HTTPException: If user not found, already verified, or code invalid/expired
+        HTTPException: If user not found, already verified, code invalid/expired, or rate limit exceeded
     """
-    user = db.query(User).filter(User.email == payload.email).first()
+    enforce_rate_limit(request, response, "verify_email", payload.email)
+
+    settings = get_settings()
+    if settings.VERIFICATION_CODE_MODE == "hmac":
+        user = db.query(User).filter(User.email_canonical == canonical_email(payload.email)).first()
+        verification_code = None
+    else:
+        # Load the user and the newest matching unused, unexpired code in one query
+        row = (
+            db.query(User, VerificationCode)
+            .outerjoin(
+                VerificationCode,
+                and_(
+                    VerificationCode.user_id == User.id,
+                    VerificationCode.code == payload.code,
+                    VerificationCode.is_used == False,
+                    VerificationCode.expires_at > datetime.now(timezone.utc)
+                )
+            )
+            .filter(User.email_canonical == canonical_email(payload.email))
+            .order_by(VerificationCode.created_at.desc())
+            .first()
+        )
+        user, verification_code = row if row else (None, None)
+
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    enforce_user_rate_limit(response, "verify_email", user.id)
+
     if user.is_verified:
         raise HTTPException(status_code=400, detail="User is already verified")
 
-    # Find matching unused and unexpired code
-    verification_code = (
-        db.query(VerificationCode)
-        .filter(
-            VerificationCode.user_id == user.id,
-            VerificationCode.code == payload.code,
-            VerificationCode.is_used == False,
-            VerificationCode.expires_at > datetime.now(timezone.utc)
-        )
-        .order_by(VerificationCode.created_at.desc())
-        .first()
-    )
+    if settings.VERIFICATION_CODE_MODE == "hmac":
+        if not check_hmac_verification_code(user, payload.code, settings.VERIFICATION_CODE_EXPIRE_MINUTES):
+            raise HTTPException(status_code=400, detail="Invalid or expired verification code")
+
+        # Mark user as verified and bump the nonce so the code cannot be replayed
+        user.is_verified = True
+        user.verification_nonce += 1
+        db.commit()
+
+        return model_response(MessageResponse(message="Email verified successfully"), response)
 
     if not verification_code:
         raise HTTPException(status_code=400, detail="Invalid or expired verification code")
@@ -146,41 +227,58 @@ def verify_email(payload: VerifyEmailRequest, db: Session = Depends(get_db)):
 
     db.commit()
 
-    return {"message": "Email verified successfully"}
+    return model_response(MessageResponse(message="Email verified successfully"), response)
 
 
-@router.post("/login")
-def login(data: LoginRequest, response: Response, db: Session = Depends(get_db)):
+@router.post("/login", response_model=TokenResponse)
+@public
+def login(data: LoginRequest, request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Authenticate user and generate access/refresh tokens.
     
     Args:
         data (LoginRequest): Login credentials
+        request (Request): Incoming request, used for rate limiting
         response (Response): FastAPI response object for setting cookies
         db (Session): Database session
         
     Returns:
-        dict: Access token and token type
+        TokenResponse: Access token and token type
         
     Raises:
-        HTTPException: If credentials invalid or email not verified
+        HTTPException: If credentials invalid, email not verified, or rate limit exceeded
     """
-    settings = get_settings()
+    enforce_rate_limit(request, response, "login", data.email)
 
-    user = db.query(User).filter(User.email == data.email).first()
+    settings = get_settings()
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    # Emails the filter has never seen are rejected without an email lookup
+    email_key = canonical_email(data.email)
+    user = None
+    if get_email_filter().might_exist(email_key):
+        user = db.query(User).filter(User.email_canonical == email_key).first()
+
+    if user is None:
+        # Unknown emails still pay for a password check, so timing does not reveal them
+        dummy_verify_password()
+    else:
+        enforce_user_rate_limit(response, "login", user.id)
+    if user is None or not verify_password(data.password, user.hashed_password):
+        LOGIN_ATTEMPTS.inc("invalid_credentials")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
         )
 
     if not user.is_verified:
+        LOGIN_ATTEMPTS.inc("unverified")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Email not verified"
         )
 
+    set_log_user(user.id)
+
     # Generate tokens
     access_token = create_access_token(data={"sub": str(user.id)})
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
@@ -207,13 +305,19 @@ def login(data: LoginRequest, response: Response, db: Session = Depends(get_db))
         domain=None  # allows cookie to work on localhost
     )
 
-    return {"access_token": access_token, "token_type": "bearer"}
+    LOGIN_ATTEMPTS.inc("success")
+    return model_response(TokenResponse(access_token=access_token), response)
 
 
-@router.post("/refresh")
+@router.post("/refresh", response_model=TokenResponse)
+@public
 def refresh_token(response: Response, refresh_token: Optional[str] = Cookie(None), db: Session = Depends(get_db)):
     """
     Refresh access token using refresh token.
+
+    The token is rotated once even if several requests present it at the
+    same time; all of them, and any retry within REFRESH_GRACE_SECONDS, get
+    the same new token pair.
     
     Args:
         response (Response): FastAPI response object for setting cookies
@@ -221,10 +325,11 @@ def refresh_token(response: Response, refresh_token: Optional[str] = Cookie(None
         db (Session): Database session
         
     Returns:
-        dict: New access token and token type
+        TokenResponse: New access token and token type
         
     Raises:
-        HTTPException: If refresh token missing, invalid, or not recognized
+        HTTPException: If refresh token missing, invalid, not recognized, or
+            still being rotated by a request that did not finish within REFRESH_WAIT_SECONDS
     """
     settings = get_settings()
 
@@ -232,7 +337,7 @@ def refresh_token(response: Response, refresh_token: Optional[str] = Cookie(None
         raise HTTPException(status_code=401, detail="Missing refresh token")
 
     # Use verify_token instead of direct jwt.decode
-    payload = verify_token(refresh_token)
+    payload = verify_token(refresh_token, REFRESH_TOKEN_TYPE)
     if not payload:
         raise HTTPException(status_code=401, detail="Invalid refresh token")
 
@@ -243,25 +348,33 @@ def refresh_token(response: Response, refresh_token: Optional[str] = Cookie(None
     # Hash the token and look it up in DB
     hashed_token = sha256(refresh_token.encode()).hexdigest()
 
-    token_in_db = db.query(RefreshToken).filter(
-        RefreshToken.token == hashed_token,
-        RefreshToken.user_id == int(user_id)
-    ).first()
-
-    if not token_in_db:
+    def rotate() -> Optional[tuple[str, str]]:
+        # Deleting the old token is the lookup: only one request can rotate it
+        deleted = db.query(RefreshToken).filter(
+            RefreshToken.token == hashed_token,
+            RefreshToken.user_id == int(user_id)
+        ).delete(synchronize_session=False)
+        if not deleted:
+            db.rollback()
+            return None
+
+        # Issue new tokens and store the new hash in the same transaction
+        new_access_token = create_access_token(data={"sub": user_id})
+        new_refresh_token = create_refresh_token(data={"sub": user_id})
+        db.add(RefreshToken(token=sha256(new_refresh_token.encode()).hexdigest(), user_id=int(user_id)))
+        db.commit()
+        return new_access_token, new_refresh_token
+
+    # Concurrent refreshes with the same token share one rotation, and for
+    # REFRESH_GRACE_SECONDS afterwards the old token returns the same new pair
+    try:
+        tokens = get_refresh_single_flight().run(hashed_token, rotate)
+    except TimeoutError:
+        # The rotation holding this token is stalled; the token may already be spent
+        raise HTTPException(status_code=401, detail="Refresh already in progress, please retry")
+    if tokens is None:
         raise HTTPException(status_code=401, detail="Refresh token not recognized")
-
-    # Remove the old refresh token from DB (rotation)
-    db.delete(token_in_db)
-    db.commit()
-
-    # Issue new tokens
-    new_access_token = create_access_token(data={"sub": user_id})
-    new_refresh_token = create_refresh_token(data={"sub": user_id})
-    hashed_new_refresh = sha256(new_refresh_token.encode()).hexdigest()
-
-    db.add(RefreshToken(token=hashed_new_refresh, user_id=int(user_id)))
-    db.commit()
+    new_access_token, new_refresh_token = tokens
 
     # Set new refresh token in HTTP-only cookie
     response.set_cookie(
@@ -273,10 +386,11 @@ def refresh_token(response: Response, refresh_token: Optional[str] = Cookie(None
         max_age=60 * 60 * 24 * settings.REFRESH_TOKEN_EXPIRE_DAYS
     )
 
-    return {"access_token": new_access_token, "token_type": "bearer"}
+    return model_response(TokenResponse(access_token=new_access_token), response)
 
 
 @router.post("/logout", status_code=204)
+@public
 def logout(response: Response, db: Session = Depends(get_db), refresh_token: str = Cookie(None)):
     """
     Logout user by invalidating refresh token.
@@ -298,4 +412,70 @@ def logout(response: Response, db: Session = Depends(get_db), refresh_token: str
         db.commit()
 
     # Clear the cookie regardless of whether there was a token
-    response.delete_cookie("refresh_token")
\ No newline at end of file
+    response.delete_cookie("refresh_token")
+
+
+@router.post("/introspect", response_model=IntrospectResponse, dependencies=[Depends(require_introspection_client)])
+@public
+def introspect(payload: IntrospectRequest, response: Response, db: Session = Depends(get_db)):
+    """
+    Check a batch of access tokens for an API gateway, in the style of RFC 7662.
+
+    Each distinct token is verified once, and refresh tokens are reported
+    inactive so a leaked refresh cookie cannot pass as a bearer token. With
+    include_user, the users of all valid tokens are loaded in a single IN
+    query and tokens of deleted users are reported inactive. Cache-Control
+    allows caching the result until the first active token expires, capped
+    at INTROSPECTION_MAX_CACHE_SECONDS.
+
+    Args:
+        payload (IntrospectRequest): Tokens to check and whether to resolve their users
+        response (Response): FastAPI response object for the Cache-Control header
+        db (Session): Database session
+
+    Returns:
+        IntrospectResponse: One result per token, in request order
+
+    Raises:
+        HTTPException: If the introspection token is missing or wrong, or the batch is too large
+    """
+    settings = get_settings()
+    if len(payload.tokens) > settings.INTROSPECTION_MAX_TOKENS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {settings.INTROSPECTION_MAX_TOKENS} tokens per request",
+        )
+
+    claims: dict[str, Optional[dict]] = {}
+    for token in payload.tokens:
+        if token not in claims:
+            claim = verify_token(token, ACCESS_TOKEN_TYPE)
+            claims[token] = claim if claim and isinstance(claim.get("sub"), str) and claim["sub"].isdigit() else None
+
+    verified_by_user: dict[int, bool] = {}
+    if payload.include_user:
+        user_ids = {int(claim["sub"]) for claim in claims.values() if claim is not None}
+        if user_ids:
+            verified_by_user = dict(db.query(User.id, User.is_verified).filter(User.id.in_(user_ids)).all())
+
+    results = []
+    for token in payload.tokens:
+        claim = claims[token]
+        if claim is None or (payload.include_user and int(claim["sub"]) not in verified_by_user):
+            results.append(TokenIntrospection(active=False))
+            continue
+        results.append(TokenIntrospection(
+            active=True,
+            sub=claim["sub"],
+            exp=claim.get("exp"),
+            email_verified=verified_by_user.get(int(claim["sub"])) if payload.include_user else None,
+        ))
+
+    lifetimes = [result.exp - int(time.time()) for result in results if result.active and result.exp is not None]
+    if lifetimes:
+        max_age = max(0, min(min(lifetimes), settings.INTROSPECTION_MAX_CACHE_SECONDS))
+        response.headers["Cache-Control"] = f"private, max-age={max_age}"
+    else:
+        response.headers["Cache-Control"] = "no-store"
+
+    return model_response(IntrospectResponse(results=results), response)
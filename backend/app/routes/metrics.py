@@ -0,0 +1,19 @@
+"""
+Metrics routes module for exposing application metrics.
+This module provides the Prometheus scrape endpoint for the current worker process.
+"""
+
+from fastapi import APIRouter, Response
+from backend.app.core.metrics import REGISTRY, PROMETHEUS_CONTENT_TYPE
+
+router = APIRouter(tags=["metrics"])
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Get this worker's metrics in Prometheus text format.
+
+    Returns:
+        Response: Prometheus text exposition of all registered metrics
+    """
+    return Response(REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,21 @@
+"""
+Server routes module for process-level operational data.
+This module provides an endpoint reporting request stats for every worker process.
+It exposes worker PIDs, so it requires the admin token like the /admin routes.
+"""
+
+from fastapi import APIRouter, Depends
+from backend.app.server import get_worker_stats
+from backend.app.dependencies.admin import require_admin
+
+router = APIRouter(prefix="/server", tags=["server"], dependencies=[Depends(require_admin)])
+
+@router.get("/stats")
+def server_stats():
+    """
+    Get request stats aggregated across all worker processes.
+
+    Returns:
+        dict: Per-worker stats and totals
+    """
+    return get_worker_stats().snapshot()
@@ -3,21 +3,60 @@ User routes module for handling user-specific operations.
 This module provides endpoints for accessing user-specific data and functionality.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from backend.app.models.user import User
 from backend.app.dependencies.auth import get_current_user
+from backend.app.schemas.common import MessageResponse
+from backend.app.schemas.user import UserProfileResponse
+from backend.app.utils.http_cache import check_not_modified, user_etag
+from backend.app.utils.responses import model_response
 
 router = APIRouter(prefix="/user", tags=["user"])
 
-@router.get("/home")
-def user_home(current_user: User = Depends(get_current_user)):
+NOT_MODIFIED_RESPONSE = {304: {"description": "Not Modified"}}
+
+@router.get("/home", response_model=MessageResponse, responses=NOT_MODIFIED_RESPONSE)
+def user_home(request: Request, response: Response, current_user: User = Depends(get_current_user)):
     """
     Get user's home page data.
-    
+
     Args:
+        request (Request): The incoming request
+        response (Response): Response used to set caching headers
         current_user (User): Currently authenticated user
-        
+
     Returns:
-        dict: Welcome message with user's name
+        MessageResponse: Welcome message with user's name, or an empty 304
+        if the client's If-None-Match is current
     """
-    return {"message": f"Welcome, {current_user.full_name}!"}
+    not_modified = check_not_modified(request, response, user_etag(current_user))
+    if not_modified:
+        return not_modified
+
+    return model_response(MessageResponse(message=f"Welcome, {current_user.full_name}!"), response)
+
+@router.get("/me", response_model=UserProfileResponse, responses=NOT_MODIFIED_RESPONSE)
+def user_me(request: Request, response: Response, current_user: User = Depends(get_current_user)):
+    """
+    Get the current user's profile.
+
+    Args:
+        request (Request): The incoming request
+        response (Response): Response used to set caching headers
+        current_user (User): Currently authenticated user
+
+    Returns:
+        UserProfileResponse: The user's profile, or an empty 304 if the
+        client's If-None-Match is current
+    """
+    not_modified = check_not_modified(request, response, user_etag(current_user))
+    if not_modified:
+        return not_modified
+
+    return model_response(UserProfileResponse(
+        id=current_user.id,
+        email=current_user.email,
+        full_name=current_user.full_name,
+        is_verified=current_user.is_verified,
+        created_at=current_user.created_at,
+    ), response)
@@ -4,7 +4,7 @@ This module provides data validation and serialization for login, email verifica
 """
 
 from pydantic import BaseModel, EmailStr, Field
-from typing import Annotated
+from typing import Annotated, Optional
 
 class ResendVerificationCodeRequest(BaseModel):
     """
@@ -36,3 +36,60 @@ class LoginRequest(BaseModel):
     """
     email: EmailStr
     password: str
+
+class TokenResponse(BaseModel):
+    """
+    Response model for issued access tokens.
+    
+    Attributes:
+        access_token (str): JWT access token
+        token_type (str): Token type, always "bearer"
+    """
+    access_token: str
+    token_type: str = "bearer"
+
+class RegisterResponse(BaseModel):
+    """
+    Response model for a successful registration.
+    
+    Attributes:
+        message (str): Human-readable result message
+        user_id (int): ID of the newly created user
+    """
+    message: str
+    user_id: int
+
+class IntrospectRequest(BaseModel):
+    """
+    Request model for batch token introspection.
+    
+    Attributes:
+        tokens (list[str]): Access tokens to check
+        include_user (bool): Also require the token's user to exist and report whether it is verified
+    """
+    tokens: Annotated[list[str], Field(min_length=1)]
+    include_user: bool = False
+
+class TokenIntrospection(BaseModel):
+    """
+    Introspection result for one token, in the style of RFC 7662.
+    
+    Attributes:
+        active (bool): Whether the token is currently valid
+        sub (Optional[str]): User ID the token was issued to, for active tokens
+        exp (Optional[int]): Expiry as a UNIX timestamp, for active tokens
+        email_verified (Optional[bool]): Whether the user is verified, when include_user is set
+    """
+    active: bool
+    sub: Optional[str] = None
+    exp: Optional[int] = None
+    email_verified: Optional[bool] = None
+
+class IntrospectResponse(BaseModel):
+    """
+    Response model for batch token introspection.
+    
+    Attributes:
+        results (list[TokenIntrospection]): One result per requested token, in request order
+    """
+    results: list[TokenIntrospection]
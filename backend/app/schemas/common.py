@@ -0,0 +1,15 @@
+"""
+Common schema module defining Pydantic models shared across routers.
+This module provides response models for simple message payloads.
+"""
+
+from pydantic import BaseModel
+
+class MessageResponse(BaseModel):
+    """
+    Response model for endpoints that only return a message.
+    
+    Attributes:
+        message (str): Human-readable result message
+    """
+    message: str
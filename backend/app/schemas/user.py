@@ -3,6 +3,7 @@ User schema module defining Pydantic models and validators for user-related data
 This module provides data validation and serialization for user registration and profile data.
 """
 
+from datetime import datetime
 from pydantic import BaseModel, EmailStr, model_validator
 from pydantic_core.core_schema import ValidationInfo
 from backend.app.validators.password import validate_password
@@ -80,3 +81,21 @@ class UserCreate(BaseModel):
         if self.password != self.confirm_password:
             raise ValueError("Passwords do not match.")
         return self
+
+
+class UserProfileResponse(BaseModel):
+    """
+    Response model for the current user's profile.
+
+    Attributes:
+        id (int): User ID
+        email (str): User's email address
+        full_name (str | None): User's full name
+        is_verified (bool): Whether the user's email is verified
+        created_at (datetime): Account creation timestamp
+    """
+    id: int
+    email: str
+    full_name: str | None
+    is_verified: bool
+    created_at: datetime
@@ -0,0 +1,472 @@
+"""
+Production server module for running the application under several worker processes.
+This module provides a pre-forking supervisor around uvicorn with optional app
+preloading, graceful reload on SIGHUP, worker auto-sizing from core count and
+measured password hash cost, and a shared table of per-worker request stats.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Any, Optional
+from backend.app.core.logging_config import JsonFormatter
+
+logger = logging.getLogger(__name__)
+
+# Per-worker fields in the shared stats table
+_FIELDS = ("pid", "started_at", "requests", "in_flight", "errors", "latency_total")
+_PID, _STARTED_AT, _REQUESTS, _IN_FLIGHT, _ERRORS, _LATENCY_TOTAL = range(len(_FIELDS))
+
+# A hash slower than this keeps a core busy long enough that requests are CPU-bound
+HASH_BOUND_THRESHOLD_SECONDS = 0.02
+
+# A worker exiting sooner than this after being started counts as a failed start
+MIN_WORKER_UPTIME_SECONDS = 5.0
+
+
+class WorkerStatsTable:
+    """
+    Fixed-size table of request counters, one slot per worker process.
+
+    When shared, the table lives in memory mapped before workers are forked,
+    so every worker writes its own slot and any worker can read all of them.
+    Each slot has a single writer (the worker's event loop), so no locking is needed.
+    """
+
+    def __init__(self, slots: int, shared: bool = False):
+        size = slots * len(_FIELDS)
+        self._values = multiprocessing.RawArray("d", size) if shared else [0.0] * size
+        self.slots = slots
+        self.slot = 0
+
+    def _base(self, slot: Optional[int] = None) -> int:
+        return (self.slot if slot is None else slot) * len(_FIELDS)
+
+    def claim(self, slot: int, pid: Optional[int] = None) -> None:
+        """
+        Reset a slot and mark it as owned by a worker process.
+
+        Args:
+            slot (int): Slot index
+            pid (Optional[int]): Owning process ID, defaults to the current process
+        """
+        base = self._base(slot)
+        for offset in range(len(_FIELDS)):
+            self._values[base + offset] = 0.0
+        self._values[base + _PID] = pid or os.getpid()
+        self._values[base + _STARTED_AT] = time.time()
+        self.slot = slot
+
+    def release(self, slot: int) -> None:
+        """Mark a slot as free after its worker exited."""
+        self._values[self._base(slot) + _PID] = 0.0
+
+    def request_started(self) -> None:
+        """Record the start of a request in this worker's slot."""
+        self._values[self._base() + _IN_FLIGHT] += 1
+
+    def request_finished(self, status_code: int, seconds: float) -> None:
+        """
+        Record a finished request in this worker's slot.
+
+        Args:
+            status_code (int): Response status code
+            seconds (float): Time spent handling the request
+        """
+        base = self._base()
+        self._values[base + _IN_FLIGHT] -= 1
+        self._values[base + _REQUESTS] += 1
+        self._values[base + _LATENCY_TOTAL] += seconds
+        if status_code >= 500:
+            self._values[base + _ERRORS] += 1
+
+    def snapshot(self) -> dict:
+        """
+        Read the counters of every live worker.
+
+        Returns:
+            dict: Per-worker stats and totals across workers
+        """
+        now = time.time()
+        workers = []
+        for slot in range(self.slots):
+            base = self._base(slot)
+            values = self._values[base:base + len(_FIELDS)]
+            if not values[_PID]:
+                continue
+            requests = int(values[_REQUESTS])
+            workers.append({
+                "pid": int(values[_PID]),
+                "uptime_seconds": round(now - values[_STARTED_AT], 1),
+                "requests": requests,
+                "in_flight": int(values[_IN_FLIGHT]),
+                "errors": int(values[_ERRORS]),
+                "avg_latency_ms": round(values[_LATENCY_TOTAL] / requests * 1000, 3) if requests else 0.0,
+            })
+
+        return {
+            "workers": workers,
+            "total": {
+                "workers": len(workers),
+                "requests": sum(worker["requests"] for worker in workers),
+                "in_flight": sum(worker["in_flight"] for worker in workers),
+                "errors": sum(worker["errors"] for worker in workers),
+            },
+        }
+
+
+_worker_stats: Optional[WorkerStatsTable] = None
+
+
+def get_worker_stats() -> WorkerStatsTable:
+    """
+    Get the stats table for this process.
+
+    Outside the supervisor this is a private single-slot table.
+
+    Returns:
+        WorkerStatsTable: The table the current worker writes to
+    """
+    global _worker_stats
+    if _worker_stats is None:
+        _worker_stats = WorkerStatsTable(1)
+        _worker_stats.claim(0)
+    return _worker_stats
+
+
+class WorkerStatsMiddleware:
+    """
+    Pure ASGI middleware counting requests, latency and errors for the current worker.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = get_worker_stats()
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            stats.request_finished(status_code, time.perf_counter() - start)
+
+
+def available_cpus() -> int:
+    """Return the number of CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def measure_hash_cost(samples: int = 3) -> float:
+    """
+    Measure how long one password hash takes on this machine.
+
+    Args:
+        samples (int): Number of hashes to time
+
+    Returns:
+        float: Fastest observed hash time in seconds
+    """
+    from backend.app.core.security import hash_password
+
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        hash_password("WorkerSizing123")
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def auto_worker_count(cpus: Optional[int] = None, hash_seconds: Optional[float] = None, max_workers: int = 32) -> int:
+    """
+    Pick a worker count from core count and password hash cost.
+
+    When a hash takes long enough that login and register are CPU-bound,
+    running more processes than cores only adds contention, so one worker per
+    core is used. With cheap hashing the app mostly waits on the database and
+    the usual 2 * cores + 1 applies.
+
+    Args:
+        cpus (Optional[int]): Available cores, detected when None
+        hash_seconds (Optional[float]): Seconds per hash, measured when None
+        max_workers (int): Upper bound on the result
+
+    Returns:
+        int: Number of worker processes to run
+    """
+    cpus = cpus or available_cpus()
+    hash_seconds = measure_hash_cost() if hash_seconds is None else hash_seconds
+
+    if hash_seconds >= HASH_BOUND_THRESHOLD_SECONDS:
+        workers = cpus
+    else:
+        workers = 2 * cpus + 1
+    return max(1, min(workers, max_workers))
+
+
+class RestartBackoff:
+    """
+    Exponential delay between restarts of workers that keep failing to start.
+
+    A worker that exits within min_uptime of being started (e.g. on an import
+    error or a bad database URL) counts as a failed start. Each consecutive
+    failed start doubles the delay before the next spawn, and a worker that
+    stays up longer resets the count.
+    """
+
+    def __init__(self, base_delay: float = 0.2, max_delay: float = 30.0,
+                 max_failures: int = 10, min_uptime: float = MIN_WORKER_UPTIME_SECONDS):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_failures = max_failures
+        self.min_uptime = min_uptime
+        self.failures = 0
+
+    def record_exit(self, uptime: float) -> float:
+        """
+        Record an unplanned worker exit.
+
+        Args:
+            uptime (float): Seconds the worker ran for
+
+        Returns:
+            float: Seconds to wait before spawning a replacement
+        """
+        self.failures = self.failures + 1 if uptime < self.min_uptime else 0
+        return self.delay()
+
+    def delay(self) -> float:
+        """Return the wait before the next spawn for the current failure count."""
+        if not self.failures:
+            return 0.0
+        return min(self.base_delay * 2 ** (self.failures - 1), self.max_delay)
+
+    @property
+    def exhausted(self) -> bool:
+        """Whether workers failed to start too many times in a row to keep retrying."""
+        return self.failures >= self.max_failures
+
+
+class Supervisor:
+    """
+    Pre-forking process manager running uvicorn workers on a shared socket.
+
+    Signals:
+        SIGHUP: Graceful reload. New workers are started before old ones are
+            asked to finish their in-flight requests and exit.
+        SIGTERM, SIGINT: Graceful shutdown of all workers.
+
+    Workers that die outside of a reload are replaced, with a growing delay
+    while they keep dying on startup. The supervisor gives up and shuts down
+    once that happens max_failed_starts times in a row.
+
+    With preload, workers are forked from the app imported at startup, so a
+    reload restarts them without loading changed code; restart the
+    supervisor to deploy new code.
+    """
+
+    def __init__(self, app: str, host: str = "127.0.0.1", port: int = 8000, workers: int = 1,
+                 preload: bool = False, log_level: str = "info", graceful_timeout: int = 30,
+                 max_failed_starts: int = 10):
+        self.app_path = app
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.preload = preload
+        self.log_level = log_level
+        self.graceful_timeout = graceful_timeout
+
+        self._app: Any = None
+        self._socket: Optional[socket.socket] = None
+        self._stats: Optional[WorkerStatsTable] = None
+        self._children: dict[int, int] = {}  # pid -> stats slot
+        self._spawned_at: dict[int, float] = {}  # pid -> monotonic start time
+        self._backoff = RestartBackoff(max_failures=max_failed_starts)
+        self._next_spawn_at = 0.0
+        self._retiring: set[int] = set()
+        self._reload_requested = False
+        self._shutdown_requested = False
+
+    def _configure_logging(self) -> None:
+        # JSON lines like the app's logs, but written synchronously: the app's
+        # queue writer thread would not survive forking workers
+        if not any(isinstance(handler.formatter, JsonFormatter) for handler in logger.handlers):
+            handler = logging.StreamHandler(sys.stdout)
+            handler.setFormatter(JsonFormatter())
+            logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+
+    def _bind(self) -> socket.socket:
+        sock = socket.socket(socket.AF_INET6 if ":" in self.host else socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(2048)
+        sock.set_inheritable(True)
+        return sock
+
+    def _free_slot(self) -> int:
+        used = set(self._children.values())
+        return next(slot for slot in range(self._stats.slots) if slot not in used)
+
+    def _spawn(self) -> None:
+        slot = self._free_slot()
+        pid = os.fork()
+        if pid:
+            self._children[pid] = slot
+            self._spawned_at[pid] = time.monotonic()
+            return
+
+        # Worker process
+        try:
+            for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            self._stats.claim(slot)
+
+            import uvicorn
+            config = uvicorn.Config(
+                self._app if self.preload else self.app_path,
+                lifespan="on",
+                log_level=self.log_level,
+                timeout_graceful_shutdown=self.graceful_timeout,
+            )
+            uvicorn.Server(config).run(sockets=[self._socket])
+        except BaseException:
+            logger.exception("Worker failed", extra={"event": "worker_failed", "pid": os.getpid()})
+            os._exit(1)
+        os._exit(0)
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            slot = self._children.pop(pid, None)
+            if slot is not None:
+                self._stats.release(slot)
+            uptime = time.monotonic() - self._spawned_at.pop(pid, time.monotonic())
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+            elif slot is not None and not self._shutdown_requested:
+                delay = self._backoff.record_exit(uptime)
+                self._next_spawn_at = time.monotonic() + delay
+                logger.warning("Worker exited", extra={
+                    "event": "worker_exited", "pid": pid, "exit_code": os.waitstatus_to_exitcode(status),
+                    "uptime_seconds": round(uptime, 1), "restart_delay_seconds": delay})
+
+    def _reload(self) -> None:
+        if self._retiring:
+            # Previous generation still draining; retry once it has exited
+            self._reload_requested = True
+            return
+
+        old_workers = [pid for pid in self._children if pid not in self._retiring]
+        logger.info("Reloading workers", extra={"event": "supervisor_reload", "old_workers": old_workers})
+        if self.preload:
+            logger.warning("Workers are forked from the preloaded app, so changed code is not loaded; "
+                           "restart the supervisor to deploy it", extra={"event": "supervisor_reload_preloaded"})
+        for _ in range(self.workers):
+            self._spawn()
+        for pid in old_workers:
+            self._retiring.add(pid)
+            self._signal(pid, signal.SIGTERM)
+
+    def _signal(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            # Already reaped, so waitpid will never report it; stop tracking it
+            slot = self._children.pop(pid, None)
+            if slot is not None:
+                self._stats.release(slot)
+            self._spawned_at.pop(pid, None)
+            self._retiring.discard(pid)
+
+    def _shutdown(self) -> None:
+        logger.info("Stopping workers", extra={"event": "supervisor_shutdown", "workers": list(self._children)})
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGTERM)
+
+        deadline = time.monotonic() + self.graceful_timeout + 5
+        while self._children and time.monotonic() < deadline:
+            self._reap()
+            time.sleep(0.1)
+        for pid in list(self._children):
+            self._signal(pid, signal.SIGKILL)
+        self._reap()
+
+    def run(self) -> int:
+        """
+        Bind the socket, start the workers and supervise them until shutdown.
+
+        Returns:
+            int: Process exit code, 1 when workers kept failing to start
+        """
+        global _worker_stats
+
+        self._configure_logging()
+        self._socket = self._bind()
+
+        # Created before forking so every worker maps the same memory; extra
+        # slots let new workers start during a reload before old ones exit
+        self._stats = _worker_stats = WorkerStatsTable(self.workers * 2, shared=True)
+
+        if self.preload:
+            from uvicorn.importer import import_from_string
+            self._app = import_from_string(self.app_path)
+
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, "_reload_requested", True))
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, "_shutdown_requested", True))
+        signal.signal(signal.SIGINT, lambda *_: setattr(self, "_shutdown_requested", True))
+
+        logger.info("Supervisor started", extra={
+            "event": "supervisor_started", "pid": os.getpid(), "app": self.app_path, "host": self.host,
+            "port": self.port, "workers": self.workers, "preload": self.preload})
+
+        for _ in range(self.workers):
+            self._spawn()
+
+        exit_code = 0
+        try:
+            while not self._shutdown_requested:
+                self._reap()
+                if self._backoff.exhausted:
+                    logger.error("Workers keep failing on startup; shutting down", extra={
+                        "event": "supervisor_giving_up", "failed_starts": self._backoff.failures,
+                        "min_uptime_seconds": self._backoff.min_uptime})
+                    exit_code = 1
+                    break
+                if self._reload_requested:
+                    self._reload_requested = False
+                    self._reload()
+
+                # Replace workers that died outside of a reload, once any backoff has passed
+                if time.monotonic() >= self._next_spawn_at:
+                    while len(self._children) - len(self._retiring) < self.workers:
+                        self._spawn()
+
+                time.sleep(0.2)
+        finally:
+            self._shutdown()
+            self._socket.close()
+        return exit_code
@@ -1,42 +1,146 @@
+import hmac
 import random
 import string
 from datetime import datetime, timedelta, timezone
+from hashlib import sha256
+from typing import Optional
 from sqlalchemy.orm import Session
+from backend.app.config import get_settings
 from backend.app.models.verification_code import VerificationCode
 from backend.app.models.user import User
 
-def _generate_verification_code(length: int = 6) -> str:
+VERIFICATION_CODE_LENGTH = 6
+
+
+def _generate_verification_code(length: int = VERIFICATION_CODE_LENGTH) -> str:
     """Generate a random numeric code (default: 6-digit)."""
     return ''.join(random.choices(string.digits, k=length))
 
 
-def create_and_store_verification_code(user_id: int, db: Session, expires_in_minutes: int = 10) -> str:
-    
-    user = db.query(User).filter(User.id == user_id).first()
-    if user is None:
-        raise ValueError("User not found")
+def _verification_code_key() -> bytes:
+    """Return the HMAC key used for derived verification codes."""
+    settings = get_settings()
+    return (settings.VERIFICATION_CODE_SECRET or settings.JWT_SECRET).encode()
+
+
+def _time_window(expires_in_minutes: int, now: Optional[datetime] = None) -> int:
+    """Return the index of the time window that contains `now`."""
+    now = now or datetime.now(timezone.utc)
+    return int(now.timestamp()) // (expires_in_minutes * 60)
+
+
+def derive_verification_code(user_id: int, nonce: int, window: int) -> str:
+    """
+    Derive a numeric verification code from the user id, nonce and time window.
+
+    Uses HOTP-style dynamic truncation over HMAC-SHA256, so the code can be
+    recomputed at verification time instead of being stored.
+
+    Args:
+        user_id (int): ID of the user the code belongs to
+        nonce (int): The user's current verification nonce
+        window (int): Index of the time window the code is valid for
+
+    Returns:
+        str: Zero-padded numeric code
+    """
+    message = f"{user_id}:{nonce}:{window}".encode()
+    digest = hmac.new(_verification_code_key(), message, sha256).digest()
+    offset = digest[-1] & 0x0F
+    value = int.from_bytes(digest[offset:offset + 4], "big") & 0x7FFFFFFF
+    return str(value % 10 ** VERIFICATION_CODE_LENGTH).zfill(VERIFICATION_CODE_LENGTH)
+
+
+def issue_hmac_verification_code(user: User, expires_in_minutes: int = 10, now: Optional[datetime] = None) -> str:
+    """
+    Issue a derived verification code by bumping the user's nonce.
+
+    Bumping the nonce invalidates every code issued before, which replaces the
+    UPDATE over unused rows in the verification_codes table.
+
+    The nonce change is left in the session; the caller commits it.
+
+    Args:
+        user (User): The user to issue the code for
+        expires_in_minutes (int): Length of a code's time window
+        now (Optional[datetime]): Current time, defaults to the system clock
+
+    Returns:
+        str: The verification code to send to the user
+    """
+    user.verification_nonce = (user.verification_nonce or 0) + 1
+
+    return derive_verification_code(user.id, user.verification_nonce, _time_window(expires_in_minutes, now))
+
+
+def check_hmac_verification_code(user: User, code: str, expires_in_minutes: int = 10, now: Optional[datetime] = None) -> bool:
+    """
+    Check a derived verification code without touching the verification_codes table.
+
+    Like TOTP, the previous window is accepted as well, so a code stays valid
+    for between one and two expiry periods.
+
+    Args:
+        user (User): The user the code was issued to
+        code (str): The code submitted by the user
+        expires_in_minutes (int): Length of a code's time window
+        now (Optional[datetime]): Current time, defaults to the system clock
+
+    Returns:
+        bool: True if the code matches the current or previous window
+    """
+    window = _time_window(expires_in_minutes, now)
+    nonce = user.verification_nonce or 0
+
+    matched = False
+    for candidate_window in (window, window - 1):
+        expected = derive_verification_code(user.id, nonce, candidate_window)
+        matched |= hmac.compare_digest(expected, code)
+    return matched
+
+
+def create_and_store_verification_code(user: User, db: Session, expires_in_minutes: int = 10, invalidate_previous: bool = True) -> str:
+    """
+    Create a verification code for a user inside the caller's transaction.
+
+    Nothing is committed here, so the caller can fold the new code into the
+    same transaction as the rest of its writes.
+
+    Args:
+        user (User): The user to create the code for
+        db (Session): Database session
+        expires_in_minutes (int): Minutes until the code expires
+        invalidate_previous (bool): Mark earlier unused codes as used. Can be
+            skipped for users created in the same transaction.
+
+    Returns:
+        str: The verification code to send to the user
+
+    Raises:
+        ValueError: If the user is already verified
+    """
     if user.is_verified:
-        raise ValueError("User is already verified")    
-   
-   
+        raise ValueError("User is already verified")
+
+    if get_settings().VERIFICATION_CODE_MODE == "hmac":
+        return issue_hmac_verification_code(user, expires_in_minutes)
+
     # Invalidate any previous unused codes
-    db.query(VerificationCode).filter(
-        VerificationCode.user_id == user_id,
-        VerificationCode.is_used == False
-    ).update({VerificationCode.is_used: True})
-    
-    # Generate and save a new code
+    if invalidate_previous:
+        db.query(VerificationCode).filter(
+            VerificationCode.user_id == user.id,
+            VerificationCode.is_used == False
+        ).update({VerificationCode.is_used: True})
+
+    # Generate and add a new code
     code = _generate_verification_code()
     expires_at = datetime.now(timezone.utc) + timedelta(minutes=expires_in_minutes)
 
-    verification = VerificationCode(
-        user_id=user_id,
+    db.add(VerificationCode(
+        user_id=user.id,
         code=code,
         expires_at=expires_at,
         is_used=False
-    )
-    db.add(verification)
-    db.commit()
-    db.refresh(verification)
+    ))
 
     return code
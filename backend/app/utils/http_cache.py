@@ -0,0 +1,75 @@
+"""
+HTTP caching module for user-scoped responses.
+This module provides ETag validators derived from a user's last update time and
+the conditional GET handling that answers a matching If-None-Match with a 304
+before any response body is built.
+"""
+
+import hashlib
+from typing import Optional
+from fastapi import Request, Response, status
+from backend.app.models.user import User
+
+# Only the user's own browser may store the response, and it must revalidate before reuse
+CACHE_CONTROL_PRIVATE = "private, no-cache"
+
+
+def user_etag(user: User) -> str:
+    """
+    Build a weak ETag for responses that depend only on the user's row.
+
+    Args:
+        user (User): The user the response is about
+
+    Returns:
+        str: Weak ETag that changes whenever the user is updated
+    """
+    changed_at = user.updated_at or user.created_at
+    version = changed_at.isoformat() if changed_at else ""
+    digest = hashlib.sha256(f"{user.id}:{version}".encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag using weak comparison.
+
+    Args:
+        if_none_match (Optional[str]): Raw If-None-Match header value
+        etag (str): Current ETag of the resource
+
+    Returns:
+        bool: True if the client already holds the current representation
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    opaque_tag = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(","))
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Apply conditional GET handling for a private, user-scoped response.
+
+    Caching headers are set on the route's injected response so they carry
+    over to the full response. If the client's copy is current, a bodiless 304
+    is returned instead and the route should return it as-is.
+
+    Args:
+        request (Request): The incoming request
+        response (Response): The route's injected Response
+        etag (str): Current ETag of the resource
+
+    Returns:
+        Optional[Response]: A 304 response, or None if the body must be sent
+    """
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL_PRIVATE
+    response.headers["Vary"] = "Authorization"
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=response.headers)
+    return None
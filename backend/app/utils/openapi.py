@@ -2,9 +2,16 @@
 OpenAPI/Swagger UI customization module for FastAPI application.
 This module provides functionality to customize the OpenAPI schema and Swagger UI
 to support JWT Bearer token authentication and improve API documentation.
+It can also serve a schema prebuilt at build time, so workers never generate
+it on the request path.
 """
 
-from fastapi import FastAPI
+import gzip
+import json
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional
+from fastapi import FastAPI, Request, Response
 from fastapi.openapi.utils import get_openapi
 
 def custom_openapi(app: FastAPI):
@@ -49,3 +56,126 @@ def custom_openapi(app: FastAPI):
 
     app.openapi_schema = openapi_schema
     return app.openapi_schema
+
+
+def build_openapi_schema(app: FastAPI) -> bytes:
+    """
+    Generate the customized OpenAPI schema and encode it as compact JSON.
+
+    Args:
+        app (FastAPI): FastAPI application instance
+
+    Returns:
+        bytes: UTF-8 encoded schema document
+    """
+    return json.dumps(custom_openapi(app), separators=(",", ":")).encode()
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Return True if an Accept-Encoding header allows gzip."""
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+class PrebuiltOpenAPI:
+    """
+    An OpenAPI schema file served as pre-encoded bytes.
+
+    The file is read once, and its gzip encoding and ETag are computed at
+    load time. Requests only pick the right body.
+
+    Attributes:
+        path (Path): Location of the prebuilt schema file
+        body (bytes): Schema bytes as stored in the file
+        gzip_body (bytes): gzip-compressed schema bytes
+        etag (str): Strong ETag derived from the schema bytes
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.body: Optional[bytes] = None
+        self.gzip_body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._schema: Optional[dict] = None
+
+    def load(self) -> None:
+        """
+        Read the schema file and precompute its encodings.
+
+        Raises:
+            FileNotFoundError: If the schema file does not exist
+        """
+        if self.body is not None:
+            return
+        body = self.path.read_bytes()
+        self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+        self.etag = f'"{sha256(body).hexdigest()[:32]}"'
+        self.body = body
+
+    def schema(self) -> dict:
+        """
+        Return the schema as a dict, for callers of app.openapi().
+
+        Returns:
+            dict: The decoded schema document
+        """
+        if self._schema is None:
+            self.load()
+            self._schema = json.loads(self.body)
+        return self._schema
+
+    def response(self, request: Request) -> Response:
+        """
+        Serve the schema, honouring If-None-Match and Accept-Encoding.
+
+        Args:
+            request (Request): The incoming request
+
+        Returns:
+            Response: 304 if the client's copy is current, else the schema bytes
+        """
+        self.load()
+        headers = {
+            "ETag": self.etag,
+            "Cache-Control": "public, no-cache",
+            "Vary": "Accept-Encoding",
+        }
+
+        if_none_match = request.headers.get("if-none-match", "")
+        if if_none_match.strip() == "*" or self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        if _accepts_gzip(request.headers.get("accept-encoding", "")):
+            headers["Content-Encoding"] = "gzip"
+            return Response(self.gzip_body, media_type="application/json", headers=headers)
+
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def install_prebuilt_openapi(app: FastAPI, path: str) -> PrebuiltOpenAPI:
+    """
+    Serve a prebuilt schema file at the app's OpenAPI URL.
+
+    Replaces FastAPI's generated /openapi.json route. The file itself is read
+    on the first request, or earlier if the caller invokes load() at startup.
+
+    Args:
+        app (FastAPI): FastAPI application instance
+        path (str): Location of the schema file written by build_openapi.py
+
+    Returns:
+        PrebuiltOpenAPI: The installed schema, for warming at startup
+    """
+    prebuilt = PrebuiltOpenAPI(path)
+
+    app.router.routes = [
+        route for route in app.router.routes
+        if getattr(route, "path", None) != app.openapi_url
+    ]
+    app.add_route(app.openapi_url, prebuilt.response, include_in_schema=False)
+    app.openapi = prebuilt.schema
+
+    return prebuilt
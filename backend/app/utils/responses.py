@@ -0,0 +1,42 @@
+"""
+Fast JSON response module for FastAPI application.
+This module provides a response class that renders Pydantic models straight to
+JSON bytes, skipping FastAPI's jsonable_encoder walk and, for sync routes, the
+extra threadpool hop FastAPI takes to validate a response_model.
+"""
+
+from typing import Any, Optional
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    JSON response rendered with pydantic-core for models and orjson for everything else.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def model_response(model: BaseModel, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Build a response from an already validated model inside the route.
+
+    Routes still declare response_model for the OpenAPI schema, but returning
+    a Response makes FastAPI skip its own validation and encoding of the body.
+
+    Args:
+        model (BaseModel): The response body
+        response (Optional[Response]): The route's injected Response, whose
+            headers and cookies are carried over
+        status_code (int): HTTP status code
+
+    Returns:
+        FastJSONResponse: The rendered response
+    """
+    return FastJSONResponse(model, status_code=status_code, headers=response.headers if response is not None else None)
@@ -1,6 +1,7 @@
 import re
 from typing import Any
 from pydantic_core import PydanticCustomError
+from backend.app.core.breached_passwords import get_breached_password_index
 
 def validate_password(value: Any) -> str:
     """
@@ -11,6 +12,7 @@ def validate_password(value: Any) -> str:
     - At least one lowercase letter
     - At least one uppercase letter
     - At least one number
+    - Not listed in the breached password index, when one was loaded at startup
     """
     if not isinstance(value, str):
         raise PydanticCustomError("string_type", "Password must be a string")
@@ -22,4 +24,7 @@ def validate_password(value: Any) -> str:
         raise PydanticCustomError("password_lowercase", "Password must contain at least one lowercase letter")
     if not re.search(r"\d", value):
         raise PydanticCustomError("password_number", "Password must contain at least one number")
+    breached = get_breached_password_index()
+    if breached is not None and value in breached:
+        raise PydanticCustomError("password_breached", "Password has appeared in a data breach, please choose another one")
     return value
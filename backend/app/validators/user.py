@@ -27,3 +27,16 @@ def validate_full_name(value: Any) -> str:
     if not value.replace(" ", "").isalpha():
         raise PydanticCustomError("full_name_alpha", "Full name must contain only alphabetic characters")
     return value
+
+
+def canonical_email(email: str) -> str:
+    """
+    Normalize an email address for case-insensitive lookups.
+
+    Args:
+        email (str): Email address as entered
+
+    Returns:
+        str: The address with surrounding whitespace removed, in lowercase
+    """
+    return email.strip().lower()
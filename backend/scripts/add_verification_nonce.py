@@ -0,0 +1,65 @@
+"""
+Migration script for the users.verification_nonce column.
+This script adds the column used by HMAC-derived verification codes to
+databases created before it existed. Tables are only created, never altered,
+on startup, and every User query fails without the column whatever
+VERIFICATION_CODE_MODE is, so run it once before starting the upgraded app.
+It can be re-run safely; databases that already have the column are skipped.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+
+def ensure_verification_nonce(engine) -> bool:
+    """
+    Add the verification_nonce column if it is missing.
+
+    Args:
+        engine (Engine): Database holding the users table
+
+    Returns:
+        bool: Whether the column had to be added
+    """
+    from sqlalchemy import inspect, text
+
+    added = "verification_nonce" not in {column["name"] for column in inspect(engine).get_columns("users")}
+    if added:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE users ADD COLUMN verification_nonce INTEGER NOT NULL DEFAULT 0"))
+    return added
+
+
+def main():
+    """
+    Parse command line arguments and migrate each configured database.
+
+    Command line options:
+        --database-url: Database to migrate (default: every DB_SHARD_URLS entry, else DATABASE_URL)
+    """
+    parser = argparse.ArgumentParser(description="Add the users.verification_nonce column")
+    parser.add_argument("--database-url", help="Database to migrate (default: the configured user databases)")
+
+    args = parser.parse_args()
+
+    from backend.app.config import get_settings
+    from backend.app.database import _create_engine
+
+    settings = get_settings()
+    urls = [args.database_url] if args.database_url else settings.DB_SHARD_URLS or [settings.DATABASE_URL]
+
+    for url in urls:
+        engine = _create_engine(url)
+        if ensure_verification_nonce(engine):
+            print(f"{engine.url!r}: added users.verification_nonce")
+        else:
+            print(f"{engine.url!r}: users.verification_nonce already present")
+        engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Backfill script for the users.email_canonical column.
+This script adds the column and its unique index to databases created before
+it existed, then fills it in batches for rows written before the column was
+populated on insert. It can be re-run safely; rows already holding their
+canonical email are skipped.
+
+Emails differing only by case normalize to the same canonical email. Only the
+first such account gets it; the others are reported and left NULL, and cannot
+log in until they are merged or renamed.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+
+def ensure_column(engine) -> bool:
+    """
+    Add the email_canonical column and its unique index if they are missing.
+
+    Args:
+        engine (Engine): Database holding the users table
+
+    Returns:
+        bool: Whether the column had to be added
+    """
+    from sqlalchemy import inspect, text
+    from backend.app.models.user import User
+
+    added = "email_canonical" not in {column["name"] for column in inspect(engine).get_columns("users")}
+    if added:
+        with engine.begin() as connection:
+            connection.execute(text("ALTER TABLE users ADD COLUMN email_canonical VARCHAR(255)"))
+    for index in User.__table__.indexes:
+        if "email_canonical" in index.columns:
+            index.create(engine, checkfirst=True)
+    return added
+
+
+def backfill(engine, batch_size: int) -> tuple[int, list[tuple[int, str]]]:
+    """
+    Fill email_canonical for every user, one committed batch at a time.
+
+    Rows are walked in ID order, so each batch is a range scan on the primary
+    key and concurrent registrations do not shift later batches.
+
+    Args:
+        engine (Engine): Database holding the users table
+        batch_size (int): Users read and updated per transaction
+
+    Returns:
+        tuple[int, list[tuple[int, str]]]: Number of rows updated, and the ID and email of
+            users left NULL because another account has the same canonical email
+    """
+    from sqlalchemy import bindparam, select, update
+    from sqlalchemy.exc import IntegrityError
+    from backend.app.models.user import User
+    from backend.app.validators.user import canonical_email
+
+    users = User.__table__
+    statement = update(users).where(users.c.id == bindparam("user_id")).values(email_canonical=bindparam("canonical"))
+    updated, conflicts, last_id = 0, [], 0
+
+    while True:
+        with engine.begin() as connection:
+            rows = connection.execute(
+                select(users.c.id, users.c.email, users.c.email_canonical)
+                .where(users.c.id > last_id).order_by(users.c.id).limit(batch_size)
+            ).all()
+        if not rows:
+            return updated, conflicts
+        last_id = rows[-1].id
+
+        changes = [
+            {"user_id": row.id, "canonical": canonical_email(row.email)}
+            for row in rows if row.email_canonical != canonical_email(row.email)
+        ]
+        if not changes:
+            continue
+        try:
+            with engine.begin() as connection:
+                connection.execute(statement, changes)
+            updated += len(changes)
+        except IntegrityError:
+            # A case-variant duplicate is in this batch; retry its rows one by one
+            for change in changes:
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(statement, [change])
+                    updated += 1
+                except IntegrityError:
+                    conflicts.append((change["user_id"], change["canonical"]))
+
+
+def main():
+    """
+    Parse command line arguments and backfill each configured database.
+
+    Command line options:
+        --database-url: Database to backfill (default: every DB_SHARD_URLS entry, else DATABASE_URL)
+        --batch-size: Users updated per transaction (default: 1000)
+    """
+    parser = argparse.ArgumentParser(description="Add and backfill users.email_canonical")
+    parser.add_argument("--database-url", help="Database to backfill (default: the configured user databases)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Users updated per transaction")
+
+    args = parser.parse_args()
+
+    from backend.app.config import get_settings
+    from backend.app.database import _create_engine
+
+    settings = get_settings()
+    urls = [args.database_url] if args.database_url else settings.DB_SHARD_URLS or [settings.DATABASE_URL]
+
+    conflict_count = 0
+    for url in urls:
+        engine = _create_engine(url)
+        if ensure_column(engine):
+            print(f"{engine.url!r}: added users.email_canonical")
+        updated, conflicts = backfill(engine, args.batch_size)
+        print(f"{engine.url!r}: updated {updated} users")
+        for user_id, canonical in conflicts:
+            print(f"  user {user_id}: {canonical} belongs to another account, left NULL")
+        conflict_count += len(conflicts)
+        engine.dispose()
+
+    if conflict_count:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Microbenchmark suite for the FastAPI authentication application.
+This script times the per-request CPU costs (password hashing and checking,
+JWT creation and verification, password and registration validation) and
+compares them with a stored baseline, failing when a function regressed by
+more than a set percentage.
+
+Baselines are machine-specific: record one with --save on the machine that
+runs --check, e.g. before and after a dependency bump.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import json
+import platform
+import sys
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+DEFAULT_BASELINE = project_root / "backend" / "build" / "microbench_baseline.json"
+PASSWORD = "ValidPass123"
+
+
+def build_benchmarks() -> dict[str, Callable[[], object]]:
+    """
+    Create the benchmarked calls with realistic inputs.
+
+    Returns:
+        dict[str, Callable]: Zero-argument callables by benchmark name
+    """
+    from backend.app.core.security import (
+        hash_password, verify_password, create_access_token, create_refresh_token, verify_token,
+    )
+    from backend.app.validators.password import validate_password
+    from backend.app.schemas.user import UserCreate
+
+    hashed = hash_password(PASSWORD)
+    token = create_access_token(data={"sub": "12345"})
+    registration = {
+        "email": "bench@example.com",
+        "password": PASSWORD,
+        "confirm_password": PASSWORD,
+        "full_name": "Bench User",
+    }
+
+    return {
+        "hash_password": lambda: hash_password(PASSWORD),
+        "verify_password": lambda: verify_password(PASSWORD, hashed),
+        "create_access_token": lambda: create_access_token(data={"sub": "12345"}),
+        "create_refresh_token": lambda: create_refresh_token(data={"sub": "12345"}),
+        "verify_token": lambda: verify_token(token),
+        "validate_password": lambda: validate_password(PASSWORD),
+        "user_create_validation": lambda: UserCreate.model_validate(registration),
+    }
+
+
+def measure(func: Callable[[], object], repeat: int, min_time: float) -> float:
+    """
+    Time a callable and return the best per-call time.
+
+    The number of calls per run is calibrated so each run takes at least
+    min_time, which keeps cheap functions above timer resolution and limits
+    bcrypt to a handful of calls.
+
+    Args:
+        func (Callable): Function to time
+        repeat (int): Number of timing runs
+        min_time (float): Minimum seconds per timing run
+
+    Returns:
+        float: Best observed time per call in microseconds
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number * 1e6
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float) -> list[str]:
+    """
+    Find benchmarks that got slower than the baseline by more than the threshold.
+
+    Args:
+        results (dict[str, float]): Current time per call in microseconds
+        baseline (dict[str, float]): Baseline time per call in microseconds
+        threshold (float): Allowed slowdown in percent
+
+    Returns:
+        list[str]: Names of the regressed benchmarks
+    """
+    return [
+        name for name, current in results.items()
+        if name in baseline and current > baseline[name] * (1 + threshold / 100)
+    ]
+
+
+def main():
+    """
+    Parse command line arguments and run the benchmarks.
+
+    Command line options:
+        -b, --baseline: Baseline file (default: backend/build/microbench_baseline.json)
+        --save: Store the results as the new baseline
+        --check: Exit with status 1 if a benchmark regressed beyond the threshold
+        -t, --threshold: Allowed slowdown in percent (default: 20)
+        -k, --filter: Only run benchmarks whose name contains this text
+        -r, --repeat: Number of timing runs per benchmark
+        --min-time: Minimum seconds per timing run
+    """
+    parser = argparse.ArgumentParser(description="Run hot path microbenchmarks")
+    parser.add_argument("-b", "--baseline", default=str(DEFAULT_BASELINE), help="Baseline file")
+    parser.add_argument("--save", action="store_true", help="Store the results as the new baseline")
+    parser.add_argument("--check", action="store_true", help="Fail if a benchmark regressed beyond the threshold")
+    parser.add_argument("-t", "--threshold", type=float, default=20.0, help="Allowed slowdown in percent")
+    parser.add_argument("-k", "--filter", default="", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Timing runs per benchmark")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per timing run")
+
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    baseline = json.loads(baseline_path.read_text())["results"] if baseline_path.exists() else {}
+    if args.check and not baseline:
+        parser.error(f"No baseline at {baseline_path}; record one with --save")
+
+    results = {}
+    print(f"{'benchmark':<26}{'time (us)':>14}{'baseline (us)':>15}{'change':>10}")
+    for name, func in build_benchmarks().items():
+        if args.filter not in name:
+            continue
+        results[name] = measure(func, args.repeat, args.min_time)
+        line = f"{name:<26}{results[name]:>14.2f}"
+        if name in baseline:
+            line += f"{baseline[name]:>15.2f}{(results[name] / baseline[name] - 1) * 100:>+9.1f}%"
+        print(line)
+
+    if args.save:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "results": {name: round(value, 3) for name, value in {**baseline, **results}.items()},
+        }, indent=2))
+        print(f"\nBaseline written to {baseline_path}")
+
+    regressed = compare(results, baseline, args.threshold)
+    if regressed:
+        print(f"\nRegressed by more than {args.threshold:g}%: {', '.join(regressed)}")
+        if args.check:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Serialization microbenchmark for the FastAPI authentication application.
+This script compares the generic FastAPI response path (dict through
+jsonable_encoder into JSONResponse) with the typed model path used by the
+routes (model rendered by FastJSONResponse) for the token and message payloads.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from backend.app.schemas.auth import TokenResponse
+from backend.app.schemas.common import MessageResponse
+from backend.app.utils.responses import model_response
+
+# Representative HS256 access token
+ACCESS_TOKEN = (
+    "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJzdWIiOiIxMjM0NSIsImV4cCI6MTc2MDAwMDAwMH0."
+    "c2lnbmF0dXJlLXBsYWNlaG9sZGVyLXNpZ25hdHVyZS1wbGFjZWhvbGRlcg"
+)
+MESSAGE = "Welcome, Benchmark User!"
+
+CASES = {
+    "token": {
+        "baseline": lambda: JSONResponse(jsonable_encoder({"access_token": ACCESS_TOKEN, "token_type": "bearer"})),
+        "typed": lambda: model_response(TokenResponse(access_token=ACCESS_TOKEN)),
+    },
+    "message": {
+        "baseline": lambda: JSONResponse(jsonable_encoder({"message": MESSAGE})),
+        "typed": lambda: model_response(MessageResponse(message=MESSAGE)),
+    },
+}
+
+
+def measure(func, number: int, repeat: int) -> float:
+    """
+    Time a callable and return the best per-call time.
+
+    Args:
+        func (Callable): Function to time
+        number (int): Calls per timing run
+        repeat (int): Number of timing runs
+
+    Returns:
+        float: Best observed time per call in microseconds
+    """
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    """
+    Parse command line arguments and run the benchmark.
+
+    Command line options:
+        -n, --number: Calls per timing run
+        -r, --repeat: Number of timing runs
+    """
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("-n", "--number", type=int, default=20000, help="Calls per timing run")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of timing runs")
+
+    args = parser.parse_args()
+
+    # Both paths must produce the same JSON document
+    for paths in CASES.values():
+        assert json.loads(paths["baseline"]().body) == json.loads(paths["typed"]().body)
+
+    print(f"{'payload':<10}{'baseline (us)':>15}{'typed (us)':>13}{'speedup':>10}")
+    for payload, paths in CASES.items():
+        baseline = measure(paths["baseline"], args.number, args.repeat)
+        typed = measure(paths["typed"], args.number, args.repeat)
+        print(f"{payload:<10}{baseline:>15.2f}{typed:>13.2f}{baseline / typed:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Cold-start benchmark script for the FastAPI authentication application.
+This script measures, in fresh interpreter processes, how long it takes to
+import the application, run its startup hooks and serve the first request.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+
+# Runs inside a fresh interpreter so every sample pays the full import cost
+_PROBE = """
+import json, time
+start = time.perf_counter()
+from backend.app.main import app
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+with TestClient(app) as client:
+    started = time.perf_counter()
+    response = client.get("/")
+    responded = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_response_ms": (responded - started) * 1000,
+    "total_ms": (responded - start) * 1000,
+}))
+"""
+
+
+def run_probe() -> dict:
+    """
+    Measure one cold start in a new Python process.
+
+    Returns:
+        dict: Timings in milliseconds for import, startup, first response and total
+
+    Raises:
+        subprocess.CalledProcessError: If the probe process fails
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        cwd=project_root,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize(samples: list[dict]) -> dict:
+    """
+    Summarize probe samples per metric.
+
+    Args:
+        samples (list[dict]): Timings returned by run_probe
+
+    Returns:
+        dict: min, median and max for each metric
+    """
+    return {
+        metric: {
+            "min": round(min(values), 1),
+            "median": round(statistics.median(values), 1),
+            "max": round(max(values), 1),
+        }
+        for metric in samples[0]
+        for values in [[sample[metric] for sample in samples]]
+    }
+
+
+def main():
+    """
+    Parse command line arguments and run the benchmark.
+
+    Command line options:
+        -n, --runs: Number of cold starts to measure
+        -o, --output: Write the summary as JSON to this file
+    """
+    parser = argparse.ArgumentParser(description="Measure application cold-start time")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="Number of cold starts to measure")
+    parser.add_argument("-o", "--output", help="Write the summary as JSON to this file")
+
+    args = parser.parse_args()
+
+    try:
+        samples = [run_probe() for _ in range(args.runs)]
+    except subprocess.CalledProcessError as e:
+        print(f"Startup probe failed with exit code {e.returncode}:\n{e.stderr}")
+        sys.exit(e.returncode)
+
+    summary = summarize(samples)
+
+    print(f"{'metric':<20}{'min':>10}{'median':>10}{'max':>10}  (ms, {args.runs} runs)")
+    for metric, stats in summary.items():
+        print(f"{metric:<20}{stats['min']:>10}{stats['median']:>10}{stats['max']:>10}")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({"runs": args.runs, "summary": summary}, indent=2))
+
+if __name__ == "__main__":
+    main()
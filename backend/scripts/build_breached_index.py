@@ -0,0 +1,82 @@
+"""
+Breached password index build script for the FastAPI authentication application.
+This script converts breach corpus text dumps into the sorted binary index
+that the password validator memory-maps when BREACHED_PASSWORDS_FILE points
+at it.
+
+Inputs are either SHA-1 dumps with one "<SHA-1 hex>[:<count>]" line per
+password (e.g. the Pwned Passwords downloads, in any order), or plain
+password lists with --plaintext. Several inputs are merged into one index.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+DEFAULT_OUTPUT = project_root / "backend" / "build" / "breached_passwords.idx"
+
+
+def read_lines(paths: list[str]):
+    """
+    Stream the lines of the input files as bytes.
+
+    Args:
+        paths (list[str]): Input files, "-" for standard input
+
+    Yields:
+        bytes: One line, newline included
+    """
+    for path in paths:
+        if path == "-":
+            yield from sys.stdin.buffer
+            continue
+        with open(path, "rb") as file:
+            yield from file
+
+
+def main():
+    """
+    Parse command line arguments and build the index.
+
+    Command line options:
+        inputs: Text dumps to convert ("-" for standard input)
+        -o, --output: Index file (default: backend/build/breached_passwords.idx)
+        --plaintext: Inputs list passwords rather than SHA-1 hashes
+        --min-count: Skip hashes seen fewer times than this (default: 1)
+        --prefix-bytes: Bytes kept of each SHA-1 digest (default: 8)
+        --run-size: Hashes sorted in memory at a time (default: 1000000)
+    """
+    from backend.app.core.breached_passwords import DEFAULT_PREFIX_BYTES, DEFAULT_RUN_SIZE, build_breached_index
+
+    parser = argparse.ArgumentParser(description="Build the breached password index")
+    parser.add_argument("inputs", nargs="+", help="Text dumps to convert (\"-\" for standard input)")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="Index file")
+    parser.add_argument("--plaintext", action="store_true", help="Inputs list passwords rather than SHA-1 hashes")
+    parser.add_argument("--min-count", type=int, default=1, help="Skip hashes seen fewer times than this")
+    parser.add_argument("--prefix-bytes", type=int, default=DEFAULT_PREFIX_BYTES, choices=range(4, 21), metavar="4-20",
+                        help="Bytes kept of each SHA-1 digest")
+    parser.add_argument("--run-size", type=int, default=DEFAULT_RUN_SIZE, help="Hashes sorted in memory at a time")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    count, malformed = build_breached_index(
+        read_lines(args.inputs),
+        args.output,
+        prefix_bytes=args.prefix_bytes,
+        plaintext=args.plaintext,
+        min_count=args.min_count,
+        run_size=args.run_size,
+    )
+    print(f"Wrote {count} hashes to {args.output} in {time.perf_counter() - start:.1f}s")
+    if malformed:
+        print(f"Skipped {malformed} malformed lines", file=sys.stderr)
+    print(f"Enable the check with BREACHED_PASSWORDS_FILE={args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+OpenAPI build script for the FastAPI authentication application.
+This script generates the final OpenAPI schema once and writes it to a file,
+which the app serves when OPENAPI_SCHEMA_FILE points at it.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import sys
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+DEFAULT_OUTPUT = project_root / "backend" / "build" / "openapi.json"
+
+
+def build(output: Path) -> int:
+    """
+    Generate the schema from the application's routes and write it to a file.
+
+    Args:
+        output (Path): Destination file
+
+    Returns:
+        int: Number of bytes written
+    """
+    from backend.app.main import app
+    from backend.app.utils.openapi import build_openapi_schema
+
+    body = build_openapi_schema(app)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_bytes(body)
+    return len(body)
+
+
+def main():
+    """
+    Parse command line arguments and build the schema.
+
+    Command line options:
+        -o, --output: Destination file (default: backend/build/openapi.json)
+    """
+    parser = argparse.ArgumentParser(description="Prebuild the OpenAPI schema")
+    parser.add_argument("-o", "--output", default=str(DEFAULT_OUTPUT), help="Destination file")
+
+    args = parser.parse_args()
+
+    size = build(Path(args.output))
+    print(f"Wrote {size} bytes to {args.output}")
+    print(f"Serve it with OPENAPI_SCHEMA_FILE={args.output}")
+
+if __name__ == "__main__":
+    main()
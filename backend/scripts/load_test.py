@@ -0,0 +1,424 @@
+"""
+Load test script for the FastAPI authentication application.
+This script drives a weighted mix of auth flows (register, verify, login,
+refresh storm, protected-route polling) with concurrent async clients, either
+against the app in-process or against a running server over HTTP, and reports
+requests per second and latency percentiles per endpoint. Results are also
+written to a JSON file so runs can be compared over time.
+
+Test users are seeded directly into the database, so in HTTP mode the server
+must use the same DATABASE_URL. Verification codes are read from the stubbed
+mail sink in-process and from the database over HTTP; start the server with
+MAIL_SUPPRESS_SEND=true and generous RATE_LIMIT_* settings.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+import httpx
+
+DEFAULT_OUTPUT_DIR = project_root / "backend" / "build" / "loadtest"
+DEFAULT_MIX = "login=10,refresh=20,poll=55,register=10,verify=5"
+SCENARIOS = ("register", "verify", "login", "refresh", "poll")
+PASSWORD = "LoadTest123"
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """
+    Parse a scenario mix such as "login=10,poll=90".
+
+    Args:
+        value (str): Comma-separated scenario=weight pairs
+
+    Returns:
+        dict[str, float]: Weight per scenario
+
+    Raises:
+        argparse.ArgumentTypeError: If a scenario is unknown or a weight is invalid
+    """
+    mix = {}
+    for part in value.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario {name!r}, expected one of {', '.join(SCENARIOS)}")
+        try:
+            mix[name] = float(weight or 1)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Invalid weight {weight!r} for {name}")
+    if not any(weight > 0 for weight in mix.values()):
+        raise argparse.ArgumentTypeError("At least one scenario needs a positive weight")
+    return mix
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile of an ascending list.
+
+    Args:
+        sorted_values (list[float]): Values in ascending order
+        q (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile, or 0.0 for an empty list
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * q // 100))
+    return sorted_values[int(rank) - 1]
+
+
+class Recorder:
+    """
+    Collects latency and status code per endpoint.
+    """
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = {}
+        self.statuses: dict[str, dict[str, int]] = {}
+
+    async def request(self, client: httpx.AsyncClient, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        """
+        Send a request and record its latency under "METHOD path".
+
+        Returns:
+            Optional[httpx.Response]: The response, or None on a transport error
+        """
+        endpoint = f"{method} {path}"
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            status = str(response.status_code)
+        except httpx.HTTPError:
+            response, status = None, "error"
+        elapsed = time.perf_counter() - start
+
+        self.latencies.setdefault(endpoint, []).append(elapsed)
+        statuses = self.statuses.setdefault(endpoint, {})
+        statuses[status] = statuses.get(status, 0) + 1
+        return response
+
+    def summary(self, duration: float) -> dict:
+        """
+        Summarize the recorded requests.
+
+        Args:
+            duration (float): Wall-clock length of the run in seconds
+
+        Returns:
+            dict: Totals and per-endpoint RPS, error count and latency percentiles in ms
+        """
+        def summarize(latencies: list[float], statuses: dict[str, int]) -> dict:
+            ordered = sorted(latencies)
+            errors = sum(count for status, count in statuses.items() if status == "error" or int(status) >= 400)
+            return {
+                "requests": len(ordered),
+                "errors": errors,
+                "rps": round(len(ordered) / duration, 2) if duration else 0.0,
+                "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+                "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+                "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2) if ordered else 0.0,
+                "statuses": dict(sorted(statuses.items())),
+            }
+
+        all_statuses: dict[str, int] = {}
+        for statuses in self.statuses.values():
+            for status, count in statuses.items():
+                all_statuses[status] = all_statuses.get(status, 0) + count
+
+        return {
+            "total": summarize([value for values in self.latencies.values() for value in values], all_statuses),
+            "endpoints": {
+                endpoint: summarize(self.latencies[endpoint], self.statuses[endpoint])
+                for endpoint in sorted(self.latencies)
+            },
+        }
+
+
+class CodeSource:
+    """
+    Finds the verification code last sent to an address.
+
+    In-process, the mail sender is replaced by a sink that records codes.
+    Over HTTP, codes are read from the shared database.
+    """
+
+    def __init__(self, from_sink: bool):
+        self.from_sink = from_sink
+        self.sent: dict[str, str] = {}
+
+    async def sink(self, email, code: str) -> None:
+        self.sent[str(email)] = code
+
+    def _read_from_db(self, email: str) -> Optional[str]:
+        from backend.app.config import get_settings
+        from backend.app.database import create_session
+        from backend.app.models.user import User
+        from backend.app.models.verification_code import VerificationCode
+        from backend.app.utils.email_verification import _time_window, derive_verification_code
+        from backend.app.validators.user import canonical_email
+
+        settings = get_settings()
+        with create_session() as db:
+            user = db.query(User).filter(User.email_canonical == canonical_email(email)).first()
+            if user is None:
+                return None
+            if settings.VERIFICATION_CODE_MODE == "hmac":
+                window = _time_window(settings.VERIFICATION_CODE_EXPIRE_MINUTES)
+                return derive_verification_code(user.id, user.verification_nonce, window)
+            row = db.query(VerificationCode).filter(
+                VerificationCode.user_id == user.id, VerificationCode.is_used == False
+            ).order_by(VerificationCode.id.desc()).first()
+            return row.code if row else None
+
+    async def get(self, email: str) -> Optional[str]:
+        if self.from_sink:
+            return self.sent.get(email)
+        return await asyncio.to_thread(self._read_from_db, email)
+
+
+def seed_users(count: int, run_id: str) -> list[str]:
+    """
+    Insert verified users for the login, refresh and poll scenarios.
+
+    All users share one password hash, so seeding does not pay for a bcrypt
+    hash per user.
+
+    Args:
+        count (int): Number of users
+        run_id (str): Suffix keeping emails unique across runs
+
+    Returns:
+        list[str]: The seeded email addresses
+    """
+    from backend.app.core.security import hash_password
+    from backend.app.database import create_session, init_db
+    from backend.app.models.user import User
+
+    init_db()
+    hashed = hash_password(PASSWORD)
+    emails = [f"load-{run_id}-{n}@example.com" for n in range(count)]
+    with create_session() as db:
+        db.add_all(User(email=email, hashed_password=hashed, full_name="Load Test", is_verified=True) for email in emails)
+        db.commit()
+    return emails
+
+
+class VirtualUser:
+    """
+    One simulated client with its own cookies, access token and cached ETag.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, recorder: Recorder, codes: CodeSource, email: str, run_id: str):
+        self.client = client
+        self.recorder = recorder
+        self.codes = codes
+        self.email = email
+        self.run_id = run_id
+        self.access_token: Optional[str] = None
+        self.etag: Optional[str] = None
+
+    async def login(self) -> None:
+        response = await self.recorder.request(
+            self.client, "POST", "/auth/login", json={"email": self.email, "password": PASSWORD})
+        if response is not None and response.status_code == 200:
+            self.access_token = response.json()["access_token"]
+
+    async def refresh(self) -> None:
+        if "refresh_token" not in self.client.cookies:
+            await self.login()
+        response = await self.recorder.request(self.client, "POST", "/auth/refresh")
+        if response is not None and response.status_code == 200:
+            self.access_token = response.json()["access_token"]
+
+    async def poll(self) -> None:
+        if self.access_token is None:
+            await self.login()
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        response = await self.recorder.request(self.client, "GET", "/user/home", headers=headers)
+        if response is not None and response.status_code == 200:
+            self.etag = response.headers.get("ETag")
+
+    async def _register_new(self) -> str:
+        email = f"new-{self.run_id}-{uuid.uuid4().hex[:12]}@example.com"
+        await self.recorder.request(self.client, "POST", "/auth/register", json={
+            "email": email,
+            "password": PASSWORD,
+            "confirm_password": PASSWORD,
+            "full_name": "Load Test",
+        })
+        return email
+
+    async def register(self) -> None:
+        await self._register_new()
+
+    async def verify(self) -> None:
+        email = await self._register_new()
+        code = await self.codes.get(email)
+        if code is not None:
+            await self.recorder.request(self.client, "POST", "/auth/verify-email", json={"email": email, "code": code})
+
+
+async def run_load(client_factory, mix: dict[str, float], concurrency: int, duration: float,
+                   emails: list[str], codes: CodeSource, run_id: str) -> tuple[Recorder, float]:
+    """
+    Run virtual users until the duration has elapsed.
+
+    Returns:
+        tuple[Recorder, float]: Recorded requests and the measured wall-clock time
+    """
+    recorder = Recorder()
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int) -> None:
+        async with client_factory() as client:
+            user = VirtualUser(client, recorder, codes, emails[index % len(emails)], run_id)
+            while time.perf_counter() < deadline:
+                await getattr(user, random.choices(names, weights)[0])()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(index) for index in range(concurrency)))
+    return recorder, time.perf_counter() - start
+
+
+async def run(args) -> dict:
+    """
+    Set up the target, seed users and run the load test.
+
+    Returns:
+        dict: Run configuration and results
+    """
+    in_process = args.url is None
+    run_id = uuid.uuid4().hex[:8]
+    codes = CodeSource(from_sink=in_process)
+
+    if in_process:
+        from backend.app.main import app
+        import backend.app.routes.auth as auth_routes
+
+        auth_routes.send_verification_email = codes.sink
+        transport = httpx.ASGITransport(app=app)
+
+        def client_factory():
+            return httpx.AsyncClient(transport=transport, base_url="http://loadtest")
+
+        async with app.router.lifespan_context(app):
+            emails = seed_users(args.users, run_id)
+            recorder, duration = await run_load(client_factory, args.mix, args.concurrency, args.duration, emails, codes, run_id)
+    else:
+        def client_factory():
+            return httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+
+        emails = seed_users(args.users, run_id)
+        recorder, duration = await run_load(client_factory, args.mix, args.concurrency, args.duration, emails, codes, run_id)
+
+    from backend.app.config import get_settings
+
+    return {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "config": {
+            "target": args.url or "in-process",
+            "database": get_settings().DATABASE_URL.split("://")[0],
+            "mix": args.mix,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "users": args.users,
+        },
+        "duration_s": round(duration, 3),
+        **recorder.summary(duration),
+    }
+
+
+def print_report(result: dict, baseline: Optional[dict] = None) -> None:
+    """
+    Print per-endpoint results, with the change against a previous run if given.
+
+    Args:
+        result (dict): Results of this run
+        baseline (Optional[dict]): Results of an earlier run to compare against
+    """
+    header = f"{'endpoint':<26}{'requests':>9}{'errors':>8}{'rps':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    if baseline:
+        header += f"{'rps chg':>10}{'p95 chg':>10}"
+    print(header)
+
+    rows = [*result["endpoints"].items(), ("total", result["total"])]
+    for endpoint, stats in rows:
+        line = (f"{endpoint:<26}{stats['requests']:>9}{stats['errors']:>8}{stats['rps']:>10.1f}"
+                f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}")
+        if baseline:
+            previous = baseline["total"] if endpoint == "total" else baseline["endpoints"].get(endpoint)
+            if previous and previous["rps"] and previous["p95_ms"]:
+                line += f"{(stats['rps'] / previous['rps'] - 1) * 100:>+9.1f}%{(stats['p95_ms'] / previous['p95_ms'] - 1) * 100:>+9.1f}%"
+        print(line)
+
+
+def main():
+    """
+    Parse command line arguments and run the load test.
+
+    Command line options:
+        --url: Base URL of a running server (default: drive the app in-process)
+        --database-url: Database to seed and, in-process, to run against
+            (default: a temporary SQLite file in-process, DATABASE_URL over HTTP)
+        -c, --concurrency: Number of concurrent virtual users
+        -d, --duration: Seconds to run
+        -m, --mix: Weighted scenario mix, e.g. "login=10,poll=90"
+        -u, --users: Number of seeded verified users
+        -o, --output: JSON result file (default: backend/build/loadtest/<timestamp>.json)
+        --compare: Earlier JSON result to compare against
+        --keep-rate-limits: Leave rate limiting on for in-process runs
+    """
+    parser = argparse.ArgumentParser(description="Load test the auth flow")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process)")
+    parser.add_argument("--database-url", help="Database URL (SQLite or Postgres)")
+    parser.add_argument("-c", "--concurrency", type=int, default=10, help="Concurrent virtual users")
+    parser.add_argument("-d", "--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("-m", "--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"Scenario mix (default: {DEFAULT_MIX})")
+    parser.add_argument("-u", "--users", type=int, default=20, help="Seeded verified users")
+    parser.add_argument("-o", "--output", help="JSON result file")
+    parser.add_argument("--compare", help="Earlier JSON result to compare against")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Request timeout in seconds (HTTP mode)")
+    parser.add_argument("--keep-rate-limits", action="store_true", help="Keep rate limiting on in-process")
+
+    args = parser.parse_args()
+
+    # Settings are read on first use, so the environment has to be set before the app is imported
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    elif args.url is None:
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp(prefix='loadtest-')}/loadtest.db"
+    if args.url is None and not args.keep_rate_limits:
+        os.environ["RATE_LIMIT_ENABLED"] = "false"
+
+    result = asyncio.run(run(args))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(result, baseline)
+
+    output = Path(args.output) if args.output else DEFAULT_OUTPUT_DIR / f"{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2))
+    print(f"\nResults written to {output}")
+
+if __name__ == "__main__":
+    main()
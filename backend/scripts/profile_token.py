@@ -0,0 +1,43 @@
+"""
+Profile token script for the FastAPI authentication application.
+This script prints an X-Profile header value, signed with PROFILING_SECRET,
+that makes the server profile any request carrying it until the token expires.
+"""
+
+#!/usr/bin/env python3
+import argparse
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root))
+
+
+def main():
+    """
+    Parse command line arguments and print the header.
+
+    Command line options:
+        -t, --ttl: Seconds the token stays valid (default: 300)
+        -s, --secret: Signing key (default: PROFILING_SECRET from the environment)
+    """
+    parser = argparse.ArgumentParser(description="Create a signed X-Profile header")
+    parser.add_argument("-t", "--ttl", type=int, default=300, help="Seconds the token stays valid")
+    parser.add_argument("-s", "--secret", help="Signing key (default: PROFILING_SECRET)")
+
+    args = parser.parse_args()
+
+    from backend.app.core.profiling import PROFILE_HEADER, sign_profile_token
+
+    secret = args.secret
+    if secret is None:
+        from backend.app.config import get_settings
+        secret = get_settings().PROFILING_SECRET
+    if not secret:
+        parser.error("PROFILING_SECRET is not set; pass --secret")
+
+    print(f"{PROFILE_HEADER}: {sign_profile_token(int(time.time()) + args.ttl, secret)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 """
 Test runner script for the FastAPI authentication application.
 This script provides a command-line interface to run tests with various options
-including verbosity control and coverage reporting.
+including verbosity control, coverage reporting and parallel workers.
+
+Parallel mode splits the test files between several pytest processes. Each
+worker gets its own TEST_WORKER_ID and therefore its own test database.
 """
 
 #!/usr/bin/env python3
@@ -9,6 +12,7 @@ import os
 import sys
 import subprocess
 import argparse
+import tempfile
 from pathlib import Path
 
 # Add backend/app to the Python path
@@ -57,6 +61,71 @@ def run_tests(verbose=True, coverage=False, test_path=None):
         print("\nTest run interrupted by user")
         sys.exit(1)
 
+def split_test_files(test_path, workers):
+    """
+    Split the test files under a path into balanced groups.
+
+    Files are assigned largest first to the group with the least code so far,
+    using file size as an estimate of run time.
+
+    Args:
+        test_path (str): Test file or directory
+        workers (int): Number of groups
+
+    Returns:
+        list[list[str]]: Non-empty groups of test file paths
+    """
+    path = Path(test_path)
+    files = [path] if path.is_file() else sorted(path.rglob("test_*.py"))
+    groups = [[] for _ in range(workers)]
+    sizes = [0] * workers
+    for file in sorted(files, key=lambda f: f.stat().st_size, reverse=True):
+        index = sizes.index(min(sizes))
+        groups[index].append(str(file))
+        sizes[index] += file.stat().st_size
+    return [group for group in groups if group]
+
+def run_tests_parallel(workers, verbose=True, test_path=None):
+    """
+    Run pytest in several processes at once, each on a share of the test files.
+
+    Args:
+        workers (int): Number of pytest processes
+        verbose (bool, optional): Enable verbose output. Defaults to True.
+        test_path (str, optional): Path to specific test file or directory. Defaults to None.
+
+    Note:
+        Each worker's output is printed once it finishes; the script exits
+        with the first non-zero worker exit code
+    """
+    groups = split_test_files(test_path or "backend/tests/", workers)
+    processes = []
+    try:
+        for worker_id, files in enumerate(groups):
+            output = tempfile.TemporaryFile(mode="w+")
+            cmd = ["pytest", "-v" if verbose else "-q", "-p", "no:cacheprovider", *files]
+            env = {**os.environ, "TEST_WORKER_ID": f"gw{worker_id}"}
+            processes.append((worker_id, subprocess.Popen(cmd, env=env, stdout=output, stderr=subprocess.STDOUT), output))
+
+        return_codes = []
+        for worker_id, process, output in processes:
+            return_codes.append(process.wait())
+            output.seek(0)
+            print(f"===== worker gw{worker_id} (exit code {process.returncode}) =====")
+            print(output.read())
+            output.close()
+    except KeyboardInterrupt:
+        for _, process, _ in processes:
+            process.terminate()
+        print("\nTest run interrupted by user")
+        sys.exit(1)
+
+    failed = [code for code in return_codes if code != 0]
+    if failed:
+        print(f"Tests failed with exit code {failed[0]}")
+        sys.exit(failed[0])
+    print(f"All {len(groups)} workers passed")
+
 def main():
     """
     Parse command line arguments and run tests.
@@ -65,6 +134,7 @@ def main():
         -q, --quiet: Run tests without verbose output
         -c, --coverage: Generate coverage report
         -p, --path: Specify test file or directory path
+        -n, --workers: Number of parallel pytest processes (0 for one per CPU)
         
     Raises:
         SystemExit: If pytest-cov is not installed when coverage is requested
@@ -73,8 +143,16 @@ def main():
     parser.add_argument("-q", "--quiet", action="store_true", help="Run tests quietly")
     parser.add_argument("-c", "--coverage", action="store_true", help="Include coverage report")
     parser.add_argument("-p", "--path", help="Path to specific test file or folder")
+    parser.add_argument("-n", "--workers", type=int, default=1, help="Parallel pytest processes, 0 for one per CPU")
 
     args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    if workers > 1:
+        if args.coverage:
+            parser.error("--coverage cannot be combined with --workers")
+        run_tests_parallel(workers, verbose=not args.quiet, test_path=args.path)
+        return
 
     if args.coverage:
         try:
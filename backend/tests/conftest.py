@@ -1,44 +1,75 @@
 """
 Test configuration and fixtures for the FastAPI authentication application.
 This module sets up the test environment including:
-- In-memory SQLite database for testing
+- SQLite test database, in memory by default, created once per test process
+- Per-test isolation by rolling back a transaction instead of rebuilding the schema
+- Low-cost password hashing (disable with FAST_TESTS=0)
 - Test client fixture
 - Database session fixture
 - Dependency overrides for testing
+
+Each test runs inside a transaction on a single connection. The app's sessions
+and the db_session fixture join it through savepoints, so their commits are
+visible to each other but everything is rolled back when the test ends.
 """
 
+import os
 import sys
 from pathlib import Path
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from backend.app.database import Base, get_db
 from backend.app.main import app
+from backend.app.core.rate_limit import get_rate_limiter
+from backend.app.core.idempotency import get_idempotency_store
+from backend.app.core.single_flight import get_refresh_single_flight
+from backend.app.core.email_filter import get_email_filter
+from backend.app.core.security import pwd_context
+from backend.app.config import get_settings
 
 # Add the project root directory to Python path
 project_root = str(Path(__file__).parent.parent)
 sys.path.insert(0, project_root)
 
-# Test database setup
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# Test database setup. TEST_DATABASE_URL may contain "{worker}", replaced by
+# the TEST_WORKER_ID set by run_tests.py --workers, to give each worker its own file.
+TEST_WORKER_ID = os.getenv("TEST_WORKER_ID", "main")
+SQLALCHEMY_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite:///:memory:").format(worker=TEST_WORKER_ID)
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# pysqlite's own transaction handling does not support SAVEPOINT; turn it off
+# and let SQLAlchemy emit BEGIN itself
+@event.listens_for(engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+@event.listens_for(engine, "begin")
+def _emit_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
+# Sessions are bound to the current test's connection by the db_connection fixture
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, join_transaction_mode="create_savepoint")
+
+# bcrypt's minimum cost; hashes stay real bcrypt hashes, just cheap to compute
+if os.getenv("FAST_TESTS", "1") != "0":
+    pwd_context.update(bcrypt__rounds=4)
 
 # Override the get_db dependency
 def override_get_db():
     """
     Override the database dependency for testing.
-    
+
     Yields:
         Session: A test database session
-        
+
     Note:
         This function is used to override the get_db dependency
         in the FastAPI application for testing purposes.
@@ -51,37 +82,71 @@ def override_get_db():
 
 app.dependency_overrides[get_db] = override_get_db
 
+# Tables are created on the test engine once per test process, not on app startup
+get_settings().DB_CREATE_TABLES_ON_STARTUP = False
+# The registered email filter would be built from the app database, not the test
+# one; tests of the filter build it from db_session themselves
+get_settings().EMAIL_FILTER_ENABLED = False
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """
+    Create the database tables once for the whole test run.
+
+    Yields:
+        Engine: The test database engine
+    """
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    Base.metadata.drop_all(bind=engine)
+
+@pytest.fixture(scope="function", autouse=True)
+def db_connection(database):
+    """
+    Run each test inside a transaction that is rolled back afterwards.
+
+    Yields:
+        Connection: The connection every test session is bound to
+    """
+    connection = database.connect()
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    try:
+        yield connection
+    finally:
+        transaction.rollback()
+        connection.close()
+
 @pytest.fixture(scope="function")
 def client():
     """
     Test client fixture that provides a FastAPI TestClient instance.
-    
+
     This fixture:
-    1. Creates fresh database tables before each test
+    1. Resets rate limit counters, stored idempotency keys, recent refresh rotations
+       and the registered email filter
     2. Provides a test client instance
-    3. Cleans up database tables after each test
-    
+
     Yields:
         TestClient: A FastAPI test client instance
     """
-    # Create the database and tables
-    Base.metadata.create_all(bind=engine)
-    
+    get_rate_limiter().reset()
+    get_idempotency_store().reset()
+    get_refresh_single_flight().reset()
+    get_email_filter().reset()
+
     # Create test client
     with TestClient(app) as test_client:
         yield test_client
-    
-    # Clean up after test
-    Base.metadata.drop_all(bind=engine)
 
 @pytest.fixture(scope="function")
 def db_session():
     """
     Database session fixture for direct database access in tests.
-    
+
     Yields:
         Session: A SQLAlchemy database session
-        
+
     Note:
         The session is automatically closed after each test
     """
@@ -89,4 +154,4 @@ def db_session():
     try:
         yield session
     finally:
-        session.close() 
\ No newline at end of file
+        session.close()
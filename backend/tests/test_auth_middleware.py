@@ -0,0 +1,136 @@
+"""
+Test suite for the authentication middleware.
+This module contains tests for:
+- Rejecting invalid tokens before routing, body parsing and session checkout
+- Public routes ignoring stale tokens
+- Exposing the verified principal on the request
+"""
+
+import pytest
+from datetime import datetime, timezone
+from fastapi import Request
+from pydantic import BaseModel
+from backend.app.database import get_db
+from backend.app.dependencies.auth import public
+from backend.app.models.user import User
+from backend.app.core.security import hash_password, create_access_token
+from backend.app.core.query_recorder import assert_max_queries
+
+
+class Payload(BaseModel):
+    value: int
+
+
+@pytest.fixture
+def probe_routes(client):
+    """
+    Add temporary protected and public routes to the app.
+
+    Yields:
+        list: Paths whose handler ran
+    """
+    calls = []
+
+    @client.app.post("/__auth_probe")
+    def auth_probe(payload: Payload, request: Request):
+        calls.append("/__auth_probe")
+        return {"user_id": request.auth.user_id if request.auth else None}
+
+    @client.app.get("/__public_probe")
+    @public
+    def public_probe(request: Request):
+        calls.append("/__public_probe")
+        return {"auth": request.auth is not None}
+
+    try:
+        yield calls
+    finally:
+        del client.app.router.routes[-2:]
+
+
+@pytest.fixture
+def sessions_opened(client, monkeypatch):
+    """
+    Count database sessions checked out through get_db.
+
+    Returns:
+        list: One entry per session opened
+    """
+    opened = []
+    original = client.app.dependency_overrides[get_db]
+
+    def counting_get_db():
+        opened.append(1)
+        yield from original()
+
+    monkeypatch.setitem(client.app.dependency_overrides, get_db, counting_get_db)
+    return opened
+
+
+def test_invalid_token_rejected_before_routing(client, probe_routes, sessions_opened):
+    """
+    Test that an invalid token is rejected before anything else runs.
+
+    Verifies:
+    - Status code is 401 with the usual detail and a WWW-Authenticate header
+    - The handler does not run and the malformed body is never validated
+    - No SQL is executed and no session is opened, even on a protected user route
+    """
+    with assert_max_queries(0):
+        response = client.post("/__auth_probe", content=b"not json", headers={"Authorization": "Bearer invalid.token.here"})
+        home = client.get("/user/home", headers={"Authorization": "Bearer invalid.token.here"})
+
+    assert response.status_code == home.status_code == 401
+    assert response.json()["detail"] == "Could not validate credentials"
+    assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert probe_routes == []
+    assert sessions_opened == []
+
+
+def test_public_route_ignores_invalid_token(client, probe_routes):
+    """
+    Test that @public routes are reachable with a stale token.
+
+    Verifies:
+    - The public probe runs without a principal
+    - Logging in with a leftover invalid Authorization header still works
+    """
+    response = client.get("/__public_probe", headers={"Authorization": "Bearer invalid.token.here"})
+
+    assert response.status_code == 200
+    assert response.json() == {"auth": False}
+
+    response = client.post(
+        "/auth/login",
+        json={"email": "nobody@example.com", "password": "ValidPass123"},
+        headers={"Authorization": "Bearer invalid.token.here"},
+    )
+    assert response.status_code == 401
+    assert response.json()["detail"] != "Could not validate credentials"
+
+
+def test_principal_available_on_request(client, db_session, probe_routes):
+    """
+    Test that a valid token's principal is attached to the request scope.
+
+    Verifies:
+    - request.auth carries the token's user ID without a database lookup
+    - Requests without a token reach the handler with request.auth set to None
+    """
+    user = User(
+        email="principal@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Principal User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    token = create_access_token(data={"sub": str(user.id)})
+
+    with assert_max_queries(0):
+        response = client.post("/__auth_probe", json={"value": 1}, headers={"Authorization": f"Bearer {token}"})
+    assert response.json() == {"user_id": user.id}
+
+    response = client.post("/__auth_probe", json={"value": 1})
+    assert response.json() == {"user_id": None}
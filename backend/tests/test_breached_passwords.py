@@ -0,0 +1,134 @@
+"""
+Test suite for the breached password check.
+This module contains tests for:
+- Building the index from SHA-1 and plain password dumps
+- Looking passwords up in the memory-mapped index
+- Rejecting breached passwords on registration
+- Refusing to start with a missing or corrupt index file
+"""
+
+import pytest
+from hashlib import sha1
+from fastapi.testclient import TestClient
+from backend.app.core.breached_passwords import BreachedPasswordIndex, build_breached_index, get_breached_password_index
+from backend.app.config import get_settings
+
+BREACHED = ["Password123", "Summer2024", "Qwerty12345", "Welcome1"]
+
+
+def _hash_line(password: str, count: int = 5) -> bytes:
+    return f"{sha1(password.encode()).hexdigest().upper()}:{count}\n".encode()
+
+
+def test_build_and_lookup(tmp_path):
+    """
+    Test building an index from an unsorted SHA-1 dump.
+
+    Verifies:
+    - Listed passwords are found and others are not
+    - Duplicates are written once, across spilled runs
+    - Malformed lines are skipped and counted, blank lines and hashes below min_count skipped
+    - No temporary run files are left behind
+    """
+    lines = [_hash_line(password) for password in reversed(BREACHED)]
+    lines += [_hash_line("Password123"), b"not a hash\n", _hash_line("RareButBad1", count=1)]
+    lines += [b"Z" * 40 + b":3\n", _hash_line("Unlisted99")[:40] + b":many\n", b"\n"]
+    path = tmp_path / "breached.idx"
+
+    written, malformed = build_breached_index(lines, str(path), min_count=2, run_size=2)
+    index = BreachedPasswordIndex(str(path))
+
+    assert written == len(index) == len(BREACHED)
+    assert malformed == 3
+    assert list(tmp_path.iterdir()) == [path]
+    assert all(password in index for password in BREACHED)
+    assert "RareButBad1" not in index
+    assert "Unlisted99" not in index
+    assert [index[position] for position in range(len(index))] == sorted(index[position] for position in range(len(index)))
+    index.close()
+
+
+def test_build_from_plaintext(tmp_path):
+    """
+    Test building an index from a plain password list.
+
+    Verifies:
+    - Each line is hashed without its line ending
+    - Shorter digest prefixes are stored as requested
+    """
+    path = tmp_path / "breached.idx"
+
+    build_breached_index([b"Welcome1\r\n", b"Summer2024\n", b"\n"], str(path), prefix_bytes=6, plaintext=True)
+    index = BreachedPasswordIndex(str(path))
+
+    assert index.prefix_bytes == 6
+    assert "Welcome1" in index and "Summer2024" in index
+    assert "Welcome2" not in index
+    index.close()
+
+
+def test_invalid_index_file(tmp_path):
+    """
+    Test that a file of another format is refused.
+
+    Verifies:
+    - ValueError is raised for a file without the index header
+    """
+    path = tmp_path / "dump.txt"
+    path.write_bytes(_hash_line("Password123"))
+
+    with pytest.raises(ValueError):
+        BreachedPasswordIndex(str(path))
+
+
+def test_register_rejects_breached_password(client, tmp_path, monkeypatch):
+    """
+    Test the password validator hook.
+
+    Verifies:
+    - The index is mapped at startup and unmapped at shutdown
+    - A breached password is rejected with 422 and the password_breached error
+    - Registration validation is unchanged when no index is configured
+    """
+    path = tmp_path / "breached.idx"
+    build_breached_index([_hash_line(password) for password in BREACHED], str(path))
+    body = {
+        "email": "breached@example.com",
+        "password": "Password123",
+        "confirm_password": "Password123",
+        "full_name": "Breached User"
+    }
+
+    monkeypatch.setattr(get_settings(), "BREACHED_PASSWORDS_FILE", str(path))
+    with TestClient(client.app) as started:
+        assert get_breached_password_index() is not None
+        response = started.post("/auth/register", json=body)
+    assert get_breached_password_index() is None
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "password_breached"
+
+    monkeypatch.setattr(get_settings(), "BREACHED_PASSWORDS_FILE", None)
+    with TestClient(client.app) as started:
+        response = started.post("/auth/register", json={**body, "confirm_password": "Mismatch123"})
+    assert "Passwords do not match" in response.json()["detail"][0]["msg"]
+
+
+@pytest.mark.parametrize("content", [None, b"", _hash_line("Password123")])
+def test_startup_fails_on_bad_index_file(client, tmp_path, monkeypatch, content):
+    """
+    Test that a missing or corrupt index stops startup instead of failing registrations.
+
+    Verifies:
+    - The lifespan hook raises RuntimeError naming the setting
+    - No index is left loaded for request-time validation
+    """
+    path = tmp_path / "breached.idx"
+    if content is not None:
+        path.write_bytes(content)
+    monkeypatch.setattr(get_settings(), "BREACHED_PASSWORDS_FILE", str(path))
+
+    with pytest.raises(RuntimeError, match="BREACHED_PASSWORDS_FILE"):
+        with TestClient(client.app):
+            pass
+    assert get_breached_password_index() is None
@@ -0,0 +1,112 @@
+"""
+Test suite for case-insensitive email lookups.
+This module contains tests for:
+- Populating email_canonical on write
+- Rejecting registrations that differ from an existing email only by case
+- Logging in and resending codes with a differently cased email
+- Lookups using the unique index on email_canonical
+"""
+
+from datetime import datetime, timezone
+from sqlalchemy import select, text
+from backend.app.models.user import User
+from backend.app.core.security import hash_password
+from backend.app.validators.user import canonical_email
+
+
+def _create_user(db_session, email: str, is_verified: bool = True) -> User:
+    user = User(
+        email=email,
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Case User",
+        is_verified=is_verified,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_email_canonical_set_on_write(db_session):
+    """
+    Test that the canonical email follows the email attribute.
+
+    Verifies:
+    - email keeps the case it was entered with
+    - email_canonical is lowercased on insert and on change
+    """
+    user = _create_user(db_session, "Mixed.Case@Example.com")
+    assert user.email == "Mixed.Case@Example.com"
+    assert user.email_canonical == "mixed.case@example.com"
+
+    user.email = "Other@Example.com"
+    db_session.commit()
+    assert db_session.execute(select(User.email_canonical).where(User.id == user.id)).scalar_one() == "other@example.com"
+
+
+def test_register_rejects_case_variant(client, db_session, monkeypatch):
+    """
+    Test that an email differing only by case cannot register a second account.
+
+    Verifies:
+    - Status code is 400 with the usual duplicate email message
+    """
+    _create_user(db_session, "Taken@Example.com")
+
+    async def _send_verification_email(email, code):
+        raise AssertionError("no email expected")
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    response = client.post(
+        "/auth/register",
+        json={
+            "email": "taken@example.com",
+            "password": "Test123!@#",
+            "confirm_password": "Test123!@#",
+            "full_name": "Case User"
+        }
+    )
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Email already registered"
+
+
+def test_login_and_resend_ignore_case(client, db_session, monkeypatch):
+    """
+    Test lookups with an email cased differently than at registration.
+
+    Verifies:
+    - Login succeeds
+    - A verification code is resent to the address as stored
+    """
+    _create_user(db_session, "Login.Case@Example.com")
+    _create_user(db_session, "Resend.Case@Example.com", is_verified=False)
+    sent = []
+
+    async def _send_verification_email(email, code):
+        sent.append(email)
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+
+    response = client.post("/auth/login", json={"email": "LOGIN.case@example.COM", "password": "ValidPass123"})
+    assert response.status_code == 200
+
+    response = client.post("/auth/resend-code", json={"email": "resend.case@EXAMPLE.com"})
+    assert response.status_code == 200
+    assert sent == ["Resend.Case@Example.com"]
+
+
+def test_lookup_uses_canonical_index(db_session):
+    """
+    Test that a case-insensitive lookup is an index search.
+
+    Verifies:
+    - SQLite plans the lookup as a search on ix_users_email_canonical
+    """
+    statement = select(User).where(User.email_canonical == canonical_email("Someone@Example.com"))
+    sql = str(statement.compile(db_session.get_bind(), compile_kwargs={"literal_binds": True}))
+
+    plan = " ".join(row[-1] for row in db_session.execute(text(f"EXPLAIN QUERY PLAN {sql}")))
+
+    assert "SEARCH" in plan
+    assert "ix_users_email_canonical" in plan
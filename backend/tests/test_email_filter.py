@@ -0,0 +1,283 @@
+"""
+Test suite for the registered email filter.
+This module contains tests for:
+- Bloom filter membership without false negatives
+- Rejecting unknown emails on login and resend without a query
+- Running a dummy password check for unknown emails
+- Adding emails on register and refreshing with users added elsewhere
+- Rescanning user IDs committed out of order
+"""
+
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from backend.app.models.user import User
+from backend.app.core.email_filter import BloomFilter, RegisteredEmailFilter, get_email_filter, refresh_periodically
+from backend.app.core.security import hash_password
+from backend.app.core.query_recorder import assert_max_queries
+from backend.app.config import get_settings
+
+
+@pytest.fixture
+def email_filter(client, db_session):
+    """
+    Build the registered email filter from the test database.
+
+    Returns:
+        RegisteredEmailFilter: The filter used by the routes
+    """
+    email_filter = get_email_filter()
+    email_filter.build(db_session)
+    return email_filter
+
+
+@pytest.fixture
+def dummy_checks(monkeypatch):
+    """
+    Count dummy password checks run by login.
+
+    Returns:
+        list: One entry per dummy check
+    """
+    calls = []
+    monkeypatch.setattr("backend.app.routes.auth.dummy_verify_password", lambda: calls.append(1))
+    return calls
+
+
+def _create_user(db_session, email: str, is_verified: bool = True, user_id: int | None = None) -> User:
+    user = User(
+        id=user_id,
+        email=email,
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Filter User",
+        is_verified=is_verified,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_bloom_filter_membership():
+    """
+    Test the Bloom filter on its own.
+
+    Verifies:
+    - Every added item is reported present
+    - The false positive rate stays near the configured rate
+    """
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for n in range(1000):
+        bloom.add(f"user{n}@example.com")
+
+    assert all(f"user{n}@example.com" in bloom for n in range(1000))
+    false_positives = sum(f"other{n}@example.com" in bloom for n in range(10000))
+    assert false_positives < 300
+
+
+def test_unknown_email_skips_lookup(client, email_filter, dummy_checks):
+    """
+    Test that unknown emails are rejected without any query.
+
+    Verifies:
+    - Login returns the usual 401 and runs a dummy password check
+    - Resend-code returns the usual 404
+    """
+    with assert_max_queries(0):
+        login = client.post("/auth/login", json={"email": "nobody@example.com", "password": "ValidPass123"})
+    with assert_max_queries(0):
+        resend = client.post("/auth/resend-code", json={"email": "nobody@example.com"})
+
+    assert login.status_code == 401
+    assert login.json()["detail"] == "Invalid email or password"
+    assert dummy_checks == [1]
+    assert resend.status_code == 404
+
+
+def test_known_email_reaches_database(client, db_session, dummy_checks):
+    """
+    Test that registered emails are looked up as before.
+
+    Verifies:
+    - Emails present when the filter is built log in, in any case
+    - A missing user found by the query still gets a dummy password check
+    """
+    _create_user(db_session, "Known@Example.com")
+    get_email_filter().build(db_session)
+
+    response = client.post("/auth/login", json={"email": "known@example.com", "password": "ValidPass123"})
+    assert response.status_code == 200
+    assert dummy_checks == []
+
+    get_email_filter().reset()
+    response = client.post("/auth/login", json={"email": "nobody@example.com", "password": "ValidPass123"})
+    assert response.status_code == 401
+    assert dummy_checks == [1]
+
+
+def test_register_adds_email(client, email_filter, monkeypatch):
+    """
+    Test that a new registration is visible to the filter at once.
+
+    Verifies:
+    - Logging in right after registering reaches the unverified check (403), not the 401
+    """
+    async def _send_verification_email(email, code):
+        pass
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    response = client.post(
+        "/auth/register",
+        json={
+            "email": "New.User@example.com",
+            "password": "Test123!@#",
+            "confirm_password": "Test123!@#",
+            "full_name": "New User"
+        }
+    )
+    assert response.status_code == 201
+
+    response = client.post("/auth/login", json={"email": "new.user@example.com", "password": "Test123!@#"})
+    assert response.status_code == 403
+
+
+def test_refresh_adds_users_from_elsewhere(db_session, email_filter):
+    """
+    Test that a refresh picks up users committed outside this process.
+
+    Verifies:
+    - A user inserted after the build is rejected until the next refresh
+    - The refresh reads only the IDs above the highest one scanned
+    """
+    _create_user(db_session, "elsewhere@example.com")
+    assert not email_filter.might_exist("elsewhere@example.com")
+
+    with assert_max_queries(1) as stats:
+        assert email_filter.refresh(db_session) == 1
+
+    assert email_filter.might_exist("elsewhere@example.com")
+    assert email_filter.pending_ranges == []
+    assert "users.id >" in stats.statements[0]
+
+
+def test_late_commits_below_high_water_are_found(db_session):
+    """
+    Test user IDs committed after higher ones were already scanned.
+
+    Verifies:
+    - IDs skipped by a build or refresh stay pending and are found once committed
+    - Pending IDs are dropped once seen, and after pending_seconds
+    """
+    first = _create_user(db_session, "first@example.com")
+    _create_user(db_session, "third@example.com", user_id=first.id + 2)
+    email_filter = RegisteredEmailFilter(capacity=1000, error_rate=0.01)
+    email_filter.build(db_session)
+    assert email_filter.pending_ranges == [(first.id + 1, first.id + 1)]
+
+    _create_user(db_session, "sixth@example.com", user_id=first.id + 5)
+    email_filter.refresh(db_session)
+    assert email_filter.pending_ranges == [(first.id + 1, first.id + 1), (first.id + 3, first.id + 4)]
+
+    _create_user(db_session, "second@example.com", user_id=first.id + 1)
+    _create_user(db_session, "fourth@example.com", user_id=first.id + 3)
+    email_filter.refresh(db_session)
+    assert email_filter.might_exist("second@example.com")
+    assert email_filter.might_exist("fourth@example.com")
+    assert email_filter.pending_ranges == [(first.id + 4, first.id + 4)]
+
+    email_filter.pending_seconds = 0
+    email_filter.refresh(db_session)
+    assert email_filter.pending_ranges == []
+
+
+def test_old_gaps_are_not_pending(db_session):
+    """
+    Test that the build ignores gaps below users created long ago.
+
+    Verifies:
+    - A gap right below a user older than pending_seconds is not rescanned
+    """
+    first = _create_user(db_session, "old@example.com")
+    _create_user(db_session, "older@example.com", user_id=first.id + 2)
+    email_filter = RegisteredEmailFilter(capacity=1000, error_rate=0.01, pending_seconds=0)
+    email_filter.build(db_session)
+
+    assert email_filter.pending_ranges == []
+
+
+def test_refresh_periodically(db_session):
+    """
+    Test the refresh task started by the lifespan hook.
+
+    Verifies:
+    - The filter is refreshed with a new session on every interval
+    - A failed refresh is logged and does not stop the task
+    """
+    sessions = []
+
+    def session_factory():
+        sessions.append(1)
+        if len(sessions) == 1:
+            raise RuntimeError("database unavailable")
+        return Session(bind=db_session.get_bind(), join_transaction_mode="create_savepoint")
+
+    email_filter = RegisteredEmailFilter(capacity=1000, error_rate=0.01)
+    email_filter.build(db_session)
+    _create_user(db_session, "periodic@example.com")
+
+    async def run_briefly():
+        task = asyncio.create_task(refresh_periodically(email_filter, session_factory, 0.01))
+        while len(sessions) < 2:
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        task.cancel()
+
+    asyncio.run(run_briefly())
+
+    assert email_filter.might_exist("periodic@example.com")
+
+
+def test_users_added_out_of_band_are_found(client, db_session, monkeypatch):
+    """
+    Test the filter built at startup against users committed by other processes.
+
+    Users inserted directly in the database after startup get lower IDs than
+    a user registered through this process afterwards.
+
+    Verifies:
+    - Registering locally does not hide the earlier out-of-band users after a refresh
+    - They can log in and request a new code, and unknown emails are still rejected
+    """
+    _create_user(db_session, "before-startup@example.com")
+    monkeypatch.setattr(get_settings(), "EMAIL_FILTER_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "EMAIL_FILTER_REFRESH_SECONDS", 3600)
+    monkeypatch.setattr(
+        "backend.app.main.create_session",
+        lambda: Session(bind=db_session.get_bind(), join_transaction_mode="create_savepoint"),
+    )
+
+    async def _send_verification_email(email, code):
+        pass
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+
+    with TestClient(client.app) as started:
+        assert get_email_filter().ready
+        early = _create_user(db_session, "u0@example.com")
+        later = _create_user(db_session, "u150@example.com", user_id=early.id + 150)
+        pending = _create_user(db_session, "pending@example.com", is_verified=False)
+
+        response = started.post("/auth/register", json={
+            "email": "local@example.com", "password": "Test123!@#", "confirm_password": "Test123!@#", "full_name": "Local User"
+        })
+        assert response.status_code == 201
+        assert response.json()["user_id"] > later.id > early.id
+        get_email_filter().refresh(db_session)
+
+        for email in ["u0@example.com", "u150@example.com", "before-startup@example.com"]:
+            response = started.post("/auth/login", json={"email": email, "password": "ValidPass123"})
+            assert response.status_code == 200, email
+        assert started.post("/auth/resend-code", json={"email": pending.email}).status_code == 200
+        assert started.post("/auth/login", json={"email": "nobody@example.com", "password": "ValidPass123"}).status_code == 401
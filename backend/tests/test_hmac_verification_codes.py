@@ -0,0 +1,131 @@
+"""
+Test suite for HMAC-derived (stateless) email verification codes.
+This module contains tests for:
+- Deriving and checking codes across time windows
+- Nonce bumps invalidating previously issued codes
+- Email verification without verification_codes table rows
+"""
+
+import pytest
+from backend.app.models.user import User
+from backend.app.models.verification_code import VerificationCode
+from backend.app.core.security import hash_password
+from backend.app.config import get_settings
+from backend.app.utils.email_verification import (
+    create_and_store_verification_code,
+    check_hmac_verification_code,
+    issue_hmac_verification_code,
+)
+from datetime import datetime, timezone, timedelta
+
+
+@pytest.fixture
+def hmac_mode(monkeypatch):
+    """
+    Switch the cached settings to HMAC verification codes for one test.
+    """
+    monkeypatch.setattr(get_settings(), "VERIFICATION_CODE_MODE", "hmac")
+
+
+def _create_unverified_user(db_session) -> User:
+    user = User(
+        email="hmac@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Hmac User",
+        is_verified=False,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_hmac_code_valid_for_current_and_previous_window(client, db_session):
+    """
+    Test that a derived code is accepted for one extra window and rejected after.
+
+    Verifies:
+    - Code is valid when issued
+    - Code is still valid one expiry period later
+    - Code is rejected two expiry periods later
+    """
+    user = _create_unverified_user(db_session)
+    issued_at = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+    code = issue_hmac_verification_code(user, expires_in_minutes=8, now=issued_at)
+
+    assert len(code) == 6 and code.isdigit()
+    assert check_hmac_verification_code(user, code, 8, now=issued_at)
+    assert check_hmac_verification_code(user, code, 8, now=issued_at + timedelta(minutes=8))
+    assert not check_hmac_verification_code(user, code, 8, now=issued_at + timedelta(minutes=16))
+
+
+def test_hmac_code_invalidated_by_new_code(client, db_session):
+    """
+    Test that issuing a new code invalidates the previous one.
+
+    Verifies:
+    - The previous code is rejected after a new one is issued
+    - The new code is accepted
+    """
+    user = _create_unverified_user(db_session)
+
+    first_code = issue_hmac_verification_code(user)
+    second_code = issue_hmac_verification_code(user)
+
+    assert user.verification_nonce == 2
+    assert check_hmac_verification_code(user, second_code)
+    if first_code != second_code:
+        assert not check_hmac_verification_code(user, first_code)
+
+
+def test_hmac_email_verification_success(client, db_session, hmac_mode):
+    """
+    Test email verification with a derived code.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - No verification_codes rows are written
+    - User is marked as verified and the code cannot be replayed
+    """
+    user = _create_unverified_user(db_session)
+    code = create_and_store_verification_code(user, db_session, get_settings().VERIFICATION_CODE_EXPIRE_MINUTES)
+    db_session.commit()
+
+    response = client.post(
+        "/auth/verify-email",
+        json={"email": "hmac@example.com", "code": code}
+    )
+
+    assert response.status_code == 200
+    assert "Email verified successfully" in response.json()["message"]
+    assert db_session.query(VerificationCode).count() == 0
+
+    db_session.refresh(user)
+    assert user.is_verified == True
+    assert not check_hmac_verification_code(user, code, get_settings().VERIFICATION_CODE_EXPIRE_MINUTES)
+
+
+def test_hmac_email_verification_invalid_code(client, db_session, hmac_mode):
+    """
+    Test email verification with a wrong derived code.
+
+    Verifies:
+    - Status code is 400 (Bad Request)
+    - User remains unverified
+    """
+    user = _create_unverified_user(db_session)
+    code = create_and_store_verification_code(user, db_session)
+    db_session.commit()
+    wrong_code = str((int(code) + 1) % 1000000).zfill(6)
+
+    response = client.post(
+        "/auth/verify-email",
+        json={"email": "hmac@example.com", "code": wrong_code}
+    )
+
+    assert response.status_code == 400
+    assert "Invalid or expired verification code" in response.json()["detail"]
+
+    db_session.refresh(user)
+    assert user.is_verified == False
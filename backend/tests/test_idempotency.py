@@ -0,0 +1,161 @@
+"""
+Test suite for Idempotency-Key support.
+This module contains tests for:
+- Replaying registration and resend-code responses without redoing the work
+- Rejecting a key reused for a different request
+- Not storing failed responses
+- Store expiry, size bound and in-progress claims
+"""
+
+import pytest
+from datetime import datetime, timezone
+from backend.app.models.user import User
+from backend.app.core.security import hash_password
+from backend.app.core.query_recorder import assert_max_queries
+from backend.app.core.idempotency import InMemoryIdempotencyStore, StoredResponse
+
+REGISTRATION = {
+    "email": "retry@example.com",
+    "password": "ValidPass123",
+    "confirm_password": "ValidPass123",
+    "full_name": "Retry User",
+}
+
+
+@pytest.fixture
+def sent_codes(monkeypatch):
+    """
+    Replace the verification email sender with an in-memory sink.
+
+    Returns:
+        list: (email, code) pairs in the order they were sent
+    """
+    sent = []
+
+    async def _send_verification_email(email, code):
+        sent.append((email, code))
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    return sent
+
+
+def test_register_retry_is_replayed(client, sent_codes):
+    """
+    Test that a retried registration gets the original response.
+
+    Verifies:
+    - The retry returns the same status and body, marked as replayed
+    - The retry runs no SQL and sends no second email
+    """
+    headers = {"Idempotency-Key": "register-1"}
+    first = client.post("/auth/register", json=REGISTRATION, headers=headers)
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    with assert_max_queries(0):
+        retry = client.post("/auth/register", json=REGISTRATION, headers=headers)
+
+    assert retry.status_code == 201
+    assert retry.content == first.content
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert len(sent_codes) == 1
+
+
+def test_resend_code_retry_is_replayed(client, db_session, sent_codes):
+    """
+    Test that a retried resend-code request does not send another code.
+
+    Verifies:
+    - Both responses are 200 with the same body
+    - Only one code is sent
+    - A different key sends a new code
+    """
+    db_session.add(User(
+        email="resend@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Resend User",
+        created_at=datetime.now(timezone.utc),
+    ))
+    db_session.commit()
+
+    headers = {"Idempotency-Key": "resend-1"}
+    first = client.post("/auth/resend-code", json={"email": "resend@example.com"}, headers=headers)
+    retry = client.post("/auth/resend-code", json={"email": "resend@example.com"}, headers=headers)
+
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json()
+    assert len(sent_codes) == 1
+
+    client.post("/auth/resend-code", json={"email": "resend@example.com"}, headers={"Idempotency-Key": "resend-2"})
+    assert len(sent_codes) == 2
+
+
+def test_key_reused_for_different_request(client, sent_codes):
+    """
+    Test that a key cannot be reused with a different body.
+
+    Verifies:
+    - Status code is 422 and no second user is registered
+    """
+    headers = {"Idempotency-Key": "register-2"}
+    client.post("/auth/register", json=REGISTRATION, headers=headers)
+
+    response = client.post("/auth/register", json={**REGISTRATION, "email": "other@example.com"}, headers=headers)
+
+    assert response.status_code == 422
+    assert response.json()["detail"] == "Idempotency-Key was already used for a different request"
+    assert len(sent_codes) == 1
+
+
+def test_failed_response_is_not_stored(client, sent_codes):
+    """
+    Test that an error response releases the key.
+
+    Verifies:
+    - A retry of a failed request runs again instead of being replayed
+    """
+    client.post("/auth/register", json=REGISTRATION)
+    headers = {"Idempotency-Key": "register-3"}
+
+    first = client.post("/auth/register", json=REGISTRATION, headers=headers)
+    retry = client.post("/auth/register", json=REGISTRATION, headers=headers)
+
+    assert first.status_code == retry.status_code == 400
+    assert "Idempotent-Replayed" not in retry.headers
+
+
+def test_invalid_key_rejected(client, sent_codes):
+    """
+    Test that a malformed Idempotency-Key is rejected before the route runs.
+
+    Verifies:
+    - Status code is 400 and nothing is sent
+    """
+    response = client.post("/auth/register", json=REGISTRATION, headers={"Idempotency-Key": "x" * 256})
+
+    assert response.status_code == 400
+    assert sent_codes == []
+
+
+def test_store_claims_expiry_and_bound():
+    """
+    Test the store's claim states, TTL and size bound.
+
+    Verifies:
+    - A running request is reported as in progress, then replayed once complete
+    - Entries expire after the TTL
+    - The oldest entry is dropped when the store is full
+    """
+    store = InMemoryIdempotencyStore(ttl=60, max_keys=2)
+    stored = StoredResponse(201, [], b"{}")
+
+    assert store.claim("a", "f1", now=0).state == "new"
+    assert store.claim("a", "f1", now=1).state == "in_progress"
+    store.complete("a", stored)
+    assert store.claim("a", "f1", now=2).response == stored
+    assert store.claim("a", "f2", now=2).state == "mismatch"
+    assert store.claim("a", "f1", now=60).state == "new"
+
+    store.claim("b", "f1", now=61)
+    store.claim("c", "f1", now=62)
+    assert store.claim("a", "f1", now=63).state == "new"
@@ -0,0 +1,144 @@
+"""
+Test suite for batch token introspection.
+This module contains tests for:
+- Access control with the introspection token
+- Per-token results for valid, invalid and expired tokens
+- Reporting refresh tokens inactive
+- Resolving users with a single query
+- The Cache-Control hint
+"""
+
+import pytest
+import secrets
+from datetime import datetime, timedelta, timezone
+from jose import jwt
+from backend.app.models.user import User
+from backend.app.core.security import create_access_token, create_refresh_token
+from backend.app.core.query_recorder import assert_max_queries
+from backend.app.config import get_settings
+
+HEADERS = {"X-Introspection-Token": "gateway-token"}
+
+
+@pytest.fixture(autouse=True)
+def introspection_token(monkeypatch):
+    """Configure the gateway token for every test in this module."""
+    monkeypatch.setattr(get_settings(), "INTROSPECTION_TOKEN", "gateway-token")
+
+
+def _create_user(db_session, email: str, is_verified: bool = True) -> User:
+    user = User(
+        email=email,
+        hashed_password="not-used",
+        full_name="Gateway User",
+        is_verified=is_verified,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+def test_introspect_requires_token(client):
+    """
+    Test that introspection is only available to the configured gateway.
+
+    Verifies:
+    - Status code is 403 without or with a wrong X-Introspection-Token header
+    """
+    body = {"tokens": ["anything"]}
+
+    assert client.post("/auth/introspect", json=body).status_code == 403
+    response = client.post("/auth/introspect", json=body, headers={"X-Introspection-Token": "wrong"})
+    assert response.status_code == 403
+    assert response.json()["detail"] == "Introspection access denied"
+
+
+def test_introspect_batch(client):
+    """
+    Test per-token results in request order.
+
+    Verifies:
+    - Valid tokens are active with sub and exp
+    - Malformed and expired tokens are inactive without claims
+    - No SQL is run when users are not resolved
+    - Cache-Control allows caching until the first active token expires
+    """
+    short = create_access_token(data={"sub": "1"}, expires_delta=timedelta(seconds=90))
+    long = create_access_token(data={"sub": "2"})
+    expired = create_access_token(data={"sub": "3"}, expires_delta=timedelta(seconds=-10))
+
+    with assert_max_queries(0):
+        response = client.post("/auth/introspect", json={"tokens": [long, "not.a.token", expired, short]}, headers=HEADERS)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [result["active"] for result in results] == [True, False, False, True]
+    assert results[0]["sub"] == "2" and results[3]["sub"] == "1"
+    assert results[1] == {"active": False, "sub": None, "exp": None, "email_verified": None}
+
+    max_age = int(response.headers["Cache-Control"].split("max-age=")[1])
+    assert response.headers["Cache-Control"].startswith("private")
+    assert 80 <= max_age <= 90
+
+
+def test_introspect_refresh_token(client):
+    """
+    Test that refresh tokens cannot pass as access tokens.
+
+    Verifies:
+    - A refresh token is inactive, including one issued before the type claim
+    - The result is not cacheable when no token is active
+    """
+    settings = get_settings()
+    refresh = create_refresh_token(data={"sub": "1"})
+    legacy_refresh = jwt.encode(
+        {"sub": "1", "exp": datetime.now(timezone.utc) + timedelta(days=7), "jti": secrets.token_urlsafe(16)},
+        settings.JWT_SECRET, algorithm=settings.ALGORITHM,
+    )
+
+    response = client.post("/auth/introspect", json={"tokens": [refresh, legacy_refresh]}, headers=HEADERS)
+
+    assert response.status_code == 200
+    assert [result["active"] for result in response.json()["results"]] == [False, False]
+    assert response.headers["Cache-Control"] == "no-store"
+
+
+def test_introspect_include_user(client, db_session):
+    """
+    Test resolving users of the valid tokens.
+
+    Verifies:
+    - Users are loaded in a single query
+    - email_verified reflects the user
+    - Tokens of users that no longer exist are inactive
+    """
+    verified = _create_user(db_session, "verified@example.com")
+    unverified = _create_user(db_session, "unverified@example.com", is_verified=False)
+    tokens = [
+        create_access_token(data={"sub": str(verified.id)}),
+        create_access_token(data={"sub": str(unverified.id)}),
+        create_access_token(data={"sub": "999999"}),
+    ]
+
+    with assert_max_queries(1):
+        response = client.post("/auth/introspect", json={"tokens": tokens, "include_user": True}, headers=HEADERS)
+
+    results = response.json()["results"]
+    assert [(result["active"], result["email_verified"]) for result in results] == [(True, True), (True, False), (False, None)]
+
+
+def test_introspect_no_active_tokens_and_limit(client, monkeypatch):
+    """
+    Test the response when nothing is active and the batch size limit.
+
+    Verifies:
+    - Cache-Control is no-store when no token is active
+    - Batches above INTROSPECTION_MAX_TOKENS are rejected with 422
+    """
+    response = client.post("/auth/introspect", json={"tokens": ["bad"]}, headers=HEADERS)
+    assert response.headers["Cache-Control"] == "no-store"
+
+    monkeypatch.setattr(get_settings(), "INTROSPECTION_MAX_TOKENS", 2)
+    response = client.post("/auth/introspect", json={"tokens": ["a", "b", "c"]}, headers=HEADERS)
+    assert response.status_code == 422
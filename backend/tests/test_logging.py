@@ -0,0 +1,155 @@
+"""
+Test suite for structured logging.
+This module contains tests for:
+- JSON log lines tagged with request ID, route and user ID
+- Sampling of invalid token events
+- Request ID propagation in response headers
+- Dropping records when the log queue is full
+"""
+
+import io
+import json
+import logging
+import queue
+from datetime import datetime, timezone
+import pytest
+from fastapi import Depends
+from backend.app.config import get_settings
+from backend.app.core.logging_config import (
+    REQUEST_ID_HEADER, DroppingQueueHandler, configure_logging, shutdown_logging,
+)
+from backend.app.core.metrics import LOG_RECORDS_DROPPED
+from backend.app.core.security import create_access_token, hash_password
+from backend.app.dependencies.auth import get_current_user
+from backend.app.models.user import User
+
+
+@pytest.fixture
+def log_output(client):
+    """
+    Route application logs into a buffer for the duration of a test.
+
+    Yields:
+        Callable: Flushes the queue and returns the JSON records written so far
+    """
+    shutdown_logging()
+    stream = io.StringIO()
+    configure_logging(stream)
+
+    def _records():
+        shutdown_logging()
+        configure_logging(stream)
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield _records
+    shutdown_logging()
+
+
+def test_invalid_token_logged_with_request_context(client, log_output, monkeypatch):
+    """
+    Test that token failures are logged as JSON with the request's context.
+
+    Verifies:
+    - The record has level, logger, message and event fields
+    - The incoming X-Request-ID and the request path are attached
+    - No route template is attached, since the token is rejected before routing
+    """
+    monkeypatch.setattr(get_settings(), "LOG_INVALID_TOKEN_SAMPLE_RATE", 1.0)
+
+    response = client.get(
+        "/user/home",
+        headers={"Authorization": "Bearer invalid.token.here", REQUEST_ID_HEADER: "req-123"}
+    )
+
+    assert response.status_code == 401
+    assert response.headers[REQUEST_ID_HEADER] == "req-123"
+
+    records = [record for record in log_output() if record.get("event") == "token_invalid"]
+    assert len(records) == 1
+    assert records[0]["level"] == "WARNING"
+    assert records[0]["logger"] == "backend.app.core.security"
+    assert records[0]["message"] == "Invalid token"
+    assert records[0]["request_id"] == "req-123"
+    assert records[0]["path"] == "/user/home"
+    assert records[0]["route"] is None
+
+
+def test_user_id_attached_after_authentication(client, db_session, log_output):
+    """
+    Test that records logged after authentication carry the user's ID.
+
+    Verifies:
+    - user_id is set once get_current_user has resolved the user
+    """
+    user = User(
+        email="logging@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Logging User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    token = create_access_token(data={"sub": str(user.id)})
+
+    @client.app.get("/__log_probe")
+    def log_probe(current_user: User = Depends(get_current_user)):
+        logging.getLogger("backend.app.tests").info("probe")
+        return {}
+
+    try:
+        client.get("/__log_probe", headers={"Authorization": f"Bearer {token}"})
+    finally:
+        client.app.router.routes.pop()
+
+    records = [record for record in log_output() if record["message"] == "probe"]
+    assert records[0]["user_id"] == user.id
+    assert records[0]["route"] == "/__log_probe"
+
+
+def test_invalid_token_events_are_sampled(client, log_output, monkeypatch):
+    """
+    Test that sampled events are dropped at a zero sample rate.
+
+    Verifies:
+    - No token_invalid records are written
+    """
+    monkeypatch.setattr(get_settings(), "LOG_INVALID_TOKEN_SAMPLE_RATE", 0.0)
+
+    for _ in range(5):
+        client.get("/user/home", headers={"Authorization": "Bearer invalid.token.here"})
+
+    assert not [record for record in log_output() if record.get("event") == "token_invalid"]
+
+
+def test_request_id_generated_when_missing_or_malformed(client):
+    """
+    Test that every response carries a request ID.
+
+    Verifies:
+    - A fresh ID is generated without an incoming header
+    - A malformed incoming ID is replaced
+    """
+    generated = client.get("/").headers[REQUEST_ID_HEADER]
+    replaced = client.get("/", headers={REQUEST_ID_HEADER: "bad id\twith spaces"}).headers[REQUEST_ID_HEADER]
+
+    assert len(generated) == 32
+    assert replaced != "bad id\twith spaces"
+
+
+def test_full_queue_drops_records():
+    """
+    Test that a full queue drops records instead of blocking.
+
+    Verifies:
+    - The second record is dropped and counted
+    """
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    record = logging.LogRecord("backend", logging.INFO, __file__, 0, "message", None, None)
+    before = LOG_RECORDS_DROPPED.value()
+
+    handler.handle(record)
+    handler.handle(record)
+
+    assert handler.queue.qsize() == 1
+    assert LOG_RECORDS_DROPPED.value() == before + 1
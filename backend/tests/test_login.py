@@ -138,4 +138,39 @@ def test_login_unverified_user(client, db_session):
     )
     
     assert response.status_code == 403
-    assert "Email not verified" in response.json()["detail"] 
\ No newline at end of file
+    assert "Email not verified" in response.json()["detail"]
+
+
+def test_login_sets_refresh_cookie(client, db_session):
+    """
+    Test that login returns the typed token body along with its cookie and headers.
+    
+    Verifies:
+    - Body contains exactly access_token and token_type
+    - Refresh token cookie is set as HTTP-only
+    - Rate limit headers set on the injected response are kept
+    """
+    user = User(
+        email="cookie@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Cookie Test",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    
+    response = client.post(
+        "/auth/login",
+        json={
+            "email": "cookie@example.com",
+            "password": "ValidPass123"
+        }
+    )
+    
+    assert response.status_code == 200
+    assert set(response.json()) == {"access_token", "token_type"}
+    assert response.headers["content-type"] == "application/json"
+    assert "refresh_token" in response.cookies
+    assert "httponly" in response.headers["set-cookie"].lower()
+    assert "RateLimit-Limit" in response.headers
@@ -0,0 +1,138 @@
+"""
+Test suite for the metrics module and the /metrics endpoint.
+This module contains tests for:
+- Counter and histogram rendering in Prometheus text format
+- Aggregation of per-thread cells
+- Request, login and security operation metrics recorded by the app
+"""
+
+import threading
+from datetime import datetime, timezone
+import pytest
+from backend.app.core.metrics import (
+    Counter, Histogram, MetricsRegistry, HTTP_REQUESTS, DB_QUERIES_PER_REQUEST,
+    AUTH_OPERATION_SECONDS, LOGIN_ATTEMPTS,
+)
+from backend.app.models.user import User
+from backend.app.core.security import hash_password
+
+
+def test_registry_renders_prometheus_text():
+    """
+    Test the text exposition of counters and histograms.
+
+    Verifies:
+    - HELP and TYPE lines are written for each metric
+    - Histogram buckets are cumulative and end with +Inf, _sum and _count
+    - Label values are escaped
+    """
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("jobs_total", "Jobs run", ("queue",)))
+    histogram = registry.register(Histogram("job_seconds", "Job time", buckets=(0.1, 1.0)))
+
+    counter.inc('say "hi"')
+    counter.inc('say "hi"', amount=2)
+    histogram.observe(0.05)
+    histogram.observe(0.1)
+    histogram.observe(3.0)
+
+    assert registry.render().splitlines() == [
+        "# HELP jobs_total Jobs run",
+        "# TYPE jobs_total counter",
+        'jobs_total{queue="say \\"hi\\""} 3.0',
+        "# HELP job_seconds Job time",
+        "# TYPE job_seconds histogram",
+        'job_seconds_bucket{le="0.1"} 2.0',
+        'job_seconds_bucket{le="1.0"} 2.0',
+        'job_seconds_bucket{le="+Inf"} 3.0',
+        "job_seconds_sum 3.15",
+        "job_seconds_count 3.0",
+    ]
+
+
+def test_registry_rejects_duplicate_names():
+    """
+    Test that a metric name can only be registered once.
+
+    Verifies:
+    - ValueError is raised for a duplicate name
+    """
+    registry = MetricsRegistry()
+    registry.register(Counter("dup_total", "First"))
+
+    with pytest.raises(ValueError):
+        registry.register(Counter("dup_total", "Second"))
+
+
+def test_counter_sums_thread_cells():
+    """
+    Test that increments from many threads are all counted.
+
+    Verifies:
+    - Each thread writes its own cell and the value is their sum
+    """
+    counter = Counter("threaded_total", "Threaded increments")
+    histogram = Histogram("threaded_seconds", "Threaded observations")
+
+    def work():
+        for _ in range(1000):
+            counter.inc()
+            histogram.observe(0.01)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert counter.value() == 8000
+    assert histogram.count() == 8000
+
+
+def test_metrics_endpoint_records_requests_and_logins(client, db_session):
+    """
+    Test that requests, logins and security operations show up on /metrics.
+
+    Verifies:
+    - Requests are labelled with the route template and status
+    - SQL statements per request are observed
+    - Login success and failure counters increase
+    - Password and token operations are timed
+    - The endpoint serves Prometheus text format
+    """
+    user = User(
+        email="metrics@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Metrics User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    before = {
+        "requests": HTTP_REQUESTS.value("POST", "/auth/login", "200"),
+        "queries": DB_QUERIES_PER_REQUEST.count("POST", "/auth/login"),
+        "success": LOGIN_ATTEMPTS.value("success"),
+        "failure": LOGIN_ATTEMPTS.value("invalid_credentials"),
+        "verify": AUTH_OPERATION_SECONDS.count("verify_password"),
+        "mint": AUTH_OPERATION_SECONDS.count("create_access_token"),
+    }
+
+    client.post("/auth/login", json={"email": "metrics@example.com", "password": "ValidPass123"})
+    client.post("/auth/login", json={"email": "metrics@example.com", "password": "WrongPass123"})
+
+    assert HTTP_REQUESTS.value("POST", "/auth/login", "200") == before["requests"] + 1
+    assert DB_QUERIES_PER_REQUEST.count("POST", "/auth/login") == before["queries"] + 2
+    assert LOGIN_ATTEMPTS.value("success") == before["success"] + 1
+    assert LOGIN_ATTEMPTS.value("invalid_credentials") == before["failure"] + 1
+    assert AUTH_OPERATION_SECONDS.count("verify_password") == before["verify"] + 2
+    assert AUTH_OPERATION_SECONDS.count("create_access_token") == before["mint"] + 1
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="POST",route="/auth/login",status="401"}' in response.text
+    assert 'auth_login_attempts_total{result="success"}' in response.text
+    assert 'auth_operation_duration_seconds_bucket{operation="hash_password",le="+Inf"}' in response.text
@@ -0,0 +1,105 @@
+"""
+Test suite for the prebuilt OpenAPI schema.
+This module contains tests for:
+- Building the schema to a file
+- Serving the prebuilt file with ETag revalidation
+- gzip negotiation for the prebuilt file
+- Typed response models in the schema
+"""
+
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from backend.app.main import app
+from backend.app.utils.openapi import build_openapi_schema, install_prebuilt_openapi
+
+
+@pytest.fixture
+def prebuilt_client(tmp_path):
+    """
+    Client for a fresh app serving a schema prebuilt from the main app.
+
+    Yields:
+        tuple[TestClient, bytes]: The client and the prebuilt schema bytes
+    """
+    schema_file = tmp_path / "openapi.json"
+    schema_file.write_bytes(build_openapi_schema(app))
+
+    docs_app = FastAPI()
+    install_prebuilt_openapi(docs_app, str(schema_file))
+
+    with TestClient(docs_app) as test_client:
+        yield test_client, schema_file.read_bytes()
+
+
+def test_build_openapi_schema():
+    """
+    Test that the built schema contains the customized security scheme.
+
+    Verifies:
+    - Auth routes are present
+    - BearerAuth security scheme is present
+    """
+    schema = json.loads(build_openapi_schema(app))
+
+    assert "/auth/login" in schema["paths"]
+    assert "BearerAuth" in schema["components"]["securitySchemes"]
+
+
+def test_response_models_in_schema():
+    """
+    Test that routes document their typed response models.
+
+    Verifies:
+    - Token, registration and message responses reference their models
+    """
+    schema = json.loads(build_openapi_schema(app))
+
+    def response_ref(path, method, status="200"):
+        return schema["paths"][path][method]["responses"][status]["content"]["application/json"]["schema"]["$ref"]
+
+    assert response_ref("/auth/login", "post").endswith("/TokenResponse")
+    assert response_ref("/auth/refresh", "post").endswith("/TokenResponse")
+    assert response_ref("/auth/register", "post", "201").endswith("/RegisterResponse")
+    assert response_ref("/user/home", "get").endswith("/MessageResponse")
+
+
+def test_prebuilt_schema_served_with_etag(prebuilt_client):
+    """
+    Test that the prebuilt file is served as-is and revalidates with If-None-Match.
+
+    Verifies:
+    - Body matches the prebuilt file byte for byte
+    - ETag is set and a matching If-None-Match returns 304 without a body
+    """
+    client, body = prebuilt_client
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.content == body
+    assert "content-encoding" not in response.headers
+    etag = response.headers["ETag"]
+
+    revalidated = client.get("/openapi.json", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
+
+
+def test_prebuilt_schema_gzip(prebuilt_client):
+    """
+    Test that gzip-capable clients get the precompressed body.
+
+    Verifies:
+    - Content-Encoding is gzip
+    - The compressed body decodes to the prebuilt file
+    """
+    client, body = prebuilt_client
+
+    response = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.content == body  # decoded by the client
+    assert response.num_bytes_downloaded < len(body)
+    assert client.app.openapi()["paths"].keys() == json.loads(body)["paths"].keys()
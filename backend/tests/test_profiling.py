@@ -0,0 +1,146 @@
+"""
+Test suite for on-demand request profiling.
+This module contains tests for:
+- Signing and verifying X-Profile tokens
+- Sampling application thread stacks
+- The on-disk profile ring buffer
+- Profiling requests and the admin profile endpoints
+"""
+
+import threading
+import time
+from pathlib import Path
+import pytest
+from backend.app.core.profiling import (
+    PROFILE_HEADER, PROFILE_ID_HEADER, ProfileStore, StackSampler, sign_profile_token, verify_profile_token,
+)
+from backend.app.config import get_settings
+
+
+@pytest.fixture
+def profiling(monkeypatch, tmp_path):
+    """
+    Enable profiling into a temporary directory with an admin token set.
+
+    Returns:
+        Path: Directory the profiles are written to
+    """
+    settings = get_settings()
+    monkeypatch.setattr(settings, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(settings, "PROFILING_SECRET", "profiling-secret")
+    monkeypatch.setattr(settings, "PROFILING_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "ADMIN_TOKEN", "admin-token")
+    return tmp_path
+
+
+def test_profile_token(profiling):
+    """
+    Test X-Profile token verification.
+
+    Verifies:
+    - A correctly signed, unexpired token is accepted
+    - Expired, tampered and wrongly signed tokens are rejected
+    """
+    expires_at = int(time.time()) + 60
+    token = sign_profile_token(expires_at)
+
+    assert verify_profile_token(token)
+    assert not verify_profile_token(token, now=expires_at + 1)
+    assert not verify_profile_token(f"{expires_at + 1}.{token.split('.')[1]}")
+    assert not verify_profile_token(sign_profile_token(expires_at, secret="other-secret"))
+    assert not verify_profile_token("garbage")
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_stack_sampler_records_matching_threads():
+    """
+    Test that the sampler records threads running code under its root.
+
+    Verifies:
+    - Stacks are collapsed with the thread name first and the leaf last
+    - Samples are counted
+    """
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    worker.start()
+
+    sampler = StackSampler(interval=0.001, root=str(Path(__file__).parent))
+    try:
+        for _ in range(20):
+            sampler.sample()
+    finally:
+        stop.set()
+        worker.join()
+
+    assert sampler.samples >= 20
+    stacks = sampler.collapsed().splitlines()
+    assert any(line.startswith("busy-worker;") and "test_profiling:_busy_loop" in line for line in stacks)
+
+
+def test_profile_store_evicts_oldest(tmp_path):
+    """
+    Test the profile ring buffer.
+
+    Verifies:
+    - Only the newest max_profiles profiles are kept
+    - Listing is newest first and unknown or malformed IDs are not found
+    """
+    store = ProfileStore(str(tmp_path), max_profiles=2)
+    ids = [store.save(f"main;work {n}\n", {"path": f"/{n}"}) for n in range(3)]
+
+    assert [profile["id"] for profile in store.list()] == [ids[2], ids[1]]
+    assert store.path(ids[0]) is None
+    assert store.path(ids[2]).read_text() == "main;work 2\n"
+    assert store.path("../../etc/passwd") is None
+
+
+def test_profiled_request_and_admin_endpoints(client, profiling):
+    """
+    Test profiling a request and fetching the profile as an admin.
+
+    Verifies:
+    - A request with a valid X-Profile token returns X-Profile-Id
+    - Requests without a token are not profiled
+    - The admin list and download endpoints require the admin token
+    """
+    token = sign_profile_token(int(time.time()) + 60)
+
+    response = client.get("/", headers={PROFILE_HEADER: token})
+    assert response.status_code == 200
+    profile_id = response.headers[PROFILE_ID_HEADER]
+
+    assert PROFILE_ID_HEADER not in client.get("/").headers
+    assert PROFILE_ID_HEADER not in client.get("/", headers={PROFILE_HEADER: "1.bad"}).headers
+
+    assert client.get("/admin/profiles").status_code == 403
+    assert client.get("/admin/profiles", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    admin = {"X-Admin-Token": "admin-token"}
+    profiles = client.get("/admin/profiles", headers=admin).json()
+    assert [profile["id"] for profile in profiles] == [profile_id]
+    assert profiles[0]["path"] == "/"
+    assert profiles[0]["status"] == 200
+
+    download = client.get(f"/admin/profiles/{profile_id}", headers=admin)
+    assert download.status_code == 200
+    assert download.text == (profiling / f"{profile_id}.folded").read_text()
+    assert client.get("/admin/profiles/1-1", headers=admin).status_code == 404
+
+
+def test_sample_rate_and_disabled(client, profiling, monkeypatch):
+    """
+    Test sampling-based profiling and the global switch.
+
+    Verifies:
+    - A sample rate of 1 profiles every request without a token
+    - Nothing is profiled when profiling is disabled
+    """
+    monkeypatch.setattr(get_settings(), "PROFILING_SAMPLE_RATE", 1.0)
+    assert PROFILE_ID_HEADER in client.get("/").headers
+
+    monkeypatch.setattr(get_settings(), "PROFILING_ENABLED", False)
+    assert PROFILE_ID_HEADER not in client.get("/").headers
@@ -4,10 +4,11 @@ This module contains tests for:
 - Accessing protected routes with valid JWT tokens
 - Access attempts without authentication
 - Access attempts with invalid tokens
+- Access attempts with refresh tokens
 """
 
 from backend.app.models.user import User
-from backend.app.core.security import hash_password, create_access_token
+from backend.app.core.security import hash_password, create_access_token, create_refresh_token
 from datetime import datetime, timezone
 
 def test_protected_route_with_valid_token(client, db_session):
@@ -77,4 +78,18 @@ def test_protected_route_with_invalid_token(client):
     )
     
     assert response.status_code == 401
-    assert "Could not validate credentials" in response.json()["detail"] 
\ No newline at end of file
+    assert "Could not validate credentials" in response.json()["detail"] 
+
+def test_protected_route_with_refresh_token(client):
+    """
+    Test accessing protected route with a refresh token as bearer token.
+
+    Verifies:
+    - Status code is 401 (Unauthorized)
+    """
+    response = client.get(
+        "/user/home",
+        headers={"Authorization": f"Bearer {create_refresh_token(data={'sub': '1'})}"}
+    )
+
+    assert response.status_code == 401
@@ -0,0 +1,229 @@
+"""
+Test suite for per-endpoint database query budgets.
+This module contains tests for:
+- Registration staying within its statement budget
+- Email verification using a single joined lookup
+- Resending a verification code without reloading the user
+- Login, refresh, logout and user routes staying within their budgets
+"""
+
+import pytest
+from backend.app.models.user import User
+from backend.app.models.verification_code import VerificationCode
+from backend.app.core.security import hash_password, create_access_token
+from backend.app.core.query_recorder import assert_max_queries
+from backend.app.config import get_settings
+from datetime import datetime, timezone, timedelta
+
+
+@pytest.fixture
+def sent_codes(monkeypatch):
+    """
+    Replace the verification email sender with an in-memory sink.
+
+    Returns:
+        dict: Mapping of recipient email to the last code sent
+    """
+    codes = {}
+
+    async def _send_verification_email(email, code):
+        codes[email] = code
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    return codes
+
+
+def _create_user(db_session, is_verified: bool = False) -> User:
+    user = User(
+        email="budget@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Budget User",
+        is_verified=is_verified,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.mark.parametrize("mode", ["table", "hmac"])
+def test_register_query_budget(client, sent_codes, monkeypatch, mode):
+    """
+    Test that registration runs at most two statements in one transaction.
+
+    Verifies:
+    - Status code is 201 (Created)
+    - The user INSERT and the code write are the only statements
+    """
+    monkeypatch.setattr(get_settings(), "VERIFICATION_CODE_MODE", mode)
+
+    with assert_max_queries(2):
+        response = client.post(
+            "/auth/register",
+            json={
+                "email": "budget@example.com",
+                "password": "Test123!@#",
+                "confirm_password": "Test123!@#",
+                "full_name": "Budget User"
+            }
+        )
+
+    assert response.status_code == 201
+    assert "budget@example.com" in sent_codes
+
+
+def test_register_existing_email_query_budget(client, db_session, sent_codes):
+    """
+    Test that a duplicate registration fails on the INSERT alone.
+
+    Verifies:
+    - Status code is 400 (Bad Request)
+    - Only the rejected INSERT is executed
+    - No verification email is sent
+    """
+    _create_user(db_session)
+
+    with assert_max_queries(1):
+        response = client.post(
+            "/auth/register",
+            json={
+                "email": "budget@example.com",
+                "password": "Test123!@#",
+                "confirm_password": "Test123!@#",
+                "full_name": "Budget User"
+            }
+        )
+
+    assert response.status_code == 400
+    assert sent_codes == {}
+
+
+def test_verify_email_query_budget(client, db_session):
+    """
+    Test that email verification uses one joined lookup plus its updates.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - At most three statements are executed (SELECT, two UPDATEs)
+    """
+    user = _create_user(db_session)
+    db_session.add(VerificationCode(
+        user_id=user.id,
+        code="123456",
+        expires_at=datetime.now(timezone.utc) + timedelta(minutes=30),
+        is_used=False
+    ))
+    db_session.commit()
+
+    with assert_max_queries(3):
+        response = client.post(
+            "/auth/verify-email",
+            json={"email": "budget@example.com", "code": "123456"}
+        )
+
+    assert response.status_code == 200
+
+
+def test_resend_code_query_budget(client, db_session, sent_codes):
+    """
+    Test that resending a code does not reload the user.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - At most three statements are executed (SELECT, UPDATE, INSERT)
+    """
+    _create_user(db_session)
+
+    with assert_max_queries(3):
+        response = client.post("/auth/resend-code", json={"email": "budget@example.com"})
+
+    assert response.status_code == 200
+    assert "budget@example.com" in sent_codes
+
+
+def test_login_query_budget(client, db_session):
+    """
+    Test that login loads the user once and stores one refresh token.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - At most two statements are executed (SELECT, INSERT)
+    """
+    _create_user(db_session, is_verified=True)
+
+    with assert_max_queries(2):
+        response = client.post(
+            "/auth/login",
+            json={"email": "budget@example.com", "password": "ValidPass123"}
+        )
+
+    assert response.status_code == 200
+
+
+def test_refresh_query_budget(client, db_session):
+    """
+    Test that refreshing rotates the token without extra lookups.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - At most two statements are executed (DELETE doubling as the lookup, INSERT)
+    """
+    _create_user(db_session, is_verified=True)
+    client.post("/auth/login", json={"email": "budget@example.com", "password": "ValidPass123"})
+
+    with assert_max_queries(2):
+        response = client.post("/auth/refresh")
+
+    assert response.status_code == 200
+
+
+def test_logout_query_budget(client, db_session):
+    """
+    Test that logout deletes the refresh token in one statement.
+
+    Verifies:
+    - Status code is 204 (No Content)
+    - At most one statement is executed
+    """
+    _create_user(db_session, is_verified=True)
+    client.post("/auth/login", json={"email": "budget@example.com", "password": "ValidPass123"})
+
+    with assert_max_queries(1):
+        response = client.post("/auth/logout")
+
+    assert response.status_code == 204
+
+
+@pytest.mark.parametrize("path", ["/user/home", "/user/me"])
+def test_user_routes_query_budget(client, db_session, path):
+    """
+    Test that user routes only load the current user.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - A single primary-key SELECT is executed
+    """
+    user = _create_user(db_session, is_verified=True)
+    headers = {"Authorization": f"Bearer {create_access_token(data={'sub': str(user.id)})}"}
+
+    with assert_max_queries(1):
+        response = client.get(path, headers=headers)
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/", "/metrics", "/server/stats"])
+def test_public_routes_query_budget(client, monkeypatch, path):
+    """
+    Test that routes without user data never touch the database.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - No statements are executed
+    """
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "admin-token")
+
+    with assert_max_queries(0):
+        response = client.get(path, headers={"X-Admin-Token": "admin-token"})
+
+    assert response.status_code == 200
@@ -0,0 +1,85 @@
+"""
+Test suite for the SQL query recorder.
+This module contains tests for:
+- Counting and timing statements in nested recorders
+- Counting failed statements
+- The query budget assertion
+- Debug response headers
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from backend.app.core.query_recorder import (
+    QUERY_COUNT_HEADER, QUERY_TIME_HEADER, assert_max_queries, record_queries,
+)
+from backend.app.config import get_settings
+
+
+def test_record_queries_nests(db_session):
+    """
+    Test that statements are counted by every enclosing recorder.
+
+    Verifies:
+    - The inner recorder sees only its own statements
+    - The outer recorder sees all of them, with their SQL text and time
+    """
+    with record_queries(keep_statements=True) as outer:
+        db_session.execute(text("SELECT 1"))
+        with record_queries() as inner:
+            db_session.execute(text("SELECT 2"))
+
+    assert inner.count == 1
+    assert outer.count == 2
+    assert outer.statements == ["SELECT 1", "SELECT 2"]
+    assert outer.seconds > 0
+
+
+def test_failed_statements_are_counted(db_session):
+    """
+    Test that a statement rejected by the database still counts.
+
+    Verifies:
+    - The failing statement is recorded
+    """
+    with record_queries() as stats:
+        with pytest.raises(OperationalError):
+            db_session.execute(text("SELECT * FROM missing_table"))
+
+    assert stats.count == 1
+
+
+def test_assert_max_queries_reports_statements(db_session):
+    """
+    Test that exceeding a budget fails with the executed statements.
+
+    Verifies:
+    - AssertionError is raised when the budget is exceeded
+    - The message lists the SQL that ran
+    """
+    with pytest.raises(AssertionError) as error:
+        with assert_max_queries(1):
+            db_session.execute(text("SELECT 1"))
+            db_session.execute(text("SELECT 2"))
+
+    assert "Expected at most 1 queries, 2 were executed" in str(error.value)
+    assert "2. SELECT 2" in str(error.value)
+
+
+def test_debug_headers(client, monkeypatch):
+    """
+    Test the per-request query headers.
+
+    Verifies:
+    - Headers are absent when DEBUG is off
+    - Headers report the statements of the request when DEBUG is on
+    """
+    response = client.post("/auth/logout")
+    assert QUERY_COUNT_HEADER not in response.headers
+
+    monkeypatch.setattr(get_settings(), "DEBUG", True)
+    response = client.post("/auth/login", json={"email": "nobody@example.com", "password": "ValidPass123"})
+
+    assert response.status_code == 401
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert float(response.headers[QUERY_TIME_HEADER]) >= 0
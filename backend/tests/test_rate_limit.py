@@ -0,0 +1,265 @@
+"""
+Test suite for rate limiting.
+This module contains tests for:
+- Sliding-window counting in the in-memory backend
+- The shared backend against a local stand-in client
+- 429 responses and RateLimit headers on auth routes
+- Per-user keys once a route has looked the user up
+- Client IPs behind trusted reverse proxies
+"""
+
+import ipaddress
+import pytest
+from datetime import datetime, timezone
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+from backend.app.config import get_settings
+from backend.app.core.rate_limit import (
+    InMemoryRateLimitBackend,
+    SharedRateLimitBackend,
+    get_rate_limiter,
+    parse_rate_limit,
+)
+from backend.app.core.security import hash_password
+from backend.app.dependencies.rate_limit import client_ip
+from backend.app.models.user import User
+
+
+class LocalCounterStore:
+    """
+    Minimal stand-in for a Redis client supporting incr, expire and get.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.ttls = {}
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        self.ttls[key] = seconds
+
+    def get(self, key):
+        return self.values.get(key)
+
+
+def test_parse_rate_limit():
+    """
+    Test parsing of limit strings.
+
+    Verifies:
+    - Count and window length are parsed
+    - Invalid strings raise ValueError
+    """
+    rate = parse_rate_limit("10/minute")
+    assert (rate.limit, rate.window) == (10, 60)
+    assert parse_rate_limit("5/hours").window == 3600
+
+    with pytest.raises(ValueError):
+        parse_rate_limit("ten per minute")
+
+
+@pytest.mark.parametrize("backend_factory", [
+    InMemoryRateLimitBackend,
+    lambda: SharedRateLimitBackend(LocalCounterStore()),
+])
+def test_sliding_window(backend_factory):
+    """
+    Test that requests from the previous window still count, weighted by overlap.
+
+    Verifies:
+    - Requests up to the limit are allowed and the next one is rejected
+    - Halfway into the next window, half of the previous count still applies
+    - Two windows later the key is fully reset
+    """
+    backend = backend_factory()
+    rate = parse_rate_limit("4/minute")
+    start = 6000.0  # start of a window
+
+    results = [backend.hit("login:ip:1.2.3.4", rate, now=start + i) for i in range(5)]
+    assert [result.allowed for result in results] == [True, True, True, True, False]
+    assert results[3].remaining == 0
+
+    # 5 hits weighted by 0.5 plus this one = 3.5 <= 4
+    halfway = backend.hit("login:ip:1.2.3.4", rate, now=start + 90)
+    assert halfway.allowed
+    assert halfway.remaining == 0
+
+    later = backend.hit("login:ip:1.2.3.4", rate, now=start + 180)
+    assert later.allowed
+    assert later.remaining == 3
+
+
+def test_in_memory_backend_prunes_stale_keys():
+    """
+    Test that stale keys are dropped once a shard grows past its bound.
+
+    Verifies:
+    - Only keys from recent windows are kept
+    """
+    backend = InMemoryRateLimitBackend(shards=1, max_keys_per_shard=3)
+    rate = parse_rate_limit("10/minute")
+
+    for i in range(3):
+        backend.hit(f"key-{i}", rate, now=0)
+    backend.hit("fresh", rate, now=600)
+
+    lock, counters = backend._shards[0]
+    assert list(counters) == ["fresh"]
+
+
+def test_login_rate_limited(client, monkeypatch):
+    """
+    Test that repeated login attempts are rejected with 429.
+
+    Verifies:
+    - RateLimit headers are set on allowed responses
+    - The request over the limit gets 429 with Retry-After
+    """
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_LOGIN", "2/minute")
+
+    credentials = {"email": "nobody@example.com", "password": "AnyPass123"}
+    first = client.post("/auth/login", json=credentials)
+    client.post("/auth/login", json=credentials)
+    blocked = client.post("/auth/login", json=credentials)
+
+    assert first.status_code == 401
+    assert blocked.status_code == 429
+    assert blocked.headers["RateLimit-Limit"] == "2"
+    assert blocked.headers["RateLimit-Remaining"] == "0"
+    assert int(blocked.headers["Retry-After"]) > 0
+
+
+def test_verify_email_rate_limited_per_email(client, monkeypatch):
+    """
+    Test that verification code guessing is throttled.
+
+    Verifies:
+    - Guesses beyond the limit are rejected with 429
+    """
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_VERIFY_EMAIL", "3/minute")
+
+    statuses = [
+        client.post("/auth/verify-email", json={"email": "victim@example.com", "code": f"{i:06d}"}).status_code
+        for i in range(4)
+    ]
+
+    assert statuses[:3] == [404, 404, 404]
+    assert statuses[3] == 429
+
+
+async def _send_verification_email(email, code):
+    pass
+
+
+def test_user_key_counted_once_user_is_known(client, db_session, monkeypatch):
+    """
+    Test that requests for an existing user also count against a per-user key.
+
+    Verifies:
+    - Verify-email, resend-code and login hit user:<id> after the lookup
+    - Unknown emails only hit the IP and email keys
+    """
+    user = User(
+        email="limited@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Limited User",
+        is_verified=False,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    limiter = get_rate_limiter()
+    hit = limiter.hit
+    keys = []
+
+    def recording_hit(route, route_keys, now=None):
+        keys.append((route, route_keys))
+        return hit(route, route_keys, now)
+
+    monkeypatch.setattr(limiter, "hit", recording_hit)
+
+    client.post("/auth/login", json={"email": "nobody@example.com", "password": "ValidPass123"})
+    client.post("/auth/resend-code", json={"email": "nobody@example.com"})
+    assert not any(route_keys[0].startswith("user:") for _, route_keys in keys)
+
+    keys.clear()
+    client.post("/auth/login", json={"email": "Limited@example.com", "password": "ValidPass123"})
+    client.post("/auth/verify-email", json={"email": "limited@example.com", "code": "000000"})
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    client.post("/auth/resend-code", json={"email": "limited@example.com"})
+
+    assert [(route, route_keys) for route, route_keys in keys if route_keys[0].startswith("user:")] == [
+        ("login", [f"user:{user.id}"]),
+        ("verify_email", [f"user:{user.id}"]),
+        ("resend_code", [f"user:{user.id}"]),
+    ]
+
+
+def _request(peer: str, headers: dict) -> Request:
+    return Request({
+        "type": "http",
+        "client": (peer, 50000),
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+@pytest.mark.parametrize("peer, headers, expected", [
+    ("10.0.0.5", {}, "10.0.0.5"),
+    ("10.0.0.5", {"X-Forwarded-For": "203.0.113.7"}, "203.0.113.7"),
+    ("10.0.0.5", {"X-Forwarded-For": "198.51.100.1, 203.0.113.7, 10.0.0.9"}, "203.0.113.7"),  # spoofed first hop skipped
+    ("10.0.0.5", {"Forwarded": 'for=198.51.100.1, for="203.0.113.7:4711";proto=https'}, "203.0.113.7"),
+    ("10.0.0.5", {"Forwarded": 'for="[2001:db8::1]:4711"'}, "2001:db8::1"),
+    ("10.0.0.5", {"X-Forwarded-For": "10.0.0.9"}, "10.0.0.9"),  # only proxies: the farthest one
+    ("198.51.100.9", {"X-Forwarded-For": "203.0.113.7"}, "198.51.100.9"),  # untrusted peer: header ignored
+])
+def test_client_ip_behind_trusted_proxy(monkeypatch, peer, headers, expected):
+    """
+    Test client IP selection from forwarding headers.
+
+    Verifies:
+    - Headers are only read when the peer is a trusted proxy
+    - The nearest address that is not a trusted proxy is the client
+    """
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.0/8")])
+
+    assert client_ip(_request(peer, headers)) == expected
+
+
+def test_clients_behind_proxy_limited_separately(client, monkeypatch):
+    """
+    Test that clients behind a trusted proxy do not share one IP limit.
+
+    Verifies:
+    - A client over its limit gets 429 while another client via the same proxy does not
+    """
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_TRUSTED_PROXIES", [ipaddress.ip_network("10.0.0.5")])
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_RESEND_CODE", "2/minute")
+    proxy = TestClient(client.app, client=("10.0.0.5", 50000))
+
+    def resend(client_address, email):
+        return proxy.post("/auth/resend-code", json={"email": email},
+                          headers={"X-Forwarded-For": client_address}).status_code
+
+    assert [resend("203.0.113.7", f"user{i}@example.com") for i in range(3)] == [404, 404, 429]
+    assert resend("203.0.113.8", "other@example.com") == 404
+
+
+def test_rate_limit_disabled(client, monkeypatch):
+    """
+    Test that no limits apply when rate limiting is disabled.
+
+    Verifies:
+    - Requests beyond the limit are not rejected
+    - No RateLimit headers are added
+    """
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(get_settings(), "RATE_LIMIT_RESEND_CODE", "1/minute")
+
+    responses = [client.post("/auth/resend-code", json={"email": "nobody@example.com"}) for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [404, 404, 404]
+    assert "RateLimit-Limit" not in responses[-1].headers
@@ -4,11 +4,19 @@ This module contains tests for:
 - Successful token refresh with valid refresh token
 - Refresh attempts with invalid tokens
 - Refresh attempts with expired tokens
+- Reusing a just-rotated token within the grace window
+- Coalescing concurrent rotations of the same token
+- Bounding the wait for a stalled rotation
 """
 
+import threading
+import time
+import pytest
+
 from backend.app.models.user import User
 from backend.app.models.refresh_token import RefreshToken
 from backend.app.core.security import hash_password, create_refresh_token
+from backend.app.core.single_flight import SingleFlight, get_refresh_single_flight
 from backend.app.config import get_settings
 from datetime import datetime, timezone
 from hashlib import sha256
@@ -83,7 +91,7 @@ def test_refresh_token_invalid(client):
     assert response.status_code == 401
     assert "Invalid refresh token" in response.json()["detail"]
 
-def test_refresh_token_expired(client, db_session):
+def test_refresh_token_expired(client, db_session, monkeypatch):
     """
     Test refresh attempt with expired refresh token.
     
@@ -109,8 +117,7 @@ def test_refresh_token_expired(client, db_session):
     db_session.commit()
     
     # Create an expired refresh token
-    settings = get_settings()
-    settings.REFRESH_TOKEN_EXPIRE_DAYS = -1  # Force expiration
+    monkeypatch.setattr(get_settings(), "REFRESH_TOKEN_EXPIRE_DAYS", -1)  # Force expiration
     refresh_token = create_refresh_token(data={"sub": str(user.id)})
     hashed_token = sha256(refresh_token.encode()).hexdigest()
     
@@ -129,4 +136,133 @@ def test_refresh_token_expired(client, db_session):
     response = client.post("/auth/refresh")
     
     assert response.status_code == 401
-    assert "Invalid refresh token" in response.json()["detail"] 
\ No newline at end of file
+    assert "Invalid refresh token" in response.json()["detail"] 
+
+def _login_refresh_token(client, db_session) -> str:
+    db_session.add(User(
+        email="grace@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Grace User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    ))
+    db_session.commit()
+    response = client.post("/auth/login", json={"email": "grace@example.com", "password": "ValidPass123"})
+    return response.cookies["refresh_token"]
+
+def _refresh_with(client, refresh_token):
+    client.cookies.clear()
+    client.cookies.set("refresh_token", refresh_token)
+    return client.post("/auth/refresh")
+
+def test_rotated_token_within_grace_window(client, db_session):
+    """
+    Test that a just-rotated token returns the same new pair instead of failing.
+
+    Verifies:
+    - Both refreshes with the old token succeed with the same access token and cookie
+    - Only one new refresh token is stored
+    - The new refresh token works
+    """
+    old_token = _login_refresh_token(client, db_session)
+
+    first = _refresh_with(client, old_token)
+    second = _refresh_with(client, old_token)
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert second.cookies["refresh_token"] == first.cookies["refresh_token"]
+    assert db_session.query(RefreshToken).count() == 1
+    assert _refresh_with(client, first.cookies["refresh_token"]).status_code == 200
+
+def test_rotated_token_rejected_without_grace_window(client, db_session, monkeypatch):
+    """
+    Test that rotated tokens are rejected when the grace window is disabled.
+
+    Verifies:
+    - Status code is 401 (Unauthorized) for the second use of the old token
+    """
+    monkeypatch.setattr(get_refresh_single_flight(), "grace_seconds", 0)
+    old_token = _login_refresh_token(client, db_session)
+
+    assert _refresh_with(client, old_token).status_code == 200
+    response = _refresh_with(client, old_token)
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh token not recognized"
+
+def test_single_flight_coalesces_concurrent_calls():
+    """
+    Test that concurrent calls for one key run the work once.
+
+    Verifies:
+    - Callers waiting on a running call get its result
+    - The result is reused within the grace window, then recomputed
+    - Failed (None) results are not kept
+    """
+    flight = SingleFlight(grace_seconds=5)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def rotate():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return ("access", "refresh")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.run("token", rotate))) for _ in range(4)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == [1]
+    assert results == [("access", "refresh")] * 4
+    assert flight.run("token", rotate, now=time.monotonic() + 10) == ("access", "refresh")
+    assert calls == [1, 1]
+
+    assert flight.run("unknown", lambda: None) is None
+    assert flight.run("unknown", lambda: "retried") == "retried"
+
+def test_single_flight_wait_is_bounded(client, db_session, monkeypatch):
+    """
+    Test that callers stop waiting for a rotation that stalls.
+
+    Verifies:
+    - A waiting caller gets TimeoutError after wait_timeout while the leader blocks
+    - A refresh arriving during a stalled rotation of its token gets 401 instead of hanging
+    - The leader still completes once unblocked
+    """
+    flight = SingleFlight(grace_seconds=5, wait_timeout=0.05)
+    started, release = threading.Event(), threading.Event()
+    old_token = _login_refresh_token(client, db_session)
+    hashed_token = sha256(old_token.encode()).hexdigest()
+
+    def stalled_rotate():
+        started.set()
+        release.wait(5)
+        return ("access", "refresh")
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.run(hashed_token, stalled_rotate)))
+    leader.start()
+    started.wait(5)
+
+    begin = time.monotonic()
+    with pytest.raises(TimeoutError):
+        flight.run(hashed_token, stalled_rotate)
+    assert time.monotonic() - begin < 1
+
+    monkeypatch.setattr("backend.app.routes.auth.get_refresh_single_flight", lambda: flight)
+    response = _refresh_with(client, old_token)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Refresh already in progress, please retry"
+
+    release.set()
+    leader.join(5)
+    assert results == [("access", "refresh")]
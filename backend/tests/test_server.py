@@ -0,0 +1,132 @@
+"""
+Test suite for the production server helpers.
+This module contains tests for:
+- Worker auto-sizing from core count and hash cost
+- The shared per-worker stats table
+- Backing off restarts of workers that die on startup
+- Shutting down when workers have already exited
+- The aggregated /server/stats endpoint
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+from backend.app.server import RestartBackoff, Supervisor, WorkerStatsTable, auto_worker_count
+from backend.app.config import get_settings
+
+
+@pytest.mark.parametrize("cpus, hash_seconds, expected", [
+    (4, 0.25, 4),     # bcrypt-bound: one worker per core
+    (4, 0.001, 9),    # cheap hashing: 2 * cores + 1
+    (64, 0.001, 32),  # capped
+    (1, 0.25, 1),
+])
+def test_auto_worker_count(cpus, hash_seconds, expected):
+    """
+    Test worker count selection.
+
+    Verifies:
+    - Expensive hashing sizes workers to cores
+    - Cheap hashing uses 2 * cores + 1, capped at max_workers
+    """
+    assert auto_worker_count(cpus=cpus, hash_seconds=hash_seconds) == expected
+
+
+def test_worker_stats_table_aggregates_slots():
+    """
+    Test that each worker writes its own slot and the snapshot sums them.
+
+    Verifies:
+    - Requests, errors and in-flight counts are tracked per slot
+    - Released slots are excluded from the snapshot
+    """
+    table = WorkerStatsTable(3, shared=True)
+
+    table.claim(0, pid=101)
+    table.request_started()
+    table.request_finished(200, 0.010)
+    table.request_started()
+    table.request_finished(503, 0.030)
+
+    table.claim(1, pid=102)
+    table.request_started()
+
+    table.claim(2, pid=103)
+    table.release(2)
+
+    snapshot = table.snapshot()
+
+    assert [worker["pid"] for worker in snapshot["workers"]] == [101, 102]
+    assert snapshot["workers"][0]["requests"] == 2
+    assert snapshot["workers"][0]["errors"] == 1
+    assert snapshot["workers"][0]["avg_latency_ms"] == pytest.approx(20.0)
+    assert snapshot["total"] == {"workers": 2, "requests": 2, "in_flight": 1, "errors": 1}
+
+
+def test_restart_backoff():
+    """
+    Test the delay between restarts of failing workers.
+
+    Verifies:
+    - Each failed start doubles the delay, up to max_delay
+    - A worker that stays up resets the delay
+    - Too many failed starts in a row exhaust the retries
+    """
+    backoff = RestartBackoff(base_delay=0.2, max_delay=1.0, max_failures=5, min_uptime=5.0)
+
+    assert [backoff.record_exit(0.1) for _ in range(3)] == [0.2, 0.4, 0.8]
+    assert backoff.record_exit(60.0) == 0.0
+    assert [backoff.record_exit(0.1) for _ in range(4)] == [0.2, 0.4, 0.8, 1.0]
+    assert not backoff.exhausted
+    backoff.record_exit(0.1)
+    assert backoff.exhausted
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="the supervisor needs fork")
+def test_shutdown_with_reaped_worker():
+    """
+    Test stopping workers that exited and were reaped elsewhere.
+
+    Verifies:
+    - Signalling a PID that no longer exists does not raise
+    - The worker is forgotten and its stats slot released
+    """
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    supervisor = Supervisor("backend.app.main:app", graceful_timeout=0)
+    supervisor._stats = WorkerStatsTable(1)
+    supervisor._stats.claim(0, pid=process.pid)
+    supervisor._children = {process.pid: 0}
+
+    supervisor._shutdown()
+
+    assert supervisor._children == {}
+    assert supervisor._stats.snapshot()["workers"] == []
+
+
+def test_server_stats_endpoint(client, monkeypatch):
+    """
+    Test that requests are counted and reported on /server/stats.
+
+    Verifies:
+    - Status code is 403 without the admin token
+    - Status code is 200 (OK) with it
+    - The current worker is listed and its request count grows
+    """
+    monkeypatch.setattr(get_settings(), "ADMIN_TOKEN", "admin-token")
+    headers = {"X-Admin-Token": "admin-token"}
+
+    assert client.get("/server/stats").status_code == 403
+    assert client.get("/server/stats", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+    before = client.get("/server/stats", headers=headers).json()["total"]["requests"]
+    client.get("/")
+    client.get("/")
+
+    response = client.get("/server/stats", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"]["workers"] == 1
+    assert data["total"]["requests"] == before + 3
@@ -0,0 +1,214 @@
+"""
+Test suite for hash-sharded user storage.
+This module contains tests for:
+- Stable shard assignment by user ID
+- Storing users with their tokens on one shard
+- Routing email and ID lookups through the directory to the needed shards
+- Unique emails across shards
+- The auth flow running against sharded sessions
+"""
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.exc import IntegrityError
+from backend.app.database import (
+    Base, DIRECTORY_SHARD, create_sharded_session, directory_metadata, get_db, shard_for_user_id, user_directory
+)
+from backend.app.models.user import User
+from backend.app.models.refresh_token import RefreshToken
+from backend.app.core.query_recorder import capture_queries
+from backend.app.validators.user import canonical_email
+
+SHARD_COUNT = 3
+
+
+@pytest.fixture
+def shards(tmp_path):
+    """
+    Create a directory database and three shard databases.
+
+    Returns:
+        tuple: The directory engine and the shard engines keyed by shard ID
+    """
+    directory = create_engine(f"sqlite:///{tmp_path / 'directory.db'}")
+    directory_metadata.create_all(directory)
+    shard_engines = {}
+    for shard_id in map(str, range(SHARD_COUNT)):
+        shard_engines[shard_id] = create_engine(f"sqlite:///{tmp_path / f'shard-{shard_id}.db'}")
+        Base.metadata.create_all(shard_engines[shard_id])
+    yield directory, shard_engines
+    for engine in [directory, *shard_engines.values()]:
+        engine.dispose()
+
+
+@pytest.fixture
+def sharded_session(shards):
+    """
+    Open a sharded session over the test databases.
+
+    Yields:
+        UserShardedSession: Session routing to the test shards
+    """
+    session = create_sharded_session(*shards)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _add_users(session, count: int) -> list[User]:
+    users = [User(email=f"shard{n}@example.com", hashed_password="not-used", full_name="Shard User") for n in range(count)]
+    session.add_all(users)
+    session.commit()
+    return users
+
+
+def _rows_per_shard(shard_engines, table) -> dict[str, list]:
+    rows = {}
+    for shard_id, engine in shard_engines.items():
+        with engine.connect() as connection:
+            rows[shard_id] = connection.execute(select(table)).all()
+    return rows
+
+
+def test_shard_for_user_id_is_stable():
+    """
+    Test shard assignment.
+
+    Verifies:
+    - The same user ID always maps to the same shard
+    - Consecutive IDs are spread over every shard
+    """
+    assert shard_for_user_id(42, SHARD_COUNT) == shard_for_user_id(42, SHARD_COUNT)
+    assert {shard_for_user_id(user_id, SHARD_COUNT) for user_id in range(1, 20)} == {"0", "1", "2"}
+
+
+def test_user_rows_colocated_on_their_shard(shards, sharded_session):
+    """
+    Test where new users and their refresh tokens are written.
+
+    Verifies:
+    - User IDs are allocated by the directory, which records every email
+    - Each user and their token are stored only on the user's shard
+    """
+    directory, shard_engines = shards
+    users = _add_users(sharded_session, 6)
+    sharded_session.add_all(RefreshToken(token=f"token-{user.id}", user_id=user.id) for user in users)
+    sharded_session.commit()
+
+    with directory.connect() as connection:
+        assert len(connection.execute(select(user_directory)).all()) == 6
+
+    user_rows = _rows_per_shard(shard_engines, User.__table__)
+    token_rows = _rows_per_shard(shard_engines, RefreshToken.__table__)
+    for user in users:
+        shard_id = shard_for_user_id(user.id, SHARD_COUNT)
+        assert [row.id for row in user_rows[shard_id] if row.email == user.email] == [user.id]
+        assert [row.user_id for row in token_rows[shard_id] if row.token == f"token-{user.id}"] == [user.id]
+    assert sum(len(rows) for rows in user_rows.values()) == 6
+
+
+def test_lookups_only_touch_needed_shards(shards):
+    """
+    Test statement routing.
+
+    Verifies:
+    - A case-insensitive email lookup runs one directory query and one shard query
+    - An unknown email is answered by a single shard
+    - Lookups by ID and by a list of IDs only query the owning shards
+    - Statements without a user key are sent to every shard
+    """
+    setup = create_sharded_session(*shards)
+    user_ids = [user.id for user in _add_users(setup, 6)]
+    setup.close()
+    session = create_sharded_session(*shards)
+
+    with capture_queries() as statements:
+        user = session.query(User).filter(User.email_canonical == canonical_email("Shard3@Example.com")).first()
+    assert user.id == user_ids[3]
+    assert statements.count == 2
+
+    with capture_queries() as statements:
+        assert session.query(User).filter(User.email == "missing@example.com").first() is None
+    assert statements.count == 2
+
+    session.expunge_all()
+    with capture_queries() as statements:
+        assert session.get(User, user_ids[1]).email == "shard1@example.com"
+    assert statements.count == 1
+
+    ids = user_ids[:2]
+    with capture_queries() as statements:
+        assert sorted(session.query(User.id).filter(User.id.in_(ids)).all()) == [(user_id,) for user_id in ids]
+    assert statements.count == len({shard_for_user_id(user_id, SHARD_COUNT) for user_id in ids})
+
+    with capture_queries() as statements:
+        assert len(session.query(User).filter(User.is_verified == False).all()) == 6
+    assert statements.count == SHARD_COUNT
+    session.close()
+
+
+def test_duplicate_email_rejected_across_shards(sharded_session):
+    """
+    Test that the directory keeps emails unique across shards.
+
+    Verifies:
+    - Adding a second user with a taken email fails on flush
+    - The rollback leaves no orphaned directory entry or user row
+    """
+    _add_users(sharded_session, 1)
+
+    sharded_session.add(User(email="shard0@example.com", hashed_password="not-used"))
+    with pytest.raises(IntegrityError):
+        sharded_session.flush()
+    sharded_session.rollback()
+
+    assert len(sharded_session.connection(bind_arguments={"shard_id": DIRECTORY_SHARD}).execute(select(user_directory)).all()) == 1
+    assert len(sharded_session.query(User).all()) == 1
+
+
+def test_auth_flow_on_shards(client, shards, monkeypatch):
+    """
+    Test registering, verifying, logging in, refreshing and logging out on sharded storage.
+
+    Verifies:
+    - Every step succeeds with sessions from create_sharded_session
+    - The user's rows end up on their own shard only
+    """
+    codes = {}
+
+    async def _send_verification_email(email, code):
+        codes[email] = code
+
+    def sharded_get_db():
+        db = create_sharded_session(*shards)
+        try:
+            yield db
+        finally:
+            db.close()
+
+    monkeypatch.setattr("backend.app.routes.auth.send_verification_email", _send_verification_email)
+    monkeypatch.setitem(client.app.dependency_overrides, get_db, sharded_get_db)
+
+    email, password = "sharded@example.com", "Test123!@#"
+    response = client.post("/auth/register", json={
+        "email": email, "password": password, "confirm_password": password, "full_name": "Sharded User"
+    })
+    assert response.status_code == 201
+    user_id = response.json()["user_id"]
+
+    assert client.post("/auth/verify-email", json={"email": email, "code": codes[email]}).status_code == 200
+
+    response = client.post("/auth/login", json={"email": email, "password": password})
+    assert response.status_code == 200
+    assert client.get("/user/home", headers={"Authorization": f"Bearer {response.json()['access_token']}"}).status_code == 200
+
+    assert client.post("/auth/refresh").status_code == 200
+    assert client.post("/auth/logout").status_code == 204
+
+    _, shard_engines = shards
+    home_shard = shard_for_user_id(user_id, SHARD_COUNT)
+    user_rows = _rows_per_shard(shard_engines, User.__table__)
+    assert [row.is_verified for row in user_rows[home_shard]] == [True]
+    assert sum(len(rows) for rows in user_rows.values()) == 1
+    assert all(rows == [] for rows in _rows_per_shard(shard_engines, RefreshToken.__table__).values())
@@ -0,0 +1,59 @@
+"""
+Test suite for application startup.
+This module contains tests for:
+- Importing the app without mail settings configured
+- Table creation running in the lifespan startup hook
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+from fastapi.testclient import TestClient
+from backend.app.config import get_settings
+from backend.app.main import app
+
+project_root = Path(__file__).resolve().parents[2]
+
+
+def test_import_without_mail_settings():
+    """
+    Test that the app imports when no mail environment variables are set.
+
+    Verifies:
+    - Importing backend.app.main succeeds
+    - FastAPI-Mail is not imported at import time
+    """
+    env = {key: value for key, value in os.environ.items() if not key.startswith("MAIL_")}
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, backend.app.main; print('fastapi_mail' in sys.modules)"],
+        cwd=project_root,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "False"
+
+
+def test_lifespan_creates_tables(monkeypatch):
+    """
+    Test that database tables are created on startup, not on import.
+
+    Verifies:
+    - init_db runs once when the app starts
+    - init_db is skipped when DB_CREATE_TABLES_ON_STARTUP is disabled
+    """
+    calls = []
+    monkeypatch.setattr("backend.app.main.init_db", lambda: calls.append("init_db"))
+
+    monkeypatch.setattr(get_settings(), "DB_CREATE_TABLES_ON_STARTUP", True)
+    with TestClient(app):
+        pass
+    assert calls == ["init_db"]
+
+    monkeypatch.setattr(get_settings(), "DB_CREATE_TABLES_ON_STARTUP", False)
+    with TestClient(app):
+        pass
+    assert calls == ["init_db"]
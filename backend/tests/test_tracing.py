@@ -0,0 +1,181 @@
+"""
+Test suite for request tracing.
+This module contains tests for:
+- Parsing traceparent headers
+- Root and child spans for a traced request
+- Continuing an incoming trace
+- The JSON lines file exporter and its bounded queue
+"""
+
+import json
+from datetime import datetime, timezone
+import pytest
+from backend.app.config import get_settings
+from backend.app.core.metrics import SPANS_DROPPED
+from backend.app.core.security import hash_password
+from backend.app.core.tracing import (
+    TRACEPARENT_HEADER, FileSpanExporter, InMemorySpanExporter, Span, parse_traceparent, set_span_exporter,
+)
+from backend.app.models.user import User
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """
+    Enable tracing into an in-memory exporter.
+
+    Yields:
+        InMemorySpanExporter: Exporter receiving finished traces
+    """
+    monkeypatch.setattr(get_settings(), "TRACING_ENABLED", True)
+    monkeypatch.setattr(get_settings(), "TRACING_SAMPLE_RATE", 1.0)
+    memory_exporter = InMemorySpanExporter()
+    set_span_exporter(memory_exporter)
+    yield memory_exporter
+    set_span_exporter(None)
+
+
+@pytest.mark.parametrize("header, expected", [
+    (f"00-{TRACE_ID}-{PARENT_ID}-01", (TRACE_ID, PARENT_ID, True)),
+    (f"00-{TRACE_ID.upper()}-{PARENT_ID}-00", (TRACE_ID, PARENT_ID, False)),
+    (f"00-{'0' * 32}-{PARENT_ID}-01", None),
+    (f"01-{TRACE_ID}-{PARENT_ID}-01", None),
+    ("garbage", None),
+    (None, None),
+])
+def test_parse_traceparent(header, expected):
+    """
+    Test traceparent parsing.
+
+    Verifies:
+    - Valid headers give trace ID, parent ID and sampled flag
+    - All-zero IDs, unknown versions and malformed values are rejected
+    """
+    assert parse_traceparent(header) == expected
+
+
+def test_login_trace(client, db_session, exporter):
+    """
+    Test the spans recorded for a login.
+
+    Verifies:
+    - One root span named after the route template, with the status code
+    - Child spans for the DB statements, password check and token creation
+    - Every child belongs to the root's trace
+    """
+    user = User(
+        email="tracing@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Tracing User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    client.post("/auth/login", json={"email": "tracing@example.com", "password": "ValidPass123"})
+
+    spans = exporter.spans
+    root = spans[-1]
+    assert root.name == "POST /auth/login"
+    assert root.parent_id is None
+    assert root.attributes["http.status_code"] == 200
+
+    children = {span.name for span in spans[:-1]}
+    assert {"db.query", "verify_password", "create_access_token", "create_refresh_token"} <= children
+    assert all(span.trace_id == root.trace_id for span in spans)
+    assert all(span.parent_id == root.span_id for span in spans[:-1])
+
+
+def test_incoming_traceparent_is_continued(client, exporter):
+    """
+    Test propagation from an incoming traceparent header.
+
+    Verifies:
+    - The root span joins the caller's trace under the caller's span
+    - A traceparent with the sampled flag off is not traced
+    """
+    client.get("/", headers={TRACEPARENT_HEADER: f"00-{TRACE_ID}-{PARENT_ID}-01"})
+
+    root = exporter.spans[-1]
+    assert root.trace_id == TRACE_ID
+    assert root.parent_id == PARENT_ID
+
+    exporter.clear()
+    client.get("/", headers={TRACEPARENT_HEADER: f"00-{TRACE_ID}-{PARENT_ID}-00"})
+    assert exporter.spans == []
+
+
+def test_failed_token_decode_span(client, exporter):
+    """
+    Test that JWT decoding is traced for protected routes.
+
+    Verifies:
+    - A verify_token span is recorded under the request
+    """
+    client.get("/user/home", headers={"Authorization": "Bearer invalid.token.here"})
+
+    assert "verify_token" in {span.name for span in exporter.spans}
+    assert exporter.spans[-1].attributes["http.status_code"] == 401
+
+
+def test_tracing_disabled(client, exporter, monkeypatch):
+    """
+    Test that nothing is recorded when tracing is off.
+
+    Verifies:
+    - No spans are exported
+    """
+    monkeypatch.setattr(get_settings(), "TRACING_ENABLED", False)
+
+    client.get("/")
+
+    assert exporter.spans == []
+
+
+def test_file_exporter(tmp_path):
+    """
+    Test the JSON lines file exporter.
+
+    Verifies:
+    - Each span is written as one JSON object after shutdown flushes the writer
+    """
+    path = tmp_path / "traces" / "spans.jsonl"
+    file_exporter = FileSpanExporter(str(path))
+
+    root = Span(TRACE_ID, PARENT_ID, None, "GET /")
+    child = root.child("db.query", {"db.statement": "SELECT 1"})
+    child.finish()
+    root.finish()
+    file_exporter.export(root.trace)
+    file_exporter.shutdown()
+
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [line["name"] for line in lines] == ["db.query", "GET /"]
+    assert lines[0]["parent_id"] == PARENT_ID
+    assert lines[0]["attributes"] == {"db.statement": "SELECT 1"}
+
+
+def test_file_exporter_drops_when_queue_full(tmp_path, monkeypatch):
+    """
+    Test that a full export queue drops traces instead of blocking.
+
+    Verifies:
+    - Only the first trace is queued while the writer is not draining
+    - The spans of the dropped trace are counted
+    """
+    file_exporter = FileSpanExporter(str(tmp_path / "spans.jsonl"), max_queue=1)
+    monkeypatch.setattr(file_exporter, "_ensure_writer", lambda: None)
+    root = Span(TRACE_ID, PARENT_ID, None, "GET /")
+    root.child("db.query").finish()
+    root.finish()
+    before = SPANS_DROPPED.value()
+
+    file_exporter.export(root.trace)
+    file_exporter.export(root.trace)
+
+    assert file_exporter._queue.qsize() == 1
+    assert SPANS_DROPPED.value() == before + 2
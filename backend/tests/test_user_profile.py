@@ -0,0 +1,118 @@
+"""
+Test suite for the user profile endpoint and conditional GET.
+This module contains tests for:
+- Fetching the current user's profile
+- ETag and Cache-Control headers on user-scoped responses
+- 304 Not Modified on a matching If-None-Match
+- ETag changes after the user is updated
+"""
+
+from datetime import datetime, timezone
+import pytest
+from backend.app.models.user import User
+from backend.app.core.security import hash_password, create_access_token
+
+
+@pytest.fixture
+def profile_user(db_session):
+    """
+    Create a verified user and an access token for it.
+
+    Returns:
+        tuple[User, dict]: The user and the Authorization headers
+    """
+    user = User(
+        email="profile@example.com",
+        hashed_password=hash_password("ValidPass123"),
+        full_name="Profile User",
+        is_verified=True,
+        created_at=datetime.now(timezone.utc)
+    )
+    db_session.add(user)
+    db_session.commit()
+
+    access_token = create_access_token(data={"sub": str(user.id)})
+    return user, {"Authorization": f"Bearer {access_token}"}
+
+
+def test_user_me(client, profile_user):
+    """
+    Test fetching the current user's profile.
+
+    Verifies:
+    - Status code is 200 (OK)
+    - Profile fields match the user
+    - ETag, private Cache-Control and Vary headers are set
+    """
+    user, headers = profile_user
+
+    response = client.get("/user/me", headers=headers)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == user.id
+    assert data["email"] == "profile@example.com"
+    assert data["full_name"] == "Profile User"
+    assert data["is_verified"] is True
+    assert "hashed_password" not in data
+    assert response.headers["ETag"].startswith('W/"')
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert response.headers["Vary"] == "Authorization"
+
+
+@pytest.mark.parametrize("path", ["/user/me", "/user/home"])
+def test_if_none_match_returns_304(client, profile_user, path):
+    """
+    Test revalidation with a current ETag.
+
+    Verifies:
+    - Status code is 304 (Not Modified) with an empty body
+    - The ETag and Cache-Control headers are repeated
+    - Strong and list forms of the tag also match
+    """
+    _, headers = profile_user
+    etag = client.get(path, headers=headers).headers["ETag"]
+
+    response = client.get(path, headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+    assert response.headers["Cache-Control"] == "private, no-cache"
+
+    strong = etag.removeprefix("W/")
+    response = client.get(path, headers={**headers, "If-None-Match": f'"stale", {strong}'})
+    assert response.status_code == 304
+
+
+def test_etag_changes_after_update(client, db_session, profile_user):
+    """
+    Test that updating the user invalidates the cached representation.
+
+    Verifies:
+    - The old ETag no longer matches after the user changes
+    - The new response carries the updated data and a new ETag
+    """
+    user, headers = profile_user
+    etag = client.get("/user/me", headers=headers).headers["ETag"]
+
+    user.full_name = "Renamed User"
+    db_session.commit()
+
+    response = client.get("/user/me", headers={**headers, "If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed User"
+    assert response.headers["ETag"] != etag
+
+
+def test_user_me_without_token(client):
+    """
+    Test that the profile endpoint requires authentication.
+
+    Verifies:
+    - Status code is 401 (Unauthorized)
+    """
+    response = client.get("/user/me")
+
+    assert response.status_code == 401
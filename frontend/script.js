@@ -16,29 +16,83 @@ const API_BASE_URL = window.location.hostname === "localhost"
 const publicPages = ["index.html", "register.html", "verify.html"];
 const currentPage = window.location.pathname.split("/").pop();
 
-if (publicPages.includes(currentPage)) {
-    (async function checkLoggedIn() {
-        try {
-            const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
-                method: "POST",
-                credentials: "include",
-                headers: {
-                    "Accept": "application/json"
-                }
-            });
-
-            if (response.ok) {
-                const data = await response.json();
-                localStorage.setItem("access_token", data.access_token);
-                window.location.href = "dashboard.html";  // ✅ Redirect to home
-            }
-        } catch (err) {
-            console.warn("Not logged in, staying on page.");
+/*
+    Token Refresh
+    Access tokens are refreshed shortly before they expire instead of after a 401.
+    Features:
+    - Expiry read from the access token's "exp" claim
+    - One pending refresh shared by every caller in the tab
+    - Tabs announce refreshes on a BroadcastChannel, so one tab refreshes
+      and the others reuse its token
+*/
+
+const REFRESH_MARGIN_MS = 60 * 1000;      // refresh this long before expiry
+const REFRESH_JITTER_MS = 5 * 1000;       // spread tabs that loaded the same token
+const PEER_REFRESH_TIMEOUT_MS = 10 * 1000;
+
+const authChannel = "BroadcastChannel" in window ? new BroadcastChannel("auth") : null;
+let refreshPromise = null;  // refresh in progress in this tab
+let peerRefresh = null;     // refresh announced by another tab
+let refreshTimer = null;
+
+function tokenExpiresAt(token) {
+    try {
+        const payload = token.split(".")[1].replace(/-/g, "+").replace(/_/g, "/");
+        const claims = JSON.parse(atob(payload));
+        return claims.exp ? claims.exp * 1000 : null;
+    } catch (err) {
+        return null;
+    }
+}
+
+function scheduleRefresh(token) {
+    clearTimeout(refreshTimer);
+    const expiresAt = tokenExpiresAt(token);
+    if (!expiresAt) return;
+
+    const delay = expiresAt - Date.now() - REFRESH_MARGIN_MS - Math.random() * REFRESH_JITTER_MS;
+    refreshTimer = setTimeout(refreshAccessToken, Math.max(0, delay));
+}
+
+function storeAccessToken(token) {
+    localStorage.setItem("access_token", token);
+    scheduleRefresh(token);
+}
+
+function waitForPeerRefresh() {
+    if (!peerRefresh) {
+        let resolve;
+        const promise = new Promise((r) => { resolve = r; });
+        const timeout = setTimeout(() => finishPeerRefresh(false), PEER_REFRESH_TIMEOUT_MS);
+        peerRefresh = { promise, resolve, timeout };
+    }
+    return peerRefresh.promise;
+}
+
+function finishPeerRefresh(refreshed) {
+    if (!peerRefresh) return;
+    clearTimeout(peerRefresh.timeout);
+    peerRefresh.resolve(refreshed);
+    peerRefresh = null;
+}
+
+if (authChannel) {
+    authChannel.onmessage = (event) => {
+        const message = event.data;
+        if (message.type === "refreshing") {
+            waitForPeerRefresh();
+        } else if (message.type === "refreshed") {
+            // localStorage is shared, so only the timer needs updating
+            scheduleRefresh(message.access_token);
+            finishPeerRefresh(true);
+        } else if (message.type === "refresh-failed") {
+            finishPeerRefresh(false);
         }
-    })();
+    };
 }
 
-async function refreshAccessToken() {
+async function requestRefresh() {
+    if (authChannel) authChannel.postMessage({ type: "refreshing" });
     try {
         const response = await fetch(`${API_BASE_URL}/auth/refresh`, {
             method: "POST",
@@ -48,18 +102,54 @@ async function refreshAccessToken() {
             }
         });
 
-        if (!response.ok) return false;
+        if (!response.ok) {
+            if (authChannel) authChannel.postMessage({ type: "refresh-failed" });
+            return false;
+        }
 
         const data = await response.json();
-        localStorage.setItem("access_token", data.access_token);
+        storeAccessToken(data.access_token);
+        if (authChannel) authChannel.postMessage({ type: "refreshed", access_token: data.access_token });
         return true;
     } catch (err) {
         console.error("Failed to refresh token:", err);
+        if (authChannel) authChannel.postMessage({ type: "refresh-failed" });
         return false;
     }
 }
 
+function refreshAccessToken() {
+    // Every caller gets the same promise; if another tab is already
+    // refreshing, use its result and only refresh here if it fails
+    if (!refreshPromise) {
+        const peer = peerRefresh ? peerRefresh.promise : Promise.resolve(false);
+        refreshPromise = peer
+            .then((refreshed) => refreshed || requestRefresh())
+            .finally(() => { refreshPromise = null; });
+    }
+    return refreshPromise;
+}
+
+function tokenNeedsRefresh(token) {
+    const expiresAt = tokenExpiresAt(token);
+    return !token || (expiresAt !== null && expiresAt - Date.now() < REFRESH_MARGIN_MS);
+}
+
+if (publicPages.includes(currentPage)) {
+    (async function checkLoggedIn() {
+        if (await refreshAccessToken()) {
+            window.location.href = "dashboard.html";  // ✅ Redirect to home
+        }
+    })();
+} else if (localStorage.getItem("access_token")) {
+    scheduleRefresh(localStorage.getItem("access_token"));
+}
+
 async function fetchWithAuth(url, options = {}) {
+    // Timers are throttled in background tabs, so check expiry before each call too
+    if (tokenNeedsRefresh(localStorage.getItem("access_token"))) {
+        await refreshAccessToken();
+    }
     const token = localStorage.getItem("access_token");
 
     const defaultHeaders = {